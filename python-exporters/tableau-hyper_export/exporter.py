@@ -1,7 +1,7 @@
 import logging
 
 from dataiku.exporter import Exporter
-from tableau_table_writer import TableauTableWriter
+from tableau_partitioned_writer import create_table_writer
 from custom_exceptions import InvalidPluginParameter
 
 logger = logging.getLogger(__name__)
@@ -33,7 +33,7 @@ class TableauHyperExporter(Exporter):
         export_geometry_as_string = False
         if plugin_config:
             export_geometry_as_string = plugin_config.get("export_geometry_as_string", False)
-        self.writer = TableauTableWriter(config=config, schema_name=schema_name, table_name=table_name, export_geometry_as_string=export_geometry_as_string)
+        self.writer = create_table_writer(config=config, schema_name=schema_name, table_name=table_name, export_geometry_as_string=export_geometry_as_string)
 
         self.output_file = None
 
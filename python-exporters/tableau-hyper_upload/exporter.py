@@ -5,9 +5,13 @@ Exporter to Tableau Server or Tableau Online
 import logging
 import os
 
+import dataiku
 from dataiku.exporter import Exporter
-from tableau_table_writer import TableauTableWriter
+from tableau_multi_table_writer import TableauMultiTableWriter
+from tableau_partitioned_writer import create_table_writer
 from tableau_server_utils import get_project_from_name, get_full_list_of_projects, get_tableau_server_connection
+from tableau_server_utils import get_local_extract_path
+from tableau_table_writer import WRITE_MODE_OVERWRITE, WRITE_MODE_UPSERT, WRITE_MODES
 import tempfile
 from custom_exceptions import InvalidPluginParameter
 
@@ -74,19 +78,48 @@ class TableauHyperExporter(Exporter):
         self.project_name = config.get('project', 'default')
         self.schema_name = 'Extract'
         self.table_name = 'Extract'
+        self.publish_mode = config.get('publish_mode') or tsc.Server.PublishMode.Overwrite
+        if self.publish_mode not in [tsc.Server.PublishMode.Overwrite, tsc.Server.PublishMode.Append]:
+            raise InvalidPluginParameter(variable_name='publish_mode', variable_value=self.publish_mode)
+        # Datasets of the project written as additional tables of the same file, for instance star schema dimensions
+        self.additional_dataset_names = [name for name in config.get('additional_datasets') or [] if name]
+        if self.additional_dataset_names and self.publish_mode == tsc.Server.PublishMode.Append:
+            raise ValueError("Several tables cannot be appended to an existing datasource")
+        # Rows appended or upserted to the extract kept locally between exports, which is then published whole
+        self.write_mode = config.get('write_mode') or WRITE_MODE_OVERWRITE
+        if self.write_mode not in WRITE_MODES:
+            raise InvalidPluginParameter(variable_name='write_mode', variable_value=self.write_mode)
+        if self.write_mode == WRITE_MODE_UPSERT:
+            check_null_values(config.get('upsert_key_columns'), 'upsert_key_columns')
+        if self.write_mode != WRITE_MODE_OVERWRITE:
+            if self.publish_mode != tsc.Server.PublishMode.Overwrite:
+                raise ValueError("The extract kept between exports must be published in Overwrite mode, "
+                                 "appending it would duplicate the rows of the previous exports")
+            if self.additional_dataset_names:
+                raise ValueError("Several tables cannot be appended or upserted to the extract kept between exports")
+        # A failed export leaves its checkpointed extract for the rerun, which resumes after the rows written
+        self.checkpoint_rows = int(config.get('checkpoint_rows') or 0)
+        if self.checkpoint_rows > 0 and self.additional_dataset_names:
+            raise ValueError("Checkpoints cannot be combined with additional tables")
 
         logger.info("Detected following Tableau Hyper file configuration:\n"
                     "   output_file_name: {},\n"
                     "       project_name: {},\n"
                     "        schema_name: {},\n"
-                    "         table_name: {},\n".format(
-            self.output_file_name, self.project_name, self.schema_name, self.table_name))
+                    "         table_name: {},\n"
+                    "       publish_mode: {},\n"
+                    "         write_mode: {},\n".format(
+            self.output_file_name, self.project_name, self.schema_name, self.table_name, self.publish_mode,
+            self.write_mode))
 
         # Instantiate Tableau Writer wrapper
         export_geometry_as_string = False
         if plugin_config:
             export_geometry_as_string = plugin_config.get("export_geometry_as_string", False)
-        self.writer = TableauTableWriter(config=config, schema_name=self.schema_name, table_name=self.table_name, export_geometry_as_string=export_geometry_as_string)
+        self.multi_table_writer = None
+        if self.additional_dataset_names:
+            self.multi_table_writer = TableauMultiTableWriter(config, export_geometry_as_string)
+        self.writer = create_table_writer(config=config, schema_name=self.schema_name, table_name=self.table_name, export_geometry_as_string=export_geometry_as_string)
         # Open connection to Tableau Server
         if auth_type == "pta-preset":
             self.tableau_auth = tsc.PersonalAccessTokenAuth(username, password, site_id=site_name)
@@ -116,12 +149,27 @@ class TableauHyperExporter(Exporter):
         """
         logger.info("Call to open method in upload exporter ...")
         
-        # Defines a file path using the given output_file_name and inside a newly created temporary directory
-        self.tmp_output_dir = tempfile.TemporaryDirectory()
-        self.output_file = os.path.join(self.tmp_output_dir.name, self.output_file_name + ".hyper")
-
-        self.writer.schema_converter.set_dss_storage_types(schema)
-        self.writer.create_schema(schema, self.output_file)
+        if self.write_mode != WRITE_MODE_OVERWRITE or self.checkpoint_rows > 0:
+            # The extract of the previous exports, named after the output table, receives the exported rows
+            self.output_file = get_local_extract_path(dataiku.default_project_key(),
+                                                      self.project_id or self.project_name, self.output_file_name)
+        else:
+            # Defines a file path using the given output_file_name and inside a newly created temporary directory
+            self.tmp_output_dir = tempfile.TemporaryDirectory()
+            self.output_file = os.path.join(self.tmp_output_dir.name, self.output_file_name + ".hyper")
+
+        if self.multi_table_writer is not None:
+            # The additional tables are loaded in the background while the exported dataset is streamed
+            self.multi_table_writer.open(self.output_file)
+            for dataset_name in self.additional_dataset_names:
+                dataset = dataiku.Dataset(dataset_name)
+                logger.info("Loading the dataset {} as an additional table".format(dataset_name))
+                self.multi_table_writer.load_table(self.schema_name, dataset.short_name,
+                                                   {'columns': dataset.read_schema()}, dataset.iter_tuples())
+            self.writer = self.multi_table_writer.create_table_writer(self.schema_name, self.table_name, schema)
+        else:
+            self.writer.schema_converter.set_dss_storage_types(schema)
+            self.writer.create_schema(schema, self.output_file)
         logger.info("Defined the temporary output file: {}".format(self.output_file))
 
     def open_to_file(self, schema, destination_file_path):
@@ -139,11 +187,21 @@ class TableauHyperExporter(Exporter):
     def close(self):
         """
         Close the connections and publish DataSource to Tableau Server/Online
-        If same DataSource exists, it will be overwritten
+        If same DataSource exists, it will be overwritten, or the rows will be appended to it in Append publish mode.
+        The extract kept between exports in the append and upsert write modes is not removed, a checkpointed extract
+        is removed once published.
         """
         self.writer.close()
+        if self.multi_table_writer is not None:
+            self.multi_table_writer.close()
         with self.server.auth.sign_in(self.tableau_auth):
-            self.server.datasources.publish(self.tableau_datasource, self.output_file, 'Overwrite')
+            self.server.datasources.publish(self.tableau_datasource, self.output_file, self.publish_mode)
+        if self.tmp_output_dir is None and self.write_mode == WRITE_MODE_OVERWRITE:
+            os.remove(self.output_file)
+            return
+        if self.tmp_output_dir is None:
+            logger.info("Kept the extract {} for the next exports".format(self.output_file))
+            return
         try:
             self.tmp_output_dir.cleanup()
         except Exception as err:
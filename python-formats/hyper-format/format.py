@@ -11,14 +11,10 @@ Note: the name of the class itself is not relevant.
 
 from dataiku.customformat import Formatter, OutputFormatter, FormatExtractor
 
-import base64
-import datetime
-import json
 import logging
-import os
-import pandas
 
-from tableau_table_reader import TableauTableReader
+from tableau_partitioned_reader import create_table_reader
+from tableau_stream_writer import TableauStreamWriter
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
@@ -42,7 +38,10 @@ class MyFormatter(Formatter):
         :param stream: the stream to write the formatted data to
         :param schema: the schema of the rows that will be formatted (never None)
         """
-        return MyOutputFormatter(stream, schema)
+        export_geometry_as_string = False
+        if self.plugin_config:
+            export_geometry_as_string = self.plugin_config.get("export_geometry_as_string", False)
+        return MyOutputFormatter(stream, schema, config=self.config, export_geometry_as_string=export_geometry_as_string)
 
     def get_format_extractor(self, stream, schema=None):
         """
@@ -50,8 +49,8 @@ class MyFormatter(Formatter):
         :param stream: the stream to read the formatted data from
         :param schema: the schema of the rows that will be extracted. None when the extractor is used to detect the format.
         """
-        table_name = self.config['table_name']
-        schema_name = self.config['schema_name']
+        table_name = self.config.get('table_name')
+        schema_name = self.config.get('schema_name')
         return MyFormatExtractor(stream, schema, config=self.config, table_name=table_name, schema_name=schema_name)
 
 
@@ -67,41 +66,33 @@ class MyOutputFormatter(OutputFormatter):
 
     """
 
-    def __init__(self, stream, schema):
+    def __init__(self, stream, schema, config, export_geometry_as_string=False):
         """
         Initialize the formatter
         :param stream: the stream to write the formatted data to
         """
         OutputFormatter.__init__(self, stream)
         self.schema = schema
+        self.tableau_writer = TableauStreamWriter(config=config, export_geometry_as_string=export_geometry_as_string)
 
     def write_header(self):
         """
-        Write the header of the format (if any)
+        Create the Tableau Hyper file, written locally until the footer
         """
-        if self.schema is not None:
-            self.stream.write(' ' + base64.b64encode(json.dumps(self.schema['columns'])) + '\n')
+        self.tableau_writer.open(self.schema)
 
     def write_row(self, row):
         """
         Write a row in the format
-        :param row: array of strings, with one value per column in the schema
-        """
-        clean_row = []
-        for column_value in row:
-            if isinstance(column_value, datetime.datetime):
-                clean_row.append(column_value.isoformat())
-            elif isinstance(column_value, pandas.Timestamp):
-                clean_row.append(column_value.isoformat())
-            else:
-                clean_row.append(column_value)
-        self.stream.write(base64.b64encode(json.dumps(clean_row)) + '\n')
+        :param row: array of values, with one value per column in the schema
+        """
+        self.tableau_writer.write_row(row)
 
     def write_footer(self):
         """
-        Write the footer of the format (if any)
+        Complete the Tableau Hyper file and copy it to the output stream
         """
-        pass
+        self.tableau_writer.close(self.stream)
 
 
 class MyFormatExtractor(FormatExtractor):
@@ -115,7 +106,7 @@ class MyFormatExtractor(FormatExtractor):
         :param stream: the stream to read the formatted data from
         """
         FormatExtractor.__init__(self, stream)
-        self.tableau_reader = TableauTableReader(config=config, table_name=table_name, schema_name=schema_name)
+        self.tableau_reader = create_table_reader(config, schema_name, table_name)
         self.tableau_reader.create_tmp_hyper_file()
         self.tableau_reader.read_buffer(stream)
         self.tableau_reader.open_connection()
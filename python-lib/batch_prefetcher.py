@@ -0,0 +1,124 @@
+"""
+Background prefetch of the batches of rows read from Tableau Hyper
+
+Used by the reader when prefetching is enabled: the next batches are fetched and converted while DSS consumes the
+current one.
+"""
+
+import logging
+import queue
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+DEFAULT_QUEUE_SIZE = 2
+QUEUE_TIMEOUT = 1
+SAMPLED_ROWS_COUNT = 10
+
+
+def estimate_rows_size(rows):
+    """
+    Estimate the memory used by a batch of rows from a sample of its rows
+
+    :param rows: list of dict or list rows
+    :return: estimated size in bytes
+    """
+    if not rows:
+        return 0
+    sampled_rows = rows[:SAMPLED_ROWS_COUNT]
+    sampled_size = 0
+    for row in sampled_rows:
+        values = row.values() if isinstance(row, dict) else row
+        sampled_size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in values)
+    return sys.getsizeof(rows) + sampled_size * len(rows) // len(sampled_rows)
+
+
+class BatchPrefetcher(object):
+    """
+    Call `fetch_batch` in a background thread until it returns an empty batch, queuing at most `queue_size` batches.
+
+    An error raised by `fetch_batch` is raised again by `get`, once the batches fetched before it are consumed.
+    """
+
+    def __init__(self, fetch_batch, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        :param fetch_batch: function returning the next list of rows, an empty list once all the rows are read
+        :param queue_size: maximum number of batches fetched in advance
+        """
+        self.fetch_batch = fetch_batch
+        self.batches = queue.Queue(maxsize=queue_size)
+        self.stopping = False
+        self.lock = threading.Lock()
+        self.queued_size = 0
+        self.max_queued_size = 0
+        self.batches_count = 0
+        self.thread = threading.Thread(target=self.prefetch_batches, name="hyper-prefetcher", daemon=True)
+        self.thread.start()
+
+    def prefetch_batches(self):
+        """
+        Background thread: fetch the batches until the end of the rows, an error or `close`
+        """
+        try:
+            while not self.stopping:
+                batch = self.fetch_batch()
+                batch_size = estimate_rows_size(batch)
+                with self.lock:
+                    self.queued_size += batch_size
+                    self.max_queued_size = max(self.max_queued_size, self.queued_size)
+                if not self.put((batch, batch_size)) or not batch:
+                    return
+                self.batches_count += 1
+        except Exception as err:
+            logger.warning("Background fetch failed: {}".format(err))
+            self.put((err, 0))
+
+    def put(self, item):
+        """
+        Queue an item, waiting while the queue is full
+
+        :return: False if the prefetcher was closed in the meantime
+        """
+        while not self.stopping:
+            try:
+                self.batches.put(item, timeout=QUEUE_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def get(self):
+        """
+        Wait for the next batch
+
+        :return: list of rows, empty once all the rows are read
+        """
+        while True:
+            try:
+                batch, batch_size = self.batches.get(timeout=QUEUE_TIMEOUT)
+                break
+            except queue.Empty:
+                if not self.thread.is_alive() and self.batches.empty():
+                    raise RuntimeError("The background fetch thread is stopped")
+        with self.lock:
+            self.queued_size -= batch_size
+        if isinstance(batch, Exception):
+            raise batch
+        return batch
+
+    def close(self):
+        """
+        Stop fetching, wait for the background thread and discard the queued batches
+        """
+        self.stopping = True
+        while self.thread.is_alive():
+            try:
+                # Unblock a background thread waiting for a free slot
+                self.batches.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                pass
+        self.thread.join()
+        logger.info("Prefetched {} batches, with at most {:.1f} MB of rows waiting to be read".format(
+            self.batches_count, self.max_queued_size / (1024 * 1024)))
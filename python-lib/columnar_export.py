@@ -0,0 +1,171 @@
+"""
+Columnar export of Tableau Hyper tables and query results
+
+hyperd writes the result of a query to a Parquet or Arrow IPC stream file with `COPY ... TO`, which is then read back
+as Arrow record batches. The exported columns are cast so that their values match the DSS types and values of
+`TypeConversion.mapping_hyper_to_dss`, in both temporal import modes.
+
+Requires pyarrow, and a version of the Tableau Hyper API supporting `COPY ... TO`.
+"""
+
+import logging
+import os
+import time
+
+from tableauhyperapi import TypeTag
+from tableauhyperapi import escape_string_literal
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+FORMAT_ARROW = "arrowstream"
+FORMAT_PARQUET = "parquet"
+FILE_EXTENSIONS = {FORMAT_ARROW: ".arrows", FORMAT_PARQUET: ".parquet"}
+DEFAULT_BATCH_SIZE = 10000
+
+
+def check_pyarrow():
+    if pyarrow is None:
+        raise ImportError("The columnar export of Tableau Hyper tables requires the pyarrow package")
+
+
+def utc_timestamps(array):
+    """
+    hyperd labels the time zone of its timestamp_tz columns `Utc`, relabel it with the standard `UTC` name
+    """
+    return array.view(pyarrow.timestamp(array.type.unit, tz="UTC"))
+
+
+def python_strings(array):
+    """
+    Format the values as `str` does on the values returned by the Tableau Hyper API
+    """
+    return pyarrow.array([None if value is None else str(value) for value in array.to_pylist()], pyarrow.string())
+
+
+def legacy_timestamps_tz(array):
+    return python_strings(utc_timestamps(array))
+
+
+def get_columnar_mapping(temporal_import_mode="LEGACY"):
+    """
+    Retrieve, for each Tableau Hyper type, how its columns are exported so that they match `mapping_hyper_to_dss`
+
+    :param temporal_import_mode: LEGACY or MODERN, as in the `temporal_import_mode` config
+    :return: dict {type tag: (SQL expression template of the exported column, Arrow array converter or None)}.
+        The templates are formatted with the `column` name and the `max_length` of its type.
+    """
+    columnar_mapping = {
+        TypeTag.BIG_INT: ("{column}", None),
+        TypeTag.BYTES: ("{column}", python_strings),
+        TypeTag.BOOL: ("{column}", None),
+        # Padded explicitly, the Parquet export trims the padding of char values
+        TypeTag.CHAR: ("RPAD(CAST({column} AS text), {max_length})", None),
+        # NaN doubles are nulls in DSS
+        TypeTag.DOUBLE: ("NULLIF({column}, 'NaN'::double precision)", None),
+        TypeTag.GEOGRAPHY: ("UPPER(CAST({column} AS text))", None),
+        TypeTag.INT: ("{column}", None),
+        TypeTag.INTERVAL: ("CAST({column} AS text)", None),
+        TypeTag.JSON: ("{column}", None),
+        TypeTag.NUMERIC: ("CAST({column} AS double precision)", None),
+        TypeTag.OID: ("CAST({column} AS text)", None),
+        TypeTag.SMALL_INT: ("{column}", None),
+        TypeTag.TEXT: ("{column}", None),
+        TypeTag.VARCHAR: ("{column}", None),
+        TypeTag.TIME: ("{column}", python_strings),
+        TypeTag.TIMESTAMP: ("{column}", None),
+    }
+    if temporal_import_mode == "LEGACY":
+        columnar_mapping[TypeTag.DATE] = ("CAST({column} AS timestamp)", None)
+        columnar_mapping[TypeTag.TIMESTAMP_TZ] = ("{column}", legacy_timestamps_tz)
+    else:
+        columnar_mapping[TypeTag.DATE] = ("CAST({column} AS text)", None)
+        columnar_mapping[TypeTag.TIMESTAMP_TZ] = ("{column}", utc_timestamps)
+    return columnar_mapping
+
+
+class ColumnarExport(object):
+    """
+    Export the result of a query on Tableau Hyper columns to a columnar file, and read it back as record batches
+    """
+
+    def __init__(self, hyper_columns, temporal_import_mode="LEGACY", file_format=FORMAT_ARROW):
+        """
+        :param hyper_columns: Tableau Hyper columns (name and type) read by the query
+        :param temporal_import_mode: LEGACY or MODERN, as in the `temporal_import_mode` config
+        :param file_format: FORMAT_ARROW or FORMAT_PARQUET
+        """
+        check_pyarrow()
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError("Invalid columnar format {}, expected one of {}".format(
+                file_format, ", ".join(FILE_EXTENSIONS)))
+        self.file_format = file_format
+        self.column_names = [column.name.unescaped for column in hyper_columns]
+        columnar_mapping = get_columnar_mapping(temporal_import_mode)
+        self.select_expressions = []
+        self.array_converters = []
+        for column in hyper_columns:
+            if column.type.tag not in columnar_mapping:
+                raise ValueError("Invalid DSS storage type {}".format(column.type.tag))
+            expression_template, array_converter = columnar_mapping[column.type.tag]
+            expression = expression_template.format(column=column.name, max_length=column.type.max_length)
+            self.select_expressions.append("{} AS {}".format(expression, column.name))
+            self.array_converters.append(array_converter)
+
+    def build_select_list(self):
+        """
+        :return: the select list of the query exporting the columns
+        """
+        return ", ".join(self.select_expressions)
+
+    def export(self, connection, from_clause, output_path):
+        """
+        Have hyperd write `SELECT <converted columns> <from_clause>` to `output_path`
+
+        :param connection: Tableau Hyper connection
+        :param from_clause: end of the query, starting with FROM
+        :param output_path: path of the written file, on the host of hyperd
+        """
+        sql_query = "SELECT {} {}".format(self.build_select_list(), from_clause)
+        start = time.time()
+        connection.execute_command("COPY ({}) TO {} WITH (FORMAT {})".format(
+            sql_query, escape_string_literal(output_path), self.file_format))
+        logger.info("Exported the query {} to {} ({:.1f} MB) in {:.2f}s".format(
+            sql_query, output_path, os.path.getsize(output_path) / (1024 * 1024), time.time() - start))
+
+    def convert_record_batch(self, record_batch):
+        """
+        Apply the Arrow array converters to a record batch read from the exported file
+        """
+        arrays = [
+            array if convert is None else convert(array)
+            for array, convert in zip(record_batch.columns, self.array_converters)
+        ]
+        return pyarrow.RecordBatch.from_arrays(arrays, names=self.column_names)
+
+    def read_record_batches(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Read the exported file, one record batch at a time
+
+        :param path: path of the exported file
+        :param batch_size: maximum number of rows of the Parquet batches, Arrow streams keep the batches of hyperd
+        :return: generator of pyarrow.RecordBatch, with the DSS column names
+        """
+        if self.file_format == FORMAT_PARQUET:
+            parquet_file = pyarrow.parquet.ParquetFile(path)
+            try:
+                for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+                    yield self.convert_record_batch(record_batch)
+            finally:
+                parquet_file.close()
+        else:
+            with pyarrow.OSFile(path, "rb") as source:
+                for record_batch in pyarrow.ipc.open_stream(source):
+                    yield self.convert_record_batch(record_batch)
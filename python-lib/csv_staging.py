@@ -0,0 +1,177 @@
+"""
+Staging of converted rows into local CSV files, loaded into Tableau Hyper with `COPY ... FROM`
+
+Used by the writer when the `COPY` load mode is selected: hyperd parses the staged files on its own threads.
+"""
+
+import datetime
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from tableauhyperapi import SqlType
+from tableauhyperapi import escape_string_literal
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+DEFAULT_STAGING_FILE_SIZE_MB = 1024
+
+
+def to_csv_text(value):
+    """
+    Quote a text value, so that empty strings are not read back as null values
+    """
+    return '"' + value.replace('"', '""') + '"'
+
+
+def to_csv_bool(value):
+    return 'true' if value else 'false'
+
+
+def to_csv_double(value):
+    """
+    Format a float with all its digits, `inf`, `-inf` and `nan` being read back by hyperd as such
+    """
+    return repr(float(value))
+
+
+def to_csv_date(value):
+    if isinstance(value, datetime.date):
+        return '{:%Y-%m-%d}'.format(value)
+    return to_csv_text(str(value))
+
+
+def to_csv_timestamp(value):
+    """
+    Format a timestamp for a Tableau Hyper timestamp column. As with the inserter, the time zone is dropped.
+    """
+    return '{:%Y-%m-%d %H:%M:%S.%f}'.format(value)
+
+
+def to_csv_timestamp_tz(value):
+    """
+    Format a timestamp for a Tableau Hyper timestamp_tz column. As with the inserter, naive values are UTC.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc)
+    return '{:%Y-%m-%d %H:%M:%S.%f}+00:00'.format(value)
+
+
+def get_csv_formatter(hyper_type):
+    """
+    Retrieve the function formatting a non-null value for a CSV file, given the target Tableau Hyper column type
+
+    :param hyper_type: SqlType of the target column
+    :return: formatting function
+    """
+    csv_formatters = {
+        SqlType.bool().tag: to_csv_bool,
+        SqlType.small_int().tag: str,
+        SqlType.int().tag: str,
+        SqlType.big_int().tag: str,
+        SqlType.double().tag: to_csv_double,
+        SqlType.numeric(18, 0).tag: str,
+        SqlType.date().tag: to_csv_date,
+        SqlType.text().tag: to_csv_text,
+        SqlType.geography().tag: to_csv_text,
+        SqlType.timestamp().tag: to_csv_timestamp,
+        SqlType.timestamp_tz().tag: to_csv_timestamp_tz,
+    }
+    if hyper_type.tag not in csv_formatters:
+        raise ValueError("Columns of type {} cannot be loaded with COPY".format(hyper_type))
+    return csv_formatters[hyper_type.tag]
+
+
+class CsvStaging(object):
+    """
+    Stage rows converted to Tableau Hyper into CSV files and load them into the target table with `COPY`.
+
+    Rows are appended to a local staging file. Once the file exceeds `staging_file_size` bytes it is loaded and
+    a new file is started, so that the disk usage stays bounded.
+    """
+
+    def __init__(self, connection, table_definition, staging_file_size=DEFAULT_STAGING_FILE_SIZE_MB * 1024 * 1024):
+        """
+        :param connection: the Tableau Hyper connection to the target database
+        :param table_definition: TableDefinition of the target table
+        :param staging_file_size: size in bytes above which a staging file is loaded
+        """
+        self.connection = connection
+        self.table_definition = table_definition
+        self.staging_file_size = staging_file_size
+
+        self.csv_formatters = [get_csv_formatter(column.type) for column in table_definition.columns]
+        self.staging_directory = tempfile.mkdtemp(prefix="tmp_hyper_copy_")
+        self.staging_file_index = 0
+        self.staging_file_path = None
+        self.staging_file = None
+        self.loaded_rows_count = 0
+        self.staged_rows_count = 0
+        self.copy_duration = 0
+        self.open_staging_file()
+
+    @property
+    def is_open(self):
+        """ True until the staged rows are loaded or discarded, as for a Tableau Hyper inserter """
+        return self.staging_file is not None
+
+    def open_staging_file(self):
+        self.staging_file_index += 1
+        self.staging_file_path = os.path.join(self.staging_directory, "part_{}.csv".format(self.staging_file_index))
+        self.staging_file = open(self.staging_file_path, "w", encoding="utf-8", newline="")
+
+    def add_rows(self, hyper_rows):
+        """
+        Stage rows already converted to Tableau Hyper
+
+        :param hyper_rows: list of tableau hyper compliant rows
+        """
+        csv_formatters = self.csv_formatters
+        lines = []
+        for hyper_row in hyper_rows:
+            lines.append(",".join(
+                '' if value is None else format_value(value) for format_value, value in zip(csv_formatters, hyper_row)
+            ))
+        lines.append('')
+        self.staging_file.write("\n".join(lines))
+        self.staged_rows_count += len(hyper_rows)
+        if self.staging_file.tell() >= self.staging_file_size:
+            self.load_staging_file()
+            self.open_staging_file()
+
+    def load_staging_file(self):
+        """
+        Load the current staging file into the target table with `COPY` and delete it
+        """
+        self.staging_file.close()
+        start = time.time()
+        loaded_rows_count = self.connection.execute_command(
+            "COPY {} FROM {} WITH (FORMAT csv, NULL '', HEADER false)".format(
+                self.table_definition.table_name, escape_string_literal(self.staging_file_path)))
+        self.copy_duration += time.time() - start
+        os.remove(self.staging_file_path)
+        self.loaded_rows_count += loaded_rows_count if loaded_rows_count is not None else self.staged_rows_count
+        self.staged_rows_count = 0
+        logger.info("Loaded {} rows with COPY ({} rows so far, {:.1f}s spent in COPY)".format(
+            loaded_rows_count, self.loaded_rows_count, self.copy_duration))
+
+    def execute(self):
+        """
+        Load the remaining staged rows and remove the staging directory
+        """
+        try:
+            self.load_staging_file()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Discard the staged rows which were not loaded
+        """
+        if self.staging_file is not None:
+            self.staging_file.close()
+            self.staging_file = None
+        shutil.rmtree(self.staging_directory, ignore_errors=True)
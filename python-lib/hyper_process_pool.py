@@ -0,0 +1,187 @@
+"""
+Process-level pool of the Tableau Hyper process (hyperd)
+
+Starting hyperd takes a noticeable time, which dominates the flows running many small exports and imports.
+Readers and writers lease the shared hyperd instead of starting their own one: it stays up while leased and is
+stopped once it has been idle for `idle_timeout` seconds, or when the interpreter exits.
+
+Connections are not pooled: each one is bound to the file and create mode of its reader or writer, holds at most one
+inserter, and opening one is an order of magnitude cheaper than starting hyperd.
+"""
+
+import atexit
+import logging
+import os
+import threading
+import time
+
+from tableauhyperapi import Connection
+from tableauhyperapi import HyperException
+
+from tableau_server_utils import get_hyper_process
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+DEFAULT_IDLE_TIMEOUT = 60
+
+
+class HyperProcessLease(object):
+    """
+    Handle on the shared Tableau Hyper process, used like a HyperProcess: `endpoint`, `close()` and `with`.
+
+    Closing the lease releases it, the process itself is stopped by the pool once idle.
+    """
+
+    def __init__(self, pool, hyper):
+        self.pool = pool
+        self.hyper = hyper
+        self.is_open = True
+
+    @property
+    def endpoint(self):
+        return self.hyper.endpoint
+
+    def close(self):
+        if self.is_open:
+            self.is_open = False
+            self.pool.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class HyperProcessPool(object):
+    """
+    Share one Tableau Hyper process between all the readers and writers of the Python process
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """
+        :param idle_timeout: seconds after which an unused hyperd is stopped, 0 to stop it as soon as it is released
+        """
+        self.idle_timeout = idle_timeout
+        self.lock = threading.Lock()
+        self.hyper = None
+        self.leases_count = 0
+        self.idle_timer = None
+        self.starts_count = 0
+        self.pid = os.getpid()
+        # Processes inherited from a parent process through a fork, never closed by the child
+        self.inherited_processes = []
+
+    def acquire(self):
+        """
+        Lease the shared Tableau Hyper process, starting it (again) when needed
+
+        :return: a HyperProcessLease
+        """
+        with self.lock:
+            self.reset_after_fork()
+            self.cancel_idle_timer()
+            if self.hyper is not None and not self.is_healthy():
+                logger.warning("The shared Tableau Hyper process does not respond anymore, restarting it")
+                self.stop()
+            if self.hyper is None:
+                self.start()
+            self.leases_count += 1
+            return HyperProcessLease(self, self.hyper)
+
+    def release(self):
+        """
+        Release a lease, scheduling the shutdown of the process once it is not leased anymore
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                return
+            self.leases_count = max(self.leases_count - 1, 0)
+            if self.leases_count > 0 or self.hyper is None:
+                return
+            if self.idle_timeout <= 0:
+                self.stop()
+            else:
+                timer = threading.Timer(self.idle_timeout, self.stop_if_idle)
+                timer.daemon = True
+                self.idle_timer = timer
+                timer.start()
+
+    def is_healthy(self):
+        """
+        Check that hyperd is still running and accepts connections
+        """
+        if not self.hyper.is_open:
+            return False
+        try:
+            with Connection(self.hyper.endpoint):
+                return True
+        except HyperException as err:
+            logger.warning("Health check of the Tableau Hyper process failed: {}".format(err))
+            return False
+
+    def start(self):
+        start = time.time()
+        self.hyper = get_hyper_process()
+        self.starts_count += 1
+        logger.info("Started the shared Tableau Hyper process in {:.2f}s".format(time.time() - start))
+
+    def stop(self):
+        hyper = self.hyper
+        self.hyper = None
+        if hyper is None:
+            return
+        try:
+            hyper.close()
+            logger.info("Stopped the shared Tableau Hyper process")
+        except Exception as err:
+            logger.warning("Failed to stop the shared Tableau Hyper process: {}".format(err))
+
+    def stop_if_idle(self):
+        with self.lock:
+            if self.idle_timer is threading.current_thread() and self.leases_count == 0:
+                self.idle_timer = None
+                self.stop()
+
+    def cancel_idle_timer(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+    def reset_after_fork(self):
+        """
+        A forked child inherits the pool of its parent, but not its leases: it starts its own hyperd
+        """
+        if self.pid == os.getpid():
+            return
+        if self.hyper is not None:
+            self.inherited_processes.append(self.hyper)
+        self.pid = os.getpid()
+        self.hyper = None
+        self.leases_count = 0
+        self.idle_timer = None
+
+    def shutdown(self):
+        """
+        Stop the process regardless of the leases, called when the interpreter exits
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                return
+            self.cancel_idle_timer()
+            self.leases_count = 0
+            self.stop()
+
+
+hyper_process_pool = HyperProcessPool()
+atexit.register(hyper_process_pool.shutdown)
+
+
+def get_shared_hyper_process():
+    """
+    Lease the Tableau Hyper process shared by the readers and writers of this Python process
+
+    :return: a HyperProcessLease, to be closed once the connections to its endpoint are closed
+    """
+    return hyper_process_pool.acquire()
@@ -0,0 +1,115 @@
+"""
+Background insertion of the batches of converted rows
+
+Used by the writer when the pipelined mode is enabled: converting the next batch on the caller's thread
+overlaps with the insertion of the previous one.
+"""
+
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+DEFAULT_QUEUE_SIZE = 2
+QUEUE_TIMEOUT = 1
+
+
+class PipelinedInserter(object):
+    """
+    Wrap a Tableau Hyper inserter (or any object with the same add_rows/execute/close interface)
+    so that `add_rows` hands the batch over to a background thread.
+
+    At most `queue_size` batches wait for insertion, `add_rows` blocks when the queue is full.
+    An error raised by the background thread is raised again by the next call to `add_rows` or `execute`.
+    """
+
+    def __init__(self, inserter, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        :param inserter: the wrapped inserter
+        :param queue_size: maximum number of batches waiting for insertion
+        """
+        self.inserter = inserter
+        self.batches = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.stopping = False
+        self.thread = threading.Thread(target=self.insert_batches, name="hyper-inserter", daemon=True)
+        self.thread.start()
+
+    @property
+    def is_open(self):
+        return self.inserter.is_open
+
+    def insert_batches(self):
+        """
+        Background thread: insert the batches until the None end marker
+        """
+        while True:
+            batch = self.batches.get()
+            if batch is None:
+                return
+            if self.error is not None or self.stopping:
+                # Keep consuming so that the producer is never blocked
+                continue
+            try:
+                self.inserter.add_rows(batch)
+            except Exception as err:
+                logger.warning("Background insertion failed: {}".format(err))
+                self.error = err
+
+    def raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def put(self, batch):
+        """
+        Queue a batch, waiting while the queue is full
+        """
+        while True:
+            self.raise_error()
+            if not self.thread.is_alive():
+                raise RuntimeError("The background insertion thread is stopped")
+            try:
+                self.batches.put(batch, timeout=QUEUE_TIMEOUT)
+                return
+            except queue.Full:
+                pass
+
+    def add_rows(self, hyper_rows):
+        """
+        Queue a batch of rows already converted to Tableau Hyper
+
+        :param hyper_rows: list of tableau hyper compliant rows
+        """
+        self.put(hyper_rows)
+
+    def wait(self):
+        """
+        Wait for the queued batches to be inserted
+        """
+        if self.thread.is_alive():
+            self.put(None)
+            self.thread.join()
+        self.raise_error()
+
+    def execute(self):
+        """
+        Insert the queued batches, then commit
+        """
+        self.wait()
+        self.inserter.execute()
+
+    def close(self):
+        """
+        Discard the queued batches and close the wrapped inserter
+        """
+        self.stopping = True
+        while self.thread.is_alive():
+            try:
+                self.batches.put(None, timeout=QUEUE_TIMEOUT)
+                break
+            except queue.Full:
+                pass
+        self.thread.join()
+        self.inserter.close()
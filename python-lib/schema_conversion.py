@@ -5,6 +5,7 @@ Helper functions and class definition for conversion between schema in DSS and T
 
 from tableauhyperapi import TableDefinition
 from type_conversion import TypeConversion
+from type_conversion import TimestampParser
 
 import copy
 import logging
@@ -57,7 +58,9 @@ class SchemaConversion:
         """
         self.type_converter = TypeConversion(config, export_geometry_as_string)
         self.dss_storage_types = []
+        self.dss_to_hyper_converters = []
         self.hyper_storage_types = []
+        self.hyper_to_dss_converters = []
 
     def dss_columns_to_hyper_columns(self, dss_columns):
         """
@@ -94,17 +97,29 @@ class SchemaConversion:
 
     def set_dss_storage_types(self, dss_storage_types):
         """
-        Store DSS storage types
+        Store DSS storage types and compile the conversion plan used by `prepare_row_to_hyper`
 
         :param dss_storage_types:
         :example
         >>> ['bigint', 'double']
         """
         self.dss_storage_types = dss_storage_types
+        self.dss_to_hyper_converters = self.type_converter.get_dss_to_hyper_converters(dss_storage_types)
+
+    def get_unparsable_values_counts(self):
+        """
+        Count the values which could not be parsed as dates, and were converted to null, since the plan was compiled
+
+        :return: dict {column index: count of unparsable values}, for the columns having some
+        """
+        return {
+            index: converter.unparsable_count for index, converter in enumerate(self.dss_to_hyper_converters)
+            if isinstance(converter, TimestampParser) and converter.unparsable_count > 0
+        }
 
     def set_hyper_storage_types(self, hyper_storage_types):
         """
-        Store Tableau Hyper storage types
+        Store Tableau Hyper storage types and compile the conversion plan used by `prepare_row_to_dss`
 
         :param hyper_storage_types: array containing the type tags of the Tableau Hyper columns
         >>> from tableauhyperapi import SqlType
@@ -112,6 +127,7 @@ class SchemaConversion:
         >>> assert SqlType.double().tag == TypeTag.DOUBLE
         """
         self.hyper_storage_types = hyper_storage_types
+        self.hyper_to_dss_converters = self.type_converter.get_hyper_to_dss_converters(hyper_storage_types)
 
     def prepare_row_to_dss(self, hyper_row):
         """
@@ -120,9 +136,55 @@ class SchemaConversion:
         :param hyper_row: row of values coming from Tableau Hyper
         :return dss_row: dss compliant row
         """
-        dss_row = [self.type_converter.hyper_value_to_dss(value_, type_) for value_, type_ in zip(hyper_row, self.hyper_storage_types)]
+        try:
+            dss_row = [convert(value_) for convert, value_ in zip(self.hyper_to_dss_converters, hyper_row)]
+        except Exception:
+            # Replay the row through the generic conversion to log the faulty value before raising
+            dss_row = [self.type_converter.hyper_value_to_dss(value_, type_) for value_, type_ in zip(hyper_row, self.hyper_storage_types)]
         return dss_row
 
+    def prepare_row_to_dss_dict(self, hyper_row, dss_column_names):
+        """
+        Transform a row coming from Tableau Hyper into the dict expected by DSS, in a single pass
+
+        :param hyper_row: row of values coming from Tableau Hyper
+        :param dss_column_names: names of the DSS columns, in the order of the Tableau Hyper columns
+        :return dss_row: dict {column name: dss compliant value}
+        """
+        try:
+            return {name: convert(value_) for name, convert, value_ in zip(dss_column_names, self.hyper_to_dss_converters, hyper_row)}
+        except Exception:
+            return dict(zip(dss_column_names, self.prepare_row_to_dss(hyper_row)))
+
+    def prepare_rows_to_dss(self, hyper_rows):
+        """
+        Transform a batch of rows coming from Tableau Hyper, converting it column by column to the DSS types
+
+        :param hyper_rows: list of rows of values coming from Tableau Hyper
+        :return dss_rows: list of dss compliant rows, as tuples
+        """
+        if not hyper_rows:
+            return []
+        try:
+            dss_columns = [
+                self.type_converter.hyper_column_to_dss(values, type_, convert)
+                for values, type_, convert in zip(zip(*hyper_rows), self.hyper_storage_types, self.hyper_to_dss_converters)
+            ]
+        except Exception:
+            # Replay the rows one by one to log the faulty value before raising
+            return [tuple(self.prepare_row_to_dss(hyper_row)) for hyper_row in hyper_rows]
+        return list(zip(*dss_columns))
+
+    def prepare_rows_to_dss_dicts(self, hyper_rows, dss_column_names):
+        """
+        Transform a batch of rows coming from Tableau Hyper into the dicts expected by DSS, column by column
+
+        :param hyper_rows: list of rows of values coming from Tableau Hyper
+        :param dss_column_names: names of the DSS columns, in the order of the Tableau Hyper columns
+        :return dss_rows: list of dict {column name: dss compliant value}
+        """
+        return [dict(zip(dss_column_names, dss_row)) for dss_row in self.prepare_rows_to_dss(hyper_rows)]
+
     def prepare_row_to_hyper(self, dss_row):
         """
         Transform value with respect to specified type in Tableau Hyper dataset
@@ -130,5 +192,24 @@ class SchemaConversion:
         :param dss_row: row of values coming from DSS dataset
         :return hyper_row: tableau hyper compliant row
         """
-        hyper_row = [self.type_converter.dss_value_to_hyper(value_, type_) for value_, type_ in zip(dss_row, self.dss_storage_types)]
+        try:
+            hyper_row = [convert(value_) for convert, value_ in zip(self.dss_to_hyper_converters, dss_row)]
+        except Exception:
+            # Replay the row through the generic conversion to log the faulty value before raising
+            hyper_row = [self.type_converter.dss_value_to_hyper(value_, type_) for value_, type_ in zip(dss_row, self.dss_storage_types)]
         return hyper_row
+
+    def prepare_dataframe_to_hyper(self, dss_dataframe):
+        """
+        Transform a chunk of DSS dataset, converting it column by column to the Tableau Hyper types
+
+        :param dss_dataframe: pandas DataFrame whose columns match the stored DSS storage types
+        :return hyper_rows: list of tableau hyper compliant rows
+        """
+        if len(dss_dataframe.columns) != len(self.dss_storage_types):
+            raise ValueError("The dataframe has {} columns but the schema has {} columns".format(
+                len(dss_dataframe.columns), len(self.dss_storage_types)))
+        hyper_columns = []
+        for index, (type_, convert) in enumerate(zip(self.dss_storage_types, self.dss_to_hyper_converters)):
+            hyper_columns.append(self.type_converter.dss_series_to_hyper(dss_dataframe.iloc[:, index], type_, convert))
+        return list(zip(*hyper_columns))
@@ -0,0 +1,243 @@
+"""
+Local cache of the spooled Tableau Hyper files
+
+The format extractor is run several times on the same file (schema detection, preview, build). The spooled copies
+are kept in a cache directory, named after the size and SHA-256 of their content, together with the columns read
+from their catalog. The least recently used files are evicted once the cache exceeds its disk budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from tableauhyperapi import Name
+from tableauhyperapi import Nullability
+from tableauhyperapi import SqlType
+from tableauhyperapi import TableDefinition
+from tableauhyperapi import TypeTag
+
+from stream_spool import get_unbuffered_file_descriptor
+from stream_spool import hash_stream
+from stream_spool import spool_stream
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+CACHE_DIRECTORY_NAME = "dss_hyper_spool_cache"
+CACHED_FILE_EXTENSION = ".hyper"
+METADATA_FILE_EXTENSION = ".json"
+
+# Types of the cached columns, built back with their length, precision and scale
+SQL_TYPES = {
+    TypeTag.BOOL: SqlType.bool,
+    TypeTag.BIG_INT: SqlType.big_int,
+    TypeTag.SMALL_INT: SqlType.small_int,
+    TypeTag.INT: SqlType.int,
+    TypeTag.NUMERIC: lambda sql_type: SqlType.numeric(sql_type["precision"], sql_type["scale"]),
+    TypeTag.DOUBLE: SqlType.double,
+    TypeTag.OID: SqlType.oid,
+    TypeTag.BYTES: SqlType.bytes,
+    TypeTag.TEXT: SqlType.text,
+    TypeTag.VARCHAR: lambda sql_type: SqlType.varchar(sql_type["max_length"]),
+    TypeTag.CHAR: lambda sql_type: SqlType.char(sql_type["max_length"]),
+    TypeTag.JSON: SqlType.json,
+    TypeTag.DATE: SqlType.date,
+    TypeTag.INTERVAL: SqlType.interval,
+    TypeTag.TIME: SqlType.time,
+    TypeTag.TIMESTAMP: SqlType.timestamp,
+    TypeTag.TIMESTAMP_TZ: SqlType.timestamp_tz,
+    TypeTag.GEOGRAPHY: SqlType.geography,
+}
+PARAMETRIZED_TYPES = {TypeTag.NUMERIC, TypeTag.VARCHAR, TypeTag.CHAR}
+
+
+def describe_columns(columns):
+    """
+    Describe Tableau Hyper columns as JSON serializable dicts
+
+    :param columns: columns of a table definition or of a query result
+    :return: list of dict, None if a column type cannot be cached
+    """
+    descriptions = []
+    for column in columns:
+        if column.type.tag not in SQL_TYPES:
+            return None
+        nullability = getattr(column, "nullability", Nullability.NULLABLE)
+        descriptions.append({
+            "name": column.name.unescaped,
+            "type": column.type.tag.name,
+            "max_length": column.type.max_length,
+            "precision": column.type.precision,
+            "scale": column.type.scale,
+            "nullable": nullability == Nullability.NULLABLE,
+        })
+    return descriptions
+
+
+def build_columns(descriptions):
+    """
+    Build back the Tableau Hyper columns described by `describe_columns`
+    """
+    columns = []
+    for description in descriptions:
+        tag = TypeTag[description["type"]]
+        if tag in PARAMETRIZED_TYPES:
+            sql_type = SQL_TYPES[tag](description)
+        else:
+            sql_type = SQL_TYPES[tag]()
+        nullability = Nullability.NULLABLE if description["nullable"] else Nullability.NOT_NULLABLE
+        columns.append(TableDefinition.Column(Name(description["name"]), sql_type, nullability))
+    return columns
+
+
+def is_seekable_file(stream):
+    """
+    Whether a stream is a local file that can be read a second time
+    """
+    try:
+        return get_unbuffered_file_descriptor(stream) is not None and stream.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+class SpoolCache(object):
+    """
+    Directory of spooled Tableau Hyper files, with a least recently used eviction under a disk budget
+    """
+
+    def __init__(self, directory, max_size):
+        """
+        :param directory: cache directory, created if needed
+        :param max_size: disk budget of the cached files, in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def get_cached_file_path(self, key):
+        return os.path.join(self.directory, key + CACHED_FILE_EXTENSION)
+
+    def get_metadata_path(self, key):
+        return os.path.join(self.directory, key + METADATA_FILE_EXTENSION)
+
+    def touch(self, key):
+        """
+        Mark a cached file as the most recently used one
+        """
+        try:
+            os.utime(self.get_cached_file_path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def spool(self, stream):
+        """
+        Copy a stream to the cache, unless a file with the same content is already cached
+
+        A local file stream is hashed first and only copied when missing from the cache, other streams are hashed
+        while they are copied.
+
+        :param stream: file-like object to read until its end
+        :return: path of the cached file
+        """
+        start = time.time()
+        if is_seekable_file(stream):
+            start_position = stream.tell()
+            hasher = hashlib.sha256()
+            size = hash_stream(stream, hasher)
+            key = "{}-{}".format(size, hasher.hexdigest())
+            if self.touch(key):
+                logger.info("Found {} in the spool cache, hashed in {:.2f}s".format(key, time.time() - start))
+                return self.get_cached_file_path(key)
+            stream.seek(start_position)
+            hasher = None
+        else:
+            hasher = hashlib.sha256()
+        spooled_file_path = tempfile.NamedTemporaryFile(suffix=CACHED_FILE_EXTENSION, prefix="tmp_hyper_file_",
+                                                        dir=self.directory, delete=False).name
+        try:
+            size = spool_stream(stream, spooled_file_path, hasher=hasher)
+            if hasher is not None:
+                key = "{}-{}".format(size, hasher.hexdigest())
+            if self.touch(key):
+                logger.info("Found {} in the spool cache".format(key))
+                os.remove(spooled_file_path)
+            else:
+                # Renamed once complete, the cache never contains partial files
+                os.replace(spooled_file_path, self.get_cached_file_path(key))
+                logger.info("Added {} to the spool cache".format(key))
+        except Exception:
+            if os.path.exists(spooled_file_path):
+                os.remove(spooled_file_path)
+            raise
+        self.evict(keep_key=key)
+        return self.get_cached_file_path(key)
+
+    def evict(self, keep_key=None):
+        """
+        Remove the least recently used files until the cache fits in its disk budget
+
+        :param keep_key: key of a file never evicted, the one about to be read
+        """
+        cached_files = []
+        for file_name in os.listdir(self.directory):
+            key, extension = os.path.splitext(file_name)
+            if extension != CACHED_FILE_EXTENSION or file_name.startswith("tmp_"):
+                continue
+            try:
+                file_stat = os.stat(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                continue
+            cached_files.append((file_stat.st_mtime, file_stat.st_size, key))
+        cache_size = sum(size for _, size, _ in cached_files)
+        for _, size, key in sorted(cached_files):
+            if cache_size <= self.max_size:
+                break
+            if key == keep_key:
+                continue
+            for path in [self.get_cached_file_path(key), self.get_metadata_path(key)]:
+                if os.path.exists(path):
+                    os.remove(path)
+            cache_size -= size
+            logger.info("Evicted {} from the spool cache".format(key))
+
+    def get_key(self, cached_file_path):
+        return os.path.splitext(os.path.basename(cached_file_path))[0]
+
+    def read_metadata(self, key):
+        try:
+            with open(self.get_metadata_path(key)) as metadata_file:
+                return json.load(metadata_file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def get_columns(self, cached_file_path, source):
+        """
+        Retrieve the columns cached for a source of a cached file
+
+        :param source: string identifying the table or SQL query read in the file
+        :return: list of Tableau Hyper columns, None if not cached
+        """
+        descriptions = self.read_metadata(self.get_key(cached_file_path)).get("columns", {}).get(source)
+        if descriptions is None:
+            return None
+        return build_columns(descriptions)
+
+    def set_columns(self, cached_file_path, source, columns):
+        """
+        Cache the columns of a source of a cached file, next to it
+        """
+        descriptions = describe_columns(columns)
+        if descriptions is None:
+            return
+        key = self.get_key(cached_file_path)
+        metadata = self.read_metadata(key)
+        metadata.setdefault("columns", {})[source] = descriptions
+        metadata_file_path = tempfile.NamedTemporaryFile(suffix=METADATA_FILE_EXTENSION, prefix="tmp_metadata_",
+                                                         dir=self.directory, delete=False).name
+        with open(metadata_file_path, "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+        os.replace(metadata_file_path, self.get_metadata_path(key))
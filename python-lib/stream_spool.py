@@ -0,0 +1,144 @@
+"""
+Copy of the incoming DSS streams to local files
+
+hyperd only reads local files, so the imported Tableau Hyper files are first spooled to the local disk.
+"""
+
+import errno
+import io
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+SPOOL_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Errors meaning that the OS cannot copy between these two file descriptors, the copy falls back to buffers
+UNSUPPORTED_OS_COPY_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EBADF, errno.ENOTSUP, errno.EOPNOTSUPP}
+
+
+def get_unbuffered_file_descriptor(stream):
+    """
+    Retrieve the file descriptor backing a stream, when reading it directly does not skip any buffered data
+
+    :param stream: file-like object
+    :return: file descriptor, None if the stream is not backed by a file descriptor
+    """
+    try:
+        file_descriptor = stream.fileno()
+        if stream.tell() != os.lseek(file_descriptor, 0, os.SEEK_CUR):
+            # Some data was already read ahead in the Python buffer of the stream
+            return None
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        return None
+    return file_descriptor
+
+
+def os_copy(copy_chunk, source_fd, destination_fd, buffer_size):
+    """
+    Copy a file descriptor until its end with an OS-level copy function
+
+    :param copy_chunk: os.copy_file_range or os.sendfile like function copying at most `buffer_size` bytes
+    :return: number of copied bytes, None if the OS cannot copy between these file descriptors
+    """
+    copied_size = 0
+    while True:
+        try:
+            chunk_size = copy_chunk(source_fd, destination_fd, buffer_size)
+        except OSError as err:
+            if copied_size == 0 and err.errno in UNSUPPORTED_OS_COPY_ERRNOS:
+                return None
+            raise
+        if chunk_size == 0:
+            return copied_size
+        copied_size += chunk_size
+
+
+def get_os_copy_functions():
+    os_copy_functions = []
+    if hasattr(os, "copy_file_range"):
+        os_copy_functions.append(("copy_file_range", os.copy_file_range))
+    if hasattr(os, "sendfile"):
+        os_copy_functions.append((
+            "sendfile",
+            lambda source_fd, destination_fd, count: os.sendfile(destination_fd, source_fd, None, count)
+        ))
+    return os_copy_functions
+
+
+def buffered_copy(stream, destination_file, buffer_size, hasher=None):
+    copied_size = 0
+    buffer = stream.read(buffer_size)
+    while buffer:
+        destination_file.write(buffer)
+        if hasher is not None:
+            hasher.update(buffer)
+        copied_size += len(buffer)
+        buffer = stream.read(buffer_size)
+    return copied_size
+
+
+def hash_stream(stream, hasher, buffer_size=SPOOL_BUFFER_SIZE):
+    """
+    Read a stream until its end to hash its content, without copying it
+
+    :param hasher: hashlib object updated with the content of the stream
+    :return: number of read bytes
+    """
+    read_size = 0
+    buffer = stream.read(buffer_size)
+    while buffer:
+        hasher.update(buffer)
+        read_size += len(buffer)
+        buffer = stream.read(buffer_size)
+    return read_size
+
+
+def spool_stream(stream, destination_path, buffer_size=SPOOL_BUFFER_SIZE, hasher=None):
+    """
+    Copy a stream to a local file, with an OS-level copy when the stream is backed by a file descriptor
+
+    :param stream: file-like object to read until its end
+    :param destination_path: path of the local file, overwritten
+    :param buffer_size: size of the copied chunks in bytes
+    :param hasher: optional hashlib object updated with the copied content, the copy is then always buffered
+    :return: number of copied bytes
+    """
+    start = time.time()
+    copied_size = None
+    with open(destination_path, "wb") as destination_file:
+        source_fd = get_unbuffered_file_descriptor(stream) if hasher is None else None
+        if source_fd is not None:
+            for copy_method, copy_chunk in get_os_copy_functions():
+                copied_size = os_copy(copy_chunk, source_fd, destination_file.fileno(), buffer_size)
+                if copied_size is not None:
+                    break
+        if copied_size is None:
+            copy_method = "buffered copy"
+            copied_size = buffered_copy(stream, destination_file, buffer_size, hasher)
+    duration = time.time() - start
+    size_mb = copied_size / (1024 * 1024)
+    logger.info("Spooled {:.1f} MB to {} in {:.2f}s ({:.1f} MB/s, {})".format(
+        size_mb, destination_path, duration, size_mb / duration if duration > 0 else float("inf"), copy_method))
+    return copied_size
+
+
+def write_file_to_stream(source_path, stream, buffer_size=SPOOL_BUFFER_SIZE):
+    """
+    Copy a local file to an outgoing stream, in chunks of `buffer_size` bytes
+
+    :param source_path: path of the local file
+    :param stream: writable file-like object
+    :return: number of copied bytes
+    """
+    start = time.time()
+    with open(source_path, "rb") as source_file:
+        copied_size = buffered_copy(source_file, stream, buffer_size)
+    stream.flush()
+    duration = time.time() - start
+    size_mb = copied_size / (1024 * 1024)
+    logger.info("Streamed {:.1f} MB from {} in {:.2f}s ({:.1f} MB/s)".format(
+        size_mb, source_path, duration, size_mb / duration if duration > 0 else float("inf")))
+    return copied_size
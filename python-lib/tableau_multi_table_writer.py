@@ -0,0 +1,148 @@
+"""
+Writer of several DSS datasets as the tables of a single Tableau Hyper file
+
+Star schemas are exported as one fact table and several dimension tables in the same file, written through one
+Tableau Hyper process. The fact table is streamed through the main connection to the file, while the smaller tables
+are loaded concurrently by background threads, each with its own connection to the same file.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from tableauhyperapi import Connection
+from tableauhyperapi import CreateMode
+
+from hyper_process_pool import get_shared_hyper_process
+from tableau_table_writer import TableauTableWriter
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+DEFAULT_CONCURRENT_TABLES = 2
+
+
+class TableauMultiTableWriter(object):
+    """
+    Write several tables to one Tableau Hyper file, replaced when opened.
+
+    The tables written with `create_table_writer` share the main connection and must be written one after the other.
+    The tables submitted with `load_table` are written in the background, while the main connection is in use.
+    """
+
+    def __init__(self, config, export_geometry_as_string=False):
+        """
+        :param config: the writer config, shared by all the tables. `concurrent_tables` is the number of tables
+            loaded at the same time in the background.
+        """
+        self.config = config or {}
+        self.export_geometry_as_string = export_geometry_as_string
+        if int(self.config.get("parallel_workers") or 1) > 1:
+            raise ValueError("Parallel workers cannot be combined with several tables in one file")
+        self.concurrent_tables = int(self.config.get("concurrent_tables") or DEFAULT_CONCURRENT_TABLES)
+
+        self.output_file = None
+        self.hyper = None
+        self.connection = None
+        self.executor = None
+        self.loads = []
+        self.table_names = set()
+        self.rows_counts = {}
+        # Schemas are created by one connection at a time, whatever the thread
+        self.catalog_lock = threading.Lock()
+
+    def open(self, destination_file_path):
+        """
+        Create the Tableau Hyper file, replacing any existing file
+
+        :param destination_file_path: path of the Tableau Hyper file to write
+        """
+        self.output_file = destination_file_path
+        logger.info("Writing several tables to the Tableau Hyper file {}".format(destination_file_path))
+        self.hyper = get_shared_hyper_process()
+        self.connection = Connection(self.hyper.endpoint, self.output_file, CreateMode.CREATE_AND_REPLACE)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrent_tables, thread_name_prefix="hyper_table_load")
+
+    def register_table(self, schema_name, table_name):
+        if (schema_name, table_name) in self.table_names:
+            raise ValueError("Table {}.{} is written twice to the same file".format(schema_name, table_name))
+        self.table_names.add((schema_name, table_name))
+
+    def create_schema(self, writer, schema_dss, connection):
+        with self.catalog_lock:
+            connection.catalog.create_schema_if_not_exists(writer.schema_name)
+        writer.create_schema(schema_dss, self.output_file, connection=connection)
+
+    def create_table_writer(self, schema_name, table_name, schema_dss):
+        """
+        Create a table written through the main connection, for instance the fact table streamed row by row
+
+        :param schema_dss: DSS schema of the rows to write
+        :return: a TableauTableWriter, to be closed before the next use of the main connection
+        """
+        self.register_table(schema_name, table_name)
+        writer = TableauTableWriter(self.config, schema_name, table_name, self.export_geometry_as_string)
+        self.create_schema(writer, schema_dss, self.connection)
+        return writer
+
+    def load_table(self, schema_name, table_name, schema_dss, rows):
+        """
+        Write a table in the background, for instance a dimension table
+
+        :param schema_dss: DSS schema of the rows to write
+        :param rows: iterable of rows, read by a background thread
+        """
+        self.register_table(schema_name, table_name)
+        self.loads.append((schema_name, table_name, self.executor.submit(
+            self.write_table, schema_name, table_name, schema_dss, rows)))
+
+    def write_table(self, schema_name, table_name, schema_dss, rows):
+        """
+        Write all the rows of a table through a new connection to the file
+
+        :return: number of rows written
+        """
+        start = time.time()
+        # The additional tables are sorted on the sort columns when they have all of them
+        sort_column_names = self.config.get("sort_columns") or []
+        column_names = [column['name'] for column in schema_dss['columns']]
+        if not all(column_name in column_names for column_name in sort_column_names):
+            logger.info("The table {}.{} does not have all the sort columns, it is not sorted".format(
+                schema_name, table_name))
+            sort_column_names = []
+        writer = TableauTableWriter(dict(self.config, sort_columns=sort_column_names), schema_name, table_name,
+                                    self.export_geometry_as_string)
+        with Connection(self.hyper.endpoint, self.output_file, CreateMode.NONE) as connection:
+            self.create_schema(writer, schema_dss, connection)
+            try:
+                for row in rows:
+                    writer.write_row(row)
+            finally:
+                writer.close()
+        logger.info("Loaded {} rows to {}.{} in {:.2f}s".format(
+            writer.row_index, schema_name, table_name, time.time() - start))
+        return writer.row_index
+
+    def close(self):
+        """
+        Wait for the tables loaded in the background, then close the file
+
+        :return: dict {(schema name, table name): number of rows} of the tables loaded in the background
+        """
+        try:
+            self.executor.shutdown(wait=True)
+            errors = []
+            for schema_name, table_name, load in self.loads:
+                try:
+                    self.rows_counts[(schema_name, table_name)] = load.result()
+                except Exception as err:
+                    logger.warning("Failed to load the table {}.{}: {}".format(schema_name, table_name, err))
+                    errors.append(err)
+            if errors:
+                raise errors[0]
+        finally:
+            self.connection.close()
+            self.hyper.close()
+        logger.info("Wrote {} tables to {}".format(len(self.table_names), self.output_file))
+        return self.rows_counts
@@ -0,0 +1,281 @@
+"""
+Multi-process variant of the Tableau Hyper formatter reader
+
+The rows of the table are split into partitions, on ranges of a numeric column or on a hash of any column. Each
+partition is read by a worker process, through its own connection to the hyperd of the reader, and converted to DSS
+rows in that process before being sent back to the reader.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import traceback
+
+from tableauhyperapi import Connection
+from tableauhyperapi import Endpoint
+from tableauhyperapi import TypeTag
+
+from schema_conversion import SchemaConversion
+from tableau_table_reader import READ_MODE_ROWS
+from tableau_table_reader import TableauTableReader
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+PARTITION_METHOD_HASH = "HASH"
+PARTITION_METHOD_RANGE = "RANGE"
+# Ranges on integer partition columns, hash otherwise
+PARTITION_METHOD_AUTO = "AUTO"
+PARTITION_METHODS = [PARTITION_METHOD_AUTO, PARTITION_METHOD_HASH, PARTITION_METHOD_RANGE]
+INTEGER_TYPES = {TypeTag.SMALL_INT, TypeTag.INT, TypeTag.BIG_INT}
+RANGE_PARTITION_TYPES = INTEGER_TYPES | {TypeTag.NUMERIC, TypeTag.DOUBLE}
+
+# hyperd has no hash function, the buckets are computed from the first hexadecimal digits of the MD5 of the values.
+# Each worker hashes all the rows of the table to select its partition, which makes hash partitions much more
+# expensive to filter than ranges.
+HEX_DIGITS = "0123456789abcdef"
+HASH_DIGITS_COUNT = 4
+
+QUEUE_SIZE = 8
+QUEUE_TIMEOUT = 1
+USER_AGENT = "dss-plugin-tableau-hyper partitioned reader"
+
+
+def create_table_reader(config, schema_name, table_name):
+    """
+    Instantiate the reader matching the `parallel_read_workers` setting of the format config
+
+    :return: a TableauPartitionedTableReader when several workers are requested, a TableauTableReader otherwise
+    """
+    workers_count = int((config or {}).get("parallel_read_workers") or 1)
+    if workers_count > 1:
+        return TableauPartitionedTableReader(config, schema_name, table_name, workers_count)
+    return TableauTableReader(config, schema_name, table_name)
+
+
+def get_hash_expression(column_name):
+    """
+    Build the SQL expression of a non-negative hash of a column, nulls included
+
+    :param column_name: escaped name of the column, as `str(Name(...))`
+    """
+    hashed_value = f"MD5(COALESCE(CAST({column_name} AS text), ''))"
+    digits = [
+        f"(STRPOS('{HEX_DIGITS}', SUBSTR({hashed_value}, {position}, 1)) - 1) * {16 ** (HASH_DIGITS_COUNT - position)}"
+        for position in range(1, HASH_DIGITS_COUNT + 1)
+    ]
+    return " + ".join(digits)
+
+
+def get_hash_conditions(column_name, partitions_count):
+    """
+    :return: one SQL condition per partition, on the hash of the column
+    """
+    hash_expression = get_hash_expression(column_name)
+    return [f"({hash_expression}) % {partitions_count} = {index}" for index in range(partitions_count)]
+
+
+def get_range_boundaries(min_value, max_value, partitions_count, is_integer):
+    """
+    Split [min_value, max_value] into ranges of equal width
+
+    :return: the lower boundaries of the partitions, except the first one
+    """
+    if is_integer:
+        width = max_value - min_value + 1
+        return [min_value + width * index // partitions_count for index in range(1, partitions_count)]
+    return [min_value + (max_value - min_value) * index / partitions_count for index in range(1, partitions_count)]
+
+
+def get_range_conditions(column_name, boundaries):
+    """
+    :param column_name: escaped name of the column, as `str(Name(...))`
+    :param boundaries: lower boundaries of the partitions, except the first one
+    :return: one SQL condition per partition, the null values being read with the first partition
+    """
+    literals = [repr(boundary) if isinstance(boundary, float) else str(boundary) for boundary in boundaries]
+    conditions = [f"{column_name} < {literals[0]} OR {column_name} IS NULL"]
+    for lower_boundary, upper_boundary in zip(literals[:-1], literals[1:]):
+        conditions.append(f"{column_name} >= {lower_boundary} AND {column_name} < {upper_boundary}")
+    conditions.append(f"{column_name} >= {literals[-1]}")
+    return conditions
+
+
+def read_partition(connection_descriptor, database_path, sql_query, partition_index, config, hyper_storage_types,
+                   dss_storage_types, batch_size, batches_queue):
+    """
+    Worker process: read the result of the query of one partition, and send it to `batches_queue` as batches of
+    DSS rows, as tuples which are smaller to pickle than dicts. A None batch is sent once the partition is entirely
+    read.
+    """
+    try:
+        schema_converter = SchemaConversion(config)
+        schema_converter.set_dss_storage_types(dss_storage_types)
+        schema_converter.set_hyper_storage_types(hyper_storage_types)
+        with Connection(Endpoint(connection_descriptor, USER_AGENT), database_path) as connection:
+            with connection.execute_query(sql_query) as result:
+                result_rows = iter(result)
+                hyper_rows = list(itertools.islice(result_rows, batch_size))
+                while hyper_rows:
+                    rows = schema_converter.prepare_rows_to_dss(hyper_rows)
+                    batches_queue.put((partition_index, rows, None))
+                    hyper_rows = list(itertools.islice(result_rows, batch_size))
+        batches_queue.put((partition_index, None, None))
+    except Exception:
+        batches_queue.put((partition_index, None, traceback.format_exc()))
+
+
+class TableauPartitionedTableReader(TableauTableReader):
+    """
+    Reader splitting the table into partitions read and converted by several processes.
+
+    The rows are not read in the file order. The partitions can also be read one by one with `read_partition_rows`,
+    for instance by a recipe writing them to the partitions of a DSS dataset.
+    """
+
+    def __init__(self, config, schema_name, table_name, workers_count=2):
+        """
+        :param schema_name: name of the schema as stored in the Tableau Hyper file
+        :param table_name: name of the table as stored in the Tableau Hyper file
+        :param workers_count: number of partitions, and of worker processes reading them
+        """
+        TableauTableReader.__init__(self, config, schema_name, table_name)
+        self.config = config
+        self.workers_count = workers_count
+        self.partition_method = (config or {}).get("partition_method") or PARTITION_METHOD_AUTO
+        self.partition_column_name = (config or {}).get("partition_column") or None
+        if self.partition_method not in PARTITION_METHODS:
+            raise ValueError("Invalid partition method {}, expected one of {}".format(
+                self.partition_method, ", ".join(PARTITION_METHODS)))
+        if self.partition_column_name is None:
+            raise ValueError("A partition column is required to read with several workers")
+        if self.read_mode != READ_MODE_ROWS:
+            raise ValueError("Parallel reads are only available in the {} read mode".format(READ_MODE_ROWS))
+        if self.max_rows > 0:
+            raise ValueError("Parallel reads cannot be combined with a maximum number of rows")
+
+        self.partition_conditions = None
+        self.workers = []
+        self.batches_queue = None
+        self.finished_partitions = set()
+        self.stopped_partitions = set()
+
+    def get_partition_column(self):
+        """
+        Retrieve the partition column among the columns of the table, selected or not
+        """
+        for column in self.source_columns:
+            if column.name.unescaped == self.partition_column_name:
+                return column
+        raise Exception("Partition column does not exist: {}".format(self.partition_column_name))
+
+    def get_partition_conditions(self):
+        """
+        Compute the SQL conditions splitting the rows of the table into `workers_count` partitions
+
+        :return: list of SQL conditions, one per partition
+        """
+        if self.partition_conditions is not None:
+            return self.partition_conditions
+        partition_column = self.get_partition_column()
+        column_name = str(partition_column.name)
+        if self.partition_method == PARTITION_METHOD_AUTO:
+            is_integer = partition_column.type.tag in INTEGER_TYPES
+            self.partition_method = PARTITION_METHOD_RANGE if is_integer else PARTITION_METHOD_HASH
+        if self.partition_method == PARTITION_METHOD_HASH:
+            self.partition_conditions = get_hash_conditions(column_name, self.workers_count)
+        else:
+            if partition_column.type.tag not in RANGE_PARTITION_TYPES:
+                raise ValueError("Range partitions require a numeric partition column, {} is {}".format(
+                    self.partition_column_name, partition_column.type))
+            min_value, max_value = self.connection.execute_list_query(
+                f"SELECT MIN({column_name}), MAX({column_name}) {self.build_from_clause()}")[0]
+            if min_value is None:
+                # No rows, or only null values, all read with the first partition
+                self.partition_conditions = [f"{column_name} IS NULL"] + ["FALSE"] * (self.workers_count - 1)
+            else:
+                boundaries = get_range_boundaries(min_value, max_value, self.workers_count,
+                                                  partition_column.type.tag in INTEGER_TYPES)
+                self.partition_conditions = get_range_conditions(column_name, boundaries)
+        logger.info("Split {} into {} partitions on {} of {}".format(
+            self.describe_source(), self.workers_count, self.partition_method.lower(), self.partition_column_name))
+        return self.partition_conditions
+
+    def start_workers(self):
+        """
+        Start one worker process per partition
+        """
+        logger.info("Starting {} read workers".format(self.workers_count))
+        # Workers are spawned: the Tableau Hyper API does not support being used from a forked process
+        context = multiprocessing.get_context("spawn")
+        self.batches_queue = context.Queue(QUEUE_SIZE)
+        connection_descriptor = self.hyper.endpoint.connection_descriptor
+        for partition_index, partition_condition in enumerate(self.get_partition_conditions()):
+            worker = context.Process(
+                target=read_partition,
+                args=(connection_descriptor, self.path_to_hyper, self.build_select_query(partition_condition),
+                      partition_index, self.config, self.hyper_storage_types, self.dss_storage_types,
+                      self.limit, self.batches_queue),
+                daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+
+    def next_batch(self):
+        """
+        Retrieve the next batch of DSS rows sent by any of the workers
+
+        :return: list of dict {column name: dss compliant value}, empty once all the partitions are read
+        """
+        if not self.workers:
+            self.start_workers()
+        while len(self.finished_partitions) < self.workers_count:
+            try:
+                partition_index, rows, error = self.batches_queue.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                for partition_index, worker in enumerate(self.workers):
+                    if partition_index in self.finished_partitions or worker.is_alive():
+                        continue
+                    # A worker sending its end marker right before exiting is given one more timeout
+                    if partition_index in self.stopped_partitions:
+                        raise Exception("Read worker {} stopped unexpectedly".format(partition_index))
+                    self.stopped_partitions.add(partition_index)
+                continue
+            if error is not None:
+                logger.warning("Read worker {} failed:\n{}".format(partition_index, error))
+                raise Exception("Read worker {} failed: {}".format(partition_index, error.strip().splitlines()[-1]))
+            if rows is None:
+                logger.info("Read worker {} finished".format(partition_index))
+                self.finished_partitions.add(partition_index)
+                continue
+            self.offset += len(rows)
+            return [dict(zip(self.dss_column_names, row)) for row in rows]
+        return []
+
+    def read_partition_rows(self, partition_index):
+        """
+        Read the rows of one partition in the current process
+
+        :param partition_index: index of the partition, from 0 to `workers_count` - 1
+        :return: generator of dict {column name: dss compliant value}
+        """
+        sql_query = self.build_select_query(self.get_partition_conditions()[partition_index])
+        prepare_row_to_dss_dict = self.schema_converter.prepare_row_to_dss_dict
+        with self.connection.execute_query(sql_query) as result:
+            for hyper_row in result:
+                yield prepare_row_to_dss_dict(hyper_row, self.dss_column_names)
+
+    def stop_workers(self):
+        for worker in self.workers:
+            if worker.is_alive():
+                worker.terminate()
+            worker.join()
+        self.workers = []
+
+    def close_connection(self):
+        """
+        Stop the workers, then close the connection to the Tableau Hyper file
+        """
+        self.stop_workers()
+        TableauTableReader.close_connection(self)
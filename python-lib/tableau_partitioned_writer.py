@@ -0,0 +1,314 @@
+"""
+Multi-process variant of the Tableau Hyper exporter writer
+
+Rows are dispatched to worker processes, each of them writing a partial Tableau Hyper file with its own
+TableauTableWriter. The partial files are then merged into the output table by hyperd.
+"""
+
+import logging
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+import traceback
+
+import pandas as pd
+from tableauhyperapi import Connection
+from tableauhyperapi import SchemaName
+from tableauhyperapi import TableDefinition
+from tableauhyperapi import TableName
+
+from schema_conversion import SchemaConversion
+from hyper_process_pool import get_shared_hyper_process
+from tableau_table_writer import TableauTableWriter
+from tableau_table_writer import WRITE_MODE_OVERWRITE
+from tableau_table_writer import get_order_by_clause
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+CHUNK_SIZE = 1000
+QUEUE_SIZE = 8
+QUEUE_TIMEOUT = 1
+
+
+def create_table_writer(config, schema_name, table_name, export_geometry_as_string=False):
+    """
+    Instantiate the writer matching the `parallel_workers` setting of the exporter config
+
+    :return: a TableauPartitionedTableWriter when several workers are requested, a TableauTableWriter otherwise
+    """
+    workers_count = int((config or {}).get("parallel_workers") or 1)
+    if workers_count > 1:
+        if ((config or {}).get("write_mode") or WRITE_MODE_OVERWRITE) != WRITE_MODE_OVERWRITE:
+            raise ValueError("Parallel workers cannot append or upsert rows to an existing table")
+        if int((config or {}).get("checkpoint_rows") or 0) > 0:
+            raise ValueError("Parallel workers cannot checkpoint the export")
+        return TableauPartitionedTableWriter(config, schema_name, table_name, export_geometry_as_string, workers_count)
+    return TableauTableWriter(config, schema_name, table_name, export_geometry_as_string)
+
+
+def write_partition(config, schema_name, table_name, export_geometry_as_string, schema_dss, partition_file_path,
+                    rows_queue, results_queue, partition_index):
+    """
+    Worker process: write the chunks of rows or the DataFrames received from `rows_queue` to a partial Tableau Hyper
+    file, until a None chunk is received. The outcome is sent to `results_queue`.
+    """
+    try:
+        writer = TableauTableWriter(config, schema_name, table_name, export_geometry_as_string)
+        writer.create_schema(schema_dss, partition_file_path)
+        try:
+            chunk = rows_queue.get()
+            while chunk is not None:
+                if isinstance(chunk, pd.DataFrame):
+                    writer.write_dataframe(chunk)
+                else:
+                    for row in chunk:
+                        writer.write_row(row)
+                chunk = rows_queue.get()
+        finally:
+            writer.close()
+        results_queue.put((partition_index, writer.row_index, None))
+    except Exception:
+        results_queue.put((partition_index, None, traceback.format_exc()))
+
+
+class TableauPartitionedTableWriter(object):
+    """
+    Writer splitting the rows of a DSS dataset across several processes, then merging the partial files.
+
+    The rows are not written in their input order.
+    """
+
+    def __init__(self, config, schema_name, table_name, export_geometry_as_string=False, workers_count=2):
+        """
+        :param schema_name: name of the target schema
+        :param table_name: name of the target table
+        :param workers_count: number of worker processes
+        """
+        self.config = config
+        self.schema_name = schema_name
+        self.table_name = table_name
+        self.export_geometry_as_string = export_geometry_as_string
+        self.workers_count = workers_count
+        self.row_index = 0
+        # The partial files are not sorted, the rows of all of them are sorted once while merged
+        self.sort_column_names = (config or {}).get("sort_columns") or []
+        self.sort_duration = 0
+
+        self.schema_converter = SchemaConversion(config, export_geometry_as_string)
+
+        self.schema_dss = None
+        self.output_file = None
+        self.partitions_directory = None
+        self.partition_file_paths = []
+        self.workers = []
+        self.rows_queues = []
+        self.results_queue = None
+        self.chunk = []
+        self.next_partition = 0
+
+    def create_schema(self, schema_dss, destination_file_path):
+        """
+        Start the worker processes, each one creating its partial Tableau Hyper file
+
+        :param schema_dss: DSS schema from the DSS dataset to export
+        :param destination_file_path: path of the final Tableau Hyper file
+        """
+        self.schema_dss = schema_dss
+        self.output_file = destination_file_path
+        dss_column_names = [column['name'] for column in schema_dss['columns']]
+        missing_sort_column_names = [name for name in self.sort_column_names if name not in dss_column_names]
+        if missing_sort_column_names:
+            raise ValueError("Sort columns do not exist: {}".format(", ".join(missing_sort_column_names)))
+        self.partitions_directory = tempfile.mkdtemp(prefix="tmp_hyper_partitions_",
+                                                     dir=os.path.dirname(destination_file_path) or None)
+        logger.info("Starting {} export workers writing partial files in {}".format(
+            self.workers_count, self.partitions_directory))
+
+        # Workers are spawned: a hyperd cannot be started from a process forked after another hyperd was used
+        context = multiprocessing.get_context("spawn")
+        self.results_queue = context.Queue()
+        for partition_index in range(self.workers_count):
+            partition_file_path = os.path.join(self.partitions_directory, "part_{}.hyper".format(partition_index))
+            rows_queue = context.Queue(QUEUE_SIZE)
+            worker = context.Process(
+                target=write_partition,
+                args=(dict(self.config or {}, sort_columns=None), self.schema_name, self.table_name, self.export_geometry_as_string, schema_dss,
+                      partition_file_path, rows_queue, self.results_queue, partition_index),
+                daemon=True
+            )
+            worker.start()
+            self.partition_file_paths.append(partition_file_path)
+            self.rows_queues.append(rows_queue)
+            self.workers.append(worker)
+
+    def write_row(self, row):
+        """
+        Handle one row of data to export
+        :param row: a tuple with N strings matching the schema passed to open method
+        """
+        self.chunk.append(row)
+        self.row_index += 1
+        if len(self.chunk) >= CHUNK_SIZE:
+            self.send_chunk(self.chunk)
+            self.chunk = []
+        return True
+
+    def write_dataframe(self, dataframe):
+        """
+        Handle a chunk of data to export, sent to the workers in slices of CHUNK_SIZE rows converted column by column
+
+        :param dataframe: pandas DataFrame with the columns of the schema passed to create_schema
+        :return: number of rows written
+        """
+        if self.chunk:
+            self.send_chunk(self.chunk)
+            self.chunk = []
+        rows_count = len(dataframe.index)
+        for start in range(0, rows_count, CHUNK_SIZE):
+            self.send_chunk(dataframe.iloc[start:start + CHUNK_SIZE])
+        self.row_index += rows_count
+        return rows_count
+
+    def write_batches(self, dataframes):
+        """
+        Handle a stream of data chunks to export, for instance the output of `dataset.iter_dataframes()`
+
+        :param dataframes: iterable of pandas DataFrames
+        :return: number of rows written
+        """
+        rows_count = 0
+        for dataframe in dataframes:
+            rows_count += self.write_dataframe(dataframe)
+        return rows_count
+
+    def send_chunk(self, chunk):
+        """
+        Send a chunk of rows (or the None end marker) to the next worker, waiting while its queue is full
+        """
+        partition_index = self.next_partition
+        self.next_partition = (self.next_partition + 1) % self.workers_count
+        while True:
+            try:
+                self.rows_queues[partition_index].put(chunk, timeout=QUEUE_TIMEOUT)
+                return
+            except queue.Full:
+                if not self.workers[partition_index].is_alive():
+                    self.raise_worker_error()
+
+    def raise_worker_error(self):
+        """
+        Raise the error reported by a failed worker
+        """
+        while True:
+            try:
+                partition_index, _, error = self.results_queue.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                raise Exception("An export worker stopped unexpectedly")
+            if error is not None:
+                logger.warning("Export worker {} failed:\n{}".format(partition_index, error))
+                raise Exception("Export worker {} failed: {}".format(partition_index, error.strip().splitlines()[-1]))
+
+    def wait_for_workers(self):
+        """
+        Send the end marker to every worker and wait for all the partial files to be written
+        """
+        if self.chunk:
+            self.send_chunk(self.chunk)
+            self.chunk = []
+        for _ in range(self.workers_count):
+            self.send_chunk(None)
+        written_rows_count = 0
+        finished_partitions = set()
+        stopped_partitions = set()
+        while len(finished_partitions) < self.workers_count:
+            try:
+                partition_index, partition_rows_count, error = self.results_queue.get(timeout=QUEUE_TIMEOUT)
+            except queue.Empty:
+                for partition_index, worker in enumerate(self.workers):
+                    if partition_index in finished_partitions or worker.is_alive():
+                        continue
+                    # A worker reporting its outcome right before exiting is given one more timeout
+                    if partition_index in stopped_partitions:
+                        raise Exception("Export worker {} stopped unexpectedly".format(partition_index))
+                    stopped_partitions.add(partition_index)
+                continue
+            finished_partitions.add(partition_index)
+            if error is not None:
+                logger.warning("Export worker {} failed:\n{}".format(partition_index, error))
+                raise Exception("Export worker {} failed: {}".format(partition_index, error.strip().splitlines()[-1]))
+            logger.info("Export worker {} wrote {} rows".format(partition_index, partition_rows_count))
+            written_rows_count += partition_rows_count
+        for worker in self.workers:
+            worker.join()
+        return written_rows_count
+
+    def merge_partitions(self):
+        """
+        Create the output table and fill it with the content of the partial files
+        """
+        output_alias = "output"
+        output_table_name = TableName(output_alias, self.schema_name, self.table_name)
+        output_table_definition = TableDefinition(
+            output_table_name,
+            self.schema_converter.dss_columns_to_hyper_columns(self.schema_dss['columns'])
+        )
+        if os.path.exists(self.output_file):
+            os.remove(self.output_file)
+        start = time.time()
+        with get_shared_hyper_process() as hyper:
+            with Connection(hyper.endpoint) as connection:
+                connection.catalog.create_database(self.output_file)
+                connection.catalog.attach_database(self.output_file, alias=output_alias)
+                connection.catalog.create_schema(SchemaName(output_alias, self.schema_name))
+                connection.catalog.create_table(output_table_definition)
+                if self.sort_column_names:
+                    self.merge_sorted_partitions(connection, output_table_name)
+                else:
+                    for partition_index, partition_file_path in enumerate(self.partition_file_paths):
+                        alias = "partition_{}".format(partition_index)
+                        connection.catalog.attach_database(partition_file_path, alias=alias)
+                        connection.execute_command(
+                            "INSERT INTO {} SELECT * FROM {}".format(
+                                output_table_name, TableName(alias, self.schema_name, self.table_name)))
+                        connection.catalog.detach_database(alias)
+        logger.info("Merged {} partial files in {:.1f}s".format(len(self.partition_file_paths), time.time() - start))
+
+    def merge_sorted_partitions(self, connection, output_table_name):
+        """
+        Fill the output table with the rows of all the partial files at once, sorted on the sort columns
+        """
+        partition_queries = []
+        for partition_index, partition_file_path in enumerate(self.partition_file_paths):
+            alias = "partition_{}".format(partition_index)
+            connection.catalog.attach_database(partition_file_path, alias=alias)
+            partition_queries.append("SELECT * FROM {}".format(TableName(alias, self.schema_name, self.table_name)))
+        start = time.time()
+        inserted_rows_count = connection.execute_command("INSERT INTO {} SELECT * FROM ({}) AS partitions{}".format(
+            output_table_name, " UNION ALL ".join(partition_queries), get_order_by_clause(self.sort_column_names)))
+        self.sort_duration = time.time() - start
+        logger.info("Sorting {} rows on {} added {:.2f}s to the export".format(
+            inserted_rows_count, ", ".join(self.sort_column_names), self.sort_duration))
+        for partition_index in range(len(self.partition_file_paths)):
+            connection.catalog.detach_database("partition_{}".format(partition_index))
+
+    def close(self):
+        """
+        Wait for the workers, merge their partial files into the output file and remove them
+        """
+        logger.info("Closing export ...")
+        try:
+            written_rows_count = self.wait_for_workers()
+            if written_rows_count != self.row_index:
+                raise Exception("Export workers wrote {} rows out of {}".format(written_rows_count, self.row_index))
+            self.merge_partitions()
+        finally:
+            for worker in self.workers:
+                if worker.is_alive():
+                    worker.terminate()
+            shutil.rmtree(self.partitions_directory, ignore_errors=True)
+            logger.info("Closed export")
+        return True
@@ -4,6 +4,8 @@ Gives functions for interaction with Tableau Server through the Tableau Server C
 
 import logging
 import os
+import re
+import tempfile
 from tableauhyperapi import HyperProcess, Telemetry
 import tableauserverclient as tsc
 
@@ -19,6 +21,24 @@ def get_hyper_process():
                   parameters=get_hyper_process_parameters())
 
 
+def get_local_extract_path(project_key, tableau_project, output_file_name, root_directory=None):
+    """
+    Build the path of the Tableau Hyper file kept between the exports of the same output table, so that a rerun can
+    append or upsert rows to it
+
+    :param project_key: key of the DSS project exporting the dataset
+    :param tableau_project: name or id of the target project on Tableau Server
+    :param output_file_name: name of the output table
+    :param root_directory: directory of the kept files, the DSS data directory by default
+    :return: path of the Tableau Hyper file, in a directory created if needed
+    """
+    root_directory = root_directory or os.environ.get("DIP_HOME") or tempfile.gettempdir()
+    directory = os.path.join(root_directory, "tableau-hyper-extracts", *[
+        re.sub(r"[^\w.-]", "_", str(name)) for name in [project_key, tableau_project]])
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, re.sub(r"[^\w.-]", "_", output_file_name) + ".hyper")
+
+
 def get_project_from_name(server, project_name):
     """
     Retrieve the target project from Tableau Server
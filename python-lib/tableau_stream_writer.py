@@ -0,0 +1,71 @@
+"""
+Wrapper of the Tableau Hyper output formatter
+
+The output formatter (write a DSS dataset as a Tableau Hyper file) relies on this class. hyperd only writes local
+files: the rows are written to a local Tableau Hyper file, which is then copied to the output stream once complete.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+
+from stream_spool import write_file_to_stream
+from tableau_partitioned_writer import create_table_writer
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
+
+DEFAULT_SCHEMA_NAME = "Extract"
+DEFAULT_TABLE_NAME = "Extract"
+
+
+class TableauStreamWriter(object):
+    """
+    Write the rows of a DSS dataset as a Tableau Hyper file into a stream
+    """
+
+    def __init__(self, config, export_geometry_as_string=False):
+        """
+        :param config: the format config, with the target `schema_name` and `table_name`
+        """
+        config = config or {}
+        self.schema_name = config.get("schema_name") or DEFAULT_SCHEMA_NAME
+        self.table_name = config.get("table_name") or DEFAULT_TABLE_NAME
+        # Directory of the local file written before being streamed, the default temporary directory when not set
+        self.spool_directory = config.get("spool_directory") or None
+        self.writer = create_table_writer(config, self.schema_name, self.table_name, export_geometry_as_string)
+        self.output_directory = None
+        self.path_to_hyper = None
+
+    def open(self, schema):
+        """
+        Create the local Tableau Hyper file and its table
+
+        :param schema: DSS schema of the rows to write
+        """
+        if self.spool_directory is not None:
+            os.makedirs(self.spool_directory, exist_ok=True)
+        # hyperd creates the file itself, in a directory private to this writer
+        self.output_directory = tempfile.mkdtemp(prefix="tmp_hyper_output_", dir=self.spool_directory)
+        self.path_to_hyper = os.path.join(self.output_directory, "output.hyper")
+        self.writer.create_schema(schema, self.path_to_hyper)
+
+    def write_row(self, row):
+        """
+        :param row: list of values, one value per column of the schema
+        """
+        self.writer.write_row(row)
+
+    def close(self, stream):
+        """
+        Complete the local Tableau Hyper file, copy it to the stream and remove it
+
+        :param stream: the stream receiving the Tableau Hyper file
+        :return: number of bytes written to the stream
+        """
+        try:
+            self.writer.close()
+            return write_file_to_stream(self.path_to_hyper, stream)
+        finally:
+            shutil.rmtree(self.output_directory, ignore_errors=True)
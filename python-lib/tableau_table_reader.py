@@ -4,8 +4,11 @@ Wrapper of the Tableau Hyper formatter
 The formatter (import a Tableau Hyper file as DSS dataset) relies on this class.
 """
 
+import collections
+import itertools
 import logging
 import os
+import shutil
 import tempfile
 
 from schema_conversion import SchemaConversion
@@ -14,12 +17,29 @@ from tableauhyperapi import Telemetry
 from tableauhyperapi import Connection
 from tableauhyperapi import TableName
 from tableauhyperapi import HyperException
-from tableau_server_utils import get_hyper_process
+from tableauhyperapi import TypeTag
+from batch_prefetcher import BatchPrefetcher
+from columnar_export import ColumnarExport
+from columnar_export import FILE_EXTENSIONS
+from columnar_export import FORMAT_ARROW
+from columnar_export import FORMAT_PARQUET
+from hyper_process_pool import get_shared_hyper_process
+from spool_cache import CACHE_DIRECTORY_NAME
+from spool_cache import SpoolCache
+from stream_spool import spool_stream
 
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
 
+SOURCE_TYPE_TABLE = "TABLE"
+SOURCE_TYPE_QUERY = "QUERY"
+QUERY_ALIAS = "custom_query"
+
+READ_MODE_ROWS = "ROWS"
+# Columnar read modes, mapped to the format of the file exported by hyperd
+COLUMNAR_READ_MODES = {"ARROW": FORMAT_ARROW, "PARQUET": FORMAT_PARQUET}
+
 
 def build_query(columns):
     """
@@ -38,7 +58,7 @@ def build_query(columns):
     query_columns = ''
     for column in columns:
         query_columns += str(column.name)
-        if str(column.type) == 'GEOGRAPHY':
+        if column.type.tag == TypeTag.GEOGRAPHY:
             query_columns += ':: text'
         query_columns += ', '
     return query_columns[:-2]
@@ -58,32 +78,80 @@ class TableauTableReader(object):
         self.schema_name = schema_name
 
         self.hyper_table = None
+        self.source_columns = None
         self.hyper_columns = None
         self.hyper_storage_types = None
         self.dss_columns = None
+        self.dss_column_names = None
         self.dss_storage_types = None
 
-        self.rows = []
+        self.rows = collections.deque()
         self.row_index = 0
 
         self.path_to_hyper = None
+        # Directory of the local copy of the imported file, the default temporary directory when not set
+        self.spool_directory = (config or {}).get("spool_directory") or None
+        # Cache of the spooled files and of their columns, in the spool directory, disabled when its size is 0
+        self.spool_cache = None
+        spool_cache_size_mb = int((config or {}).get("spool_cache_size_mb") or 0)
+        if spool_cache_size_mb > 0:
+            self.spool_cache = SpoolCache(
+                os.path.join(self.spool_directory or tempfile.gettempdir(), CACHE_DIRECTORY_NAME),
+                spool_cache_size_mb * 1024 * 1024
+            )
+        self.cached_file_path = None
+        # Whether the file read belongs to this reader, and is removed once read
+        self.private_hyper_file = True
 
         self.hyper = None
         self.connection = None
 
         self.schema_converter = SchemaConversion(config)
-
-        # Handle batch querying
+        # Read from the result of a custom SQL query instead of the table
+        self.sql_query = None
+        if (config or {}).get("source_type", SOURCE_TYPE_TABLE) == SOURCE_TYPE_QUERY:
+            self.sql_query = ((config or {}).get("sql_query") or "").strip().rstrip(";")
+            if not self.sql_query:
+                raise ValueError("The SQL query to read is empty")
+        # Pushed down into the Tableau Hyper query: projection, filter and row limit
+        self.selected_column_names = (config or {}).get("columns") or []
+        self.where_clause = ((config or {}).get("where_clause") or "").strip()
+        self.max_rows = int((config or {}).get("max_rows") or 0)
+        self.temporal_import_mode = (config or {}).get("temporal_import_mode", "LEGACY")
+        self.read_mode = (config or {}).get("read_mode") or READ_MODE_ROWS
+        if self.read_mode != READ_MODE_ROWS and self.read_mode not in COLUMNAR_READ_MODES:
+            raise ValueError("Invalid read mode {}, expected one of {}".format(
+                self.read_mode, ", ".join([READ_MODE_ROWS] + list(COLUMNAR_READ_MODES))))
+
+        # Columnar reading of a file exported by hyperd
+        self.columnar_export = None
+        self.columnar_file_path = None
+        self.record_batches = None
+
+        # Batches fetched and converted in a background thread, disabled when 0
+        self.prefetch_queue_size = int((config or {}).get("prefetch_queue_size") or 0)
+        self.prefetcher = None
+
+        # Handle batch reading of a single query result
+        self.result = None
+        self.result_rows = None
         self.offset = 0
         self.limit = 10000
         self.end_read = False
 
     def create_tmp_hyper_file(self):
         """
-        Create a temporary file to store the streaming buffer
+        Create a temporary file to store the streaming buffer, unless the stream is stored in the spool cache
         """
+        if self.spool_cache is not None:
+            logger.info("The buffer stream from Hyper will be stored in the spool cache {}".format(
+                self.spool_cache.directory))
+            return
+        if self.spool_directory is not None:
+            os.makedirs(self.spool_directory, exist_ok=True)
         # Sets the delete parameter to False imperatively to avoid early deletion
-        self.path_to_hyper = tempfile.NamedTemporaryFile(suffix=".hyper", prefix="tmp_hyper_file_", delete=False).name
+        self.path_to_hyper = tempfile.NamedTemporaryFile(suffix=".hyper", prefix="tmp_hyper_file_", delete=False,
+                                                         dir=self.spool_directory).name
         logger.info("Created temporary file to store future buffer stream from Hyper: {} ".format(self.path_to_hyper))
 
     def read_buffer(self, stream):
@@ -92,72 +160,254 @@ class TableauTableReader(object):
         :param stream: stream coming from the Tableau Hyper file
         :return:
         """
-        line = True
-        with open(self.path_to_hyper, "ab") as f:
-            while line:
-                line = stream.read(1024)
-                f.write(line)
+        if self.spool_cache is not None:
+            self.cached_file_path = self.spool_cache.spool(stream)
+            self.path_to_hyper = self.cached_file_path
+            self.private_hyper_file = False
+            return
+        spool_stream(stream, self.path_to_hyper)
         logger.info("Stored the full stream as bytes in {}".format(self.path_to_hyper))
 
     def open_connection(self):
         """
         Open the connection to the Tableau Hyper file and the database
         """
-        self.hyper = get_hyper_process()
-        self.connection = Connection(self.hyper.endpoint, self.path_to_hyper)
+        self.hyper = get_shared_hyper_process()
+        try:
+            self.connection = Connection(self.hyper.endpoint, self.path_to_hyper)
+        except HyperException as err:
+            if self.private_hyper_file:
+                raise
+            # The cached file is locked by the Tableau Hyper process of another reader
+            logger.warning("Cannot open the cached file {}, reading a copy of it: {}".format(
+                self.path_to_hyper, str(err).splitlines()[0]))
+            self.path_to_hyper = tempfile.NamedTemporaryFile(suffix=".hyper", prefix="tmp_hyper_file_", delete=False,
+                                                             dir=self.spool_directory).name
+            self.private_hyper_file = True
+            shutil.copyfile(self.cached_file_path, self.path_to_hyper)
+            self.connection = Connection(self.hyper.endpoint, self.path_to_hyper)
         logger.info("Opened the connection to Tableau Hyper file")
 
     def read_hyper_columns(self):
         """
-        Read from the Tableau Hyper file the columns and schema of the table
+        Read from the Tableau Hyper file the columns and schema of the table, or of the result of the SQL query
 
         :return: self.hyper_storage_types
         """
-        logger.info("Trying to read Tableau Hyper table {}.{} ...".format(self.schema_name, self.table_name))
-        hyper_table = TableName(self.schema_name, self.table_name)
-        self.hyper_table = hyper_table
+        if not self.sql_query:
+            self.hyper_table = TableName(self.schema_name, self.table_name)
+        source_columns = None
+        if self.spool_cache is not None:
+            source_columns = self.spool_cache.get_columns(self.cached_file_path, self.get_source_key())
+        if source_columns is not None:
+            logger.info("Read the columns of {} from the spool cache".format(self.describe_source()))
+        else:
+            if self.sql_query:
+                source_columns = self.read_query_columns()
+            else:
+                source_columns = self.read_table_columns()
+            if self.spool_cache is not None:
+                self.spool_cache.set_columns(self.cached_file_path, self.get_source_key(), source_columns)
+
+        self.source_columns = source_columns
+        self.hyper_columns = self.select_hyper_columns(source_columns)
+        self.hyper_storage_types = [column.type.tag for column in self.hyper_columns]
 
+        self.dss_columns = self.schema_converter.hyper_columns_to_dss_columns(self.hyper_columns)
+        self.dss_column_names = [column['name'] for column in self.dss_columns]
+        self.dss_storage_types = [column['type'] for column in self.dss_columns]
+
+        self.schema_converter.set_dss_storage_types(self.dss_storage_types)
+        self.schema_converter.set_hyper_storage_types(self.hyper_storage_types)
+
+    def read_table_columns(self):
+        """
+        Read the columns of the table from the catalog of the Tableau Hyper file
+        """
+        logger.info("Trying to read Tableau Hyper table {}.{} ...".format(self.schema_name, self.table_name))
         try:
-            table_def = self.connection.catalog.get_table_definition(hyper_table)
+            table_def = self.connection.catalog.get_table_definition(self.hyper_table)
         except HyperException as e:
             logger.warning("The target table does not exists in this hyper file. Requested table: {}.{}"
                            .format(self.table_name, self.schema_name))
             raise Exception("Table does not exist: {}.{}".format(self.schema_name, self.table_name))
+        return table_def.columns
 
-        self.hyper_columns = table_def.columns
-        self.hyper_storage_types = [column.type.tag for column in self.hyper_columns]
+    def read_query_columns(self):
+        """
+        Read the columns of the result of the SQL query, without running it entirely
+        """
+        logger.info("Trying to read the columns of the SQL query {} ...".format(self.sql_query))
+        try:
+            with self.connection.execute_query(f'SELECT * FROM ({self.sql_query}) AS "{QUERY_ALIAS}" LIMIT 0') as result:
+                return result.schema.columns
+        except HyperException as e:
+            logger.warning("The SQL query cannot be run on this hyper file: {}".format(e))
+            raise Exception("Invalid SQL query: {}".format(str(e).splitlines()[0]))
 
-        self.dss_columns = self.schema_converter.hyper_columns_to_dss_columns(self.hyper_columns)
-        self.dss_storage_types = [column['type'] for column in self.dss_columns]
+    def select_hyper_columns(self, table_columns):
+        """
+        Keep the columns selected in the config, in their selection order, or all the columns if none are selected
+        """
+        if not self.selected_column_names:
+            return table_columns
+        columns_by_name = {column.name.unescaped: column for column in table_columns}
+        missing_column_names = [name for name in self.selected_column_names if name not in columns_by_name]
+        if missing_column_names:
+            logger.warning("The selected columns {} do not exist in {}".format(
+                missing_column_names, self.describe_source()))
+            raise Exception("Columns do not exist: {}".format(", ".join(missing_column_names)))
+        return [columns_by_name[name] for name in self.selected_column_names]
+
+    def get_source_key(self):
+        """
+        :return: string identifying the table or SQL query read in the file
+        """
+        if self.sql_query:
+            return SOURCE_TYPE_QUERY + ":" + self.sql_query
+        return SOURCE_TYPE_TABLE + ":" + str(self.hyper_table)
 
-        self.schema_converter.set_dss_storage_types(self.dss_storage_types)
-        self.schema_converter.set_hyper_storage_types(self.hyper_storage_types)
+    def describe_source(self):
+        if self.sql_query:
+            return "the result of the SQL query"
+        return "table {}.{}".format(self.schema_name, self.table_name)
+
+    def build_from_clause(self, partition_condition=None):
+        """
+        Build the end of the query reading the table, with the filter and row limit of the config
+
+        :param partition_condition: optional SQL condition restricting the rows to one partition of the table
+        :return: the FROM clause, followed by the optional WHERE and LIMIT clauses
+        :example:
+        >>> 'FROM "Extract"."Extract" WHERE (price > 100) LIMIT 1000'
+        """
+        if self.sql_query:
+            from_clause = f'FROM ({self.sql_query}) AS "{QUERY_ALIAS}"'
+        else:
+            from_clause = f'FROM {self.hyper_table}'
+        conditions = [condition for condition in [self.where_clause, partition_condition] if condition]
+        if conditions:
+            from_clause += ' WHERE ' + ' AND '.join(f'({condition})' for condition in conditions)
+        if self.max_rows > 0:
+            from_clause += f' LIMIT {self.max_rows}'
+        return from_clause
+
+    def build_select_query(self, partition_condition=None):
+        """
+        Build the query reading the selected columns of the table, or of one of its partitions
+        """
+        return f'SELECT {build_query(self.hyper_columns)} {self.build_from_clause(partition_condition)}'
 
-    def fetch_rows(self, offset, limit):
+    def open_result(self):
         """
-        Retrieve rows from `offset` to `limit` from the Tableau Hyper file, converting values on the fly
+        Run the query reading the table, its result is then consumed lazily by `fetch_rows`
         """
-        logger.info("Fetching new row from {} to max {}".format(offset, limit))
-        sql_hyper_query = f'SELECT {build_query(self.hyper_columns)} FROM {self.hyper_table} OFFSET {offset} LIMIT {limit}'
+        sql_hyper_query = self.build_select_query()
         logger.info("SQL query: {} ".format(sql_hyper_query))
         try:
-            result = self.connection.execute_query(sql_hyper_query)
+            self.result = self.connection.execute_query(sql_hyper_query)
         except Exception as err:
             logger.fatal("Tried to execute query but was unsuccessful.")
             raise err
+        self.result_rows = iter(self.result)
+
+    def export_columnar(self, file_format=FORMAT_ARROW):
+        """
+        Have hyperd export the table to a Parquet or Arrow IPC stream file in the spool directory
+
+        :param file_format: FORMAT_ARROW or FORMAT_PARQUET
+        :return: the ColumnarExport able to read the exported file
+        """
+        self.columnar_export = ColumnarExport(self.hyper_columns, self.temporal_import_mode, file_format)
+        self.columnar_file_path = tempfile.NamedTemporaryFile(suffix=FILE_EXTENSIONS[file_format],
+                                                              prefix="tmp_hyper_export_", delete=False,
+                                                              dir=self.spool_directory).name
+        self.columnar_export.export(self.connection, self.build_from_clause(), self.columnar_file_path)
+        return self.columnar_export
+
+    def read_record_batches(self, file_format=FORMAT_ARROW, batch_size=None):
+        """
+        Read the table as Arrow record batches, converted as DSS would read them, for instance to be used by a recipe
 
-        for row in result:
-            self.rows.append(row)
+        :param file_format: format of the intermediate file written by hyperd, FORMAT_ARROW or FORMAT_PARQUET
+        :param batch_size: maximum number of rows of the batches read from a Parquet file
+        :return: generator of pyarrow.RecordBatch
+        """
+        columnar_export = self.export_columnar(file_format)
+        return columnar_export.read_record_batches(self.columnar_file_path, batch_size or self.limit)
+
+    def fetch_record_batch(self):
+        """
+        Retrieve the rows of the next record batch of the exported columnar file, already converted to DSS rows
+        """
+        if self.record_batches is None:
+            self.record_batches = self.read_record_batches(COLUMNAR_READ_MODES[self.read_mode])
+        record_batch = next(self.record_batches, None)
+        if record_batch is None:
+            return []
+        logger.info("Fetching new rows from {} to {}".format(self.offset, self.offset + record_batch.num_rows))
+        self.offset += record_batch.num_rows
+        return record_batch.to_pylist()
+
+    def fetch_rows(self, limit):
+        """
+        Retrieve the next `limit` rows from the result of the Tableau Hyper query
+
+        :return: list of rows as returned by Tableau Hyper, empty once the result is entirely read
+        """
+        if self.result is None:
+            self.open_result()
+        logger.info("Fetching new rows from {} to max {}".format(self.offset, self.offset + limit))
+        hyper_rows = list(itertools.islice(self.result_rows, limit))
+        self.offset += len(hyper_rows)
+        return hyper_rows
+
+    def fetch_batch(self):
+        """
+        Retrieve the next batch of rows, converted to DSS rows
+
+        :return: list of dict {column name: dss compliant value}, empty once all the rows are read
+        """
+        if self.read_mode != READ_MODE_ROWS:
+            # Rows of the columnar read modes are converted with their record batch
+            return self.fetch_record_batch()
+        return self.schema_converter.prepare_rows_to_dss_dicts(self.fetch_rows(self.limit), self.dss_column_names)
+
+    def next_batch(self):
+        """
+        Retrieve the next batch of DSS rows, from the background thread when prefetching is enabled
+        """
+        if self.prefetch_queue_size <= 0:
+            return self.fetch_batch()
+        if self.prefetcher is None:
+            self.prefetcher = BatchPrefetcher(self.fetch_batch, self.prefetch_queue_size)
+        return self.prefetcher.get()
+
+    def close_result(self):
+        if self.result is not None:
+            self.result.close()
+            self.result = None
+            self.result_rows = None
 
     def close_connection(self):
         """
         Close the connection to the Tableau Hyper file
         """
         logger.info("Closing connection to {}".format(self.path_to_hyper))
+        if self.prefetcher is not None:
+            # The background thread uses the connection, it must be stopped first
+            self.prefetcher.close()
+            self.prefetcher = None
+        self.close_result()
+        if self.record_batches is not None:
+            self.record_batches.close()
+            self.record_batches = None
         self.connection.close()
         self.hyper.close()
-        if os.path.exists(self.path_to_hyper):
+        if self.private_hyper_file and os.path.exists(self.path_to_hyper):
             os.remove(self.path_to_hyper)
+        if self.columnar_file_path is not None and os.path.exists(self.columnar_file_path):
+            os.remove(self.columnar_file_path)
 
     def read_schema(self):
         """
@@ -170,16 +420,16 @@ class TableauTableReader(object):
         """
         Reads the next row from the hyper database
 
-        Rows are fetched from the hyper file and added to `rows`, by batches of `self.limit` size, with `fetch_rows` method.
-        For the first row reading or once reaching an empty list of rows, `fetch_rows` is called.
-        If `fetch_rows` fetches no new rows, the hyper database has been read entirely.
+        Rows are fetched from the result of a single query on the hyper file, converted and added to `rows`,
+        by batches of `self.limit` size, with `next_batch` method.
+        For the first row reading or once reaching an empty list of rows, `next_batch` is called.
+        If `next_batch` fetches no new rows, the hyper database has been read entirely.
         """
         if self.end_read:
             return None
 
         if len(self.rows) == 0:
-            self.fetch_rows(self.offset, self.limit)
-            self.offset += self.limit
+            self.rows.extend(self.next_batch())
 
         # New rows could have been fetched
         if len(self.rows) == 0:
@@ -188,10 +438,5 @@ class TableauTableReader(object):
             logger.info("Finished reading rows from hyper file...")
             return None
         else:
-            hyper_row = self.rows.pop()
-            dss_row = self.schema_converter.prepare_row_to_dss(hyper_row)
-            row = {}
-            for column, value in zip(self.dss_columns, dss_row):
-                row[column["name"]] = value
             self.row_index += 1
-            return row
+            return self.rows.popleft()
@@ -4,8 +4,10 @@ Wrapper of the Tableau Hyper exporter
 The exporters (to file and to server) as Tableau Hyper files rely on this class.
 """
 
+import json
 import logging
 import os
+import time
 
 from tableauhyperapi import TableDefinition
 from tableauhyperapi import HyperProcess
@@ -13,16 +15,70 @@ from tableauhyperapi import Telemetry
 from tableauhyperapi import Connection
 from tableauhyperapi import CreateMode
 from tableauhyperapi import Inserter
+from tableauhyperapi import Name
+from tableauhyperapi import Persistence
+from tableauhyperapi import SqlType
 from tableauhyperapi import TableName
 
 from schema_conversion import dss_is_geo
 from schema_conversion import geo_to_text
 from schema_conversion import SchemaConversion
-from tableau_server_utils import get_hyper_process
+from csv_staging import CsvStaging
+from pipelined_inserter import PipelinedInserter
+from hyper_process_pool import get_shared_hyper_process
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='Plugin: Tableau Hyper API | %(levelname)s - %(message)s')
 
+LOAD_MODE_INSERTER = "INSERTER"
+LOAD_MODE_COPY = "COPY"
+WRITE_MODE_OVERWRITE = "OVERWRITE"
+WRITE_MODE_APPEND = "APPEND"
+WRITE_MODE_UPSERT = "UPSERT"
+WRITE_MODES = [WRITE_MODE_OVERWRITE, WRITE_MODE_APPEND, WRITE_MODE_UPSERT]
+# Temporary table receiving the rows appended or upserted to an existing table
+STAGING_TABLE_NAME = "dss_staging_rows"
+DEFAULT_PIPELINE_QUEUE_SIZE = 2
+DEFAULT_WRITE_BUFFER_SIZE_MB = 64
+DEFAULT_BATCH_SIZE = 100000
+# Rows of the first slice of a DataFrame converted at once, the next slices are sized on the write buffer
+DATAFRAME_FIRST_SLICE_ROWS = 1000
+# Row offset durably written by a checkpointed export, stored next to the destination file
+CHECKPOINT_FILE_EXTENSION = ".checkpoint"
+# Encoded size of the values other than text and binary, which are at most 8 bytes in the Hyper format
+FIXED_VALUE_SIZE = 8
+# str.isascii, a shortcut to the encoded size of ASCII text, is not available before Python 3.7
+STR_HAS_ISASCII = hasattr(str, "isascii")
+
+
+def get_order_by_clause(column_names):
+    """
+    :param column_names: names of the columns the rows are sorted on, in order
+    :return: the SQL ORDER BY clause, empty when there is no sort column
+    """
+    if not column_names:
+        return ""
+    return " ORDER BY {}".format(", ".join(str(Name(column_name)) for column_name in column_names))
+
+
+def get_encoded_size(hyper_row):
+    """
+    Compute the size of a converted row once encoded for hyperd: the UTF-8 bytes of the text values, the bytes of the
+    binary values and 8 bytes for the other values
+
+    :param hyper_row: row of values converted to Tableau Hyper
+    :return: size in bytes
+    """
+    size = 0
+    for value in hyper_row:
+        if isinstance(value, str):
+            size += len(value) if STR_HAS_ISASCII and value.isascii() else len(value.encode("utf-8"))
+        elif isinstance(value, bytes):
+            size += len(value)
+        else:
+            size += FIXED_VALUE_SIZE
+    return size
+
 
 class TableauTableWriter(object):
     """
@@ -34,27 +90,73 @@ class TableauTableWriter(object):
         :param schema_name: name of the target schema
         :param table_name: name of the target table
         """
+        config = config or {}
         self.row_index = 0
+
+        # Rows are buffered until the encoded size of the buffer or its row count reaches its limit, whichever comes
+        # first. The batches are needed by the pipelined insertion and the COPY load mode.
         self.data = []
-        self.batch_size = 2000
+        self.data_size = 0
+        self.batch_size = DEFAULT_BATCH_SIZE
+        self.buffer_size = int(float(config.get("write_buffer_size_mb") or DEFAULT_WRITE_BUFFER_SIZE_MB) * 1024 * 1024)
+        self.batches_count = 0
+        self.min_batch_rows = None
+        self.max_batch_rows = 0
 
         self.schema_name = schema_name
         self.table_name = table_name
 
+        # In pipelined mode, batches are inserted by a background thread while the next ones are converted
+        self.pipelined = bool(config.get("pipelined_insert", False))
+        self.pipeline_queue_size = int(config.get("pipeline_queue_size") or DEFAULT_PIPELINE_QUEUE_SIZE)
+
+        self.load_mode = config.get("load_mode") or LOAD_MODE_INSERTER
+        if self.load_mode not in [LOAD_MODE_INSERTER, LOAD_MODE_COPY]:
+            raise ValueError("Invalid load mode {}".format(self.load_mode))
+
+        # Existing tables are replaced, or the rows are appended or upserted on key columns through a staging table
+        self.write_mode = config.get("write_mode") or WRITE_MODE_OVERWRITE
+        if self.write_mode not in WRITE_MODES:
+            raise ValueError("Invalid write mode {}, expected one of {}".format(self.write_mode, ", ".join(WRITE_MODES)))
+        self.key_column_names = config.get("upsert_key_columns") or []
+        if self.write_mode == WRITE_MODE_UPSERT and not self.key_column_names:
+            raise ValueError("The upsert write mode requires key columns")
+        self.target_table_definition = None
+
+        # Rows are written to a staging table, then sorted on these columns when moved to the output table, so that
+        # the file is clustered on the columns filtered by the Tableau dashboards
+        self.sort_column_names = config.get("sort_columns") or []
+        self.sort_duration = 0
+
+        # Opt-in checkpoints: every `checkpoint_rows` rows, the inserted rows are durably written and their count is
+        # recorded, so that an export failing midway can be resumed by a rerun reading the same rows in the same order
+        self.checkpoint_rows = int(config.get("checkpoint_rows") or 0)
+        if self.checkpoint_rows > 0 and self.write_mode != WRITE_MODE_OVERWRITE:
+            raise ValueError("Checkpoints are only available in the {} write mode".format(WRITE_MODE_OVERWRITE))
+        if self.checkpoint_rows > 0 and self.sort_column_names:
+            raise ValueError("Checkpoints cannot be combined with sort columns")
+        self.checkpoint_file = None
+        self.checkpointed_row_index = 0
+        self.is_resumed = False
+        self.resumed_rows_count = 0
+        self.rows_to_skip = 0
+        self.schema_dss = None
+
         self.output_file = None
         self.is_geo_table = False
+        self.dss_column_names = []
+        self.unparsable_values_counts = {}
 
         self.schema_converter = SchemaConversion(config, export_geometry_as_string)
 
         # Tableau Hyper related objects
         self.hyper = None
         self.connection = None
-        self.tmp_table_definition = None
+        self.owns_connection = True
         self.output_table_definition = None
-        self.tmp_table_inserter = None
-        self.output_table_inserter = None
+        self.inserter = None
 
-    def create_schema(self, schema_dss, destination_file_path):
+    def create_schema(self, schema_dss, destination_file_path, connection=None):
         """
         Read the Tableau Hyper file an.
 
@@ -62,16 +164,28 @@ class TableauTableWriter(object):
             example: [{"columns": [{"name": "customer_id", "type": "bigint"}, ...]}, ...]
 
         :param destination_file_path:
+        :param connection: open connection to the destination file, shared with the other tables of the file and left
+            open by `close`. When not set, the writer opens its own connection, replacing the file in overwrite mode.
         :return:
         """
         # Read the destination file of the dss
         self.output_file = destination_file_path
+        self.schema_dss = schema_dss
+        if self.checkpoint_rows > 0:
+            self.checkpoint_file = destination_file_path + CHECKPOINT_FILE_EXTENSION
         logger.info("Writing the Tableau Hyper file to the following location: {}".format(destination_file_path))
         logger.info("The dataset to export has the following schema: {}".format(schema_dss))
 
         dss_columns = schema_dss['columns']
+        self.dss_column_names = [column_descriptor['name'] for column_descriptor in dss_columns]
         dss_storage_types = [column_descriptor['type'] for column_descriptor in dss_columns]
         self.schema_converter.set_dss_storage_types(dss_storage_types)
+        missing_key_column_names = [name for name in self.key_column_names if name not in self.dss_column_names]
+        if missing_key_column_names:
+            raise ValueError("Key columns do not exist: {}".format(", ".join(missing_key_column_names)))
+        missing_sort_column_names = [name for name in self.sort_column_names if name not in self.dss_column_names]
+        if missing_sort_column_names:
+            raise ValueError("Sort columns do not exist: {}".format(", ".join(missing_sort_column_names)))
 
         self.is_geo_table = dss_is_geo(schema_dss)
         logger.info("The input dataset contains a geo column: {}".format(self.is_geo_table))
@@ -83,93 +197,371 @@ class TableauTableWriter(object):
         logger.info("Received target schema {} and table {}".format(self.schema_name, self.table_name))
 
         # Create the Tableau Hyper schema from the DSS schema
-        self.output_table_definition = TableDefinition(
+        self.target_table_definition = TableDefinition(
                         TableName(self.schema_name, self.table_name),
                         self.schema_converter.dss_columns_to_hyper_columns(dss_columns)
         )
+        self.output_table_definition = self.target_table_definition
 
         # Open connection to file
-        self.hyper = get_hyper_process()
-        self.connection = Connection(self.hyper.endpoint, self.output_file, CreateMode.CREATE_AND_REPLACE)
-        assert self.connection is not None
-        self.connection.catalog.create_schema(self.schema_name)
-        self.connection.catalog.create_table(self.output_table_definition)
-
-        # Handle the geo case
-        if self.is_geo_table:
-            logger.info("Detected geo column. Creating a temporary table...")
-            dss_tmp_schema = geo_to_text(schema_dss)
-            dss_tmp_columns = dss_tmp_schema['columns']
-            self.tmp_table_definition = TableDefinition(
-                        TableName(self.schema_name, "tmp_"+self.table_name),
-                        self.schema_converter.dss_columns_to_hyper_columns(dss_tmp_columns))
-            self.connection.catalog.create_table(self.tmp_table_definition)
-            logger.info("Created temporary table")
+        self.owns_connection = connection is None
+        if connection is not None:
+            if self.checkpoint_rows > 0:
+                raise ValueError("Checkpoints are not available on a connection shared with other tables")
+            self.connection = connection
+            self.connection.catalog.create_schema_if_not_exists(self.schema_name)
+        elif self.checkpoint_rows > 0 and self.read_checkpoint(dss_columns):
+            self.hyper = get_shared_hyper_process()
+            self.connection = Connection(self.hyper.endpoint, self.output_file, CreateMode.NONE)
+            self.resume_export()
+        elif self.write_mode == WRITE_MODE_OVERWRITE:
+            self.hyper = get_shared_hyper_process()
+            self.connection = Connection(self.hyper.endpoint, self.output_file, CreateMode.CREATE_AND_REPLACE)
+            assert self.connection is not None
+            self.connection.catalog.create_schema(self.schema_name)
+        else:
+            self.hyper = get_shared_hyper_process()
+            self.connection = Connection(self.hyper.endpoint, self.output_file, CreateMode.CREATE_IF_NOT_EXISTS)
+            self.connection.catalog.create_schema_if_not_exists(self.schema_name)
+        if self.write_mode != WRITE_MODE_OVERWRITE:
+            target_table_name = self.target_table_definition.table_name
+            if self.connection.catalog.has_table(target_table_name):
+                try:
+                    self.check_schema_compatibility(self.connection.catalog.get_table_definition(target_table_name))
+                except ValueError:
+                    self.release_connection()
+                    raise
+                logger.info("Rows will be staged in a temporary table, then {} to the existing table {}".format(
+                    "appended" if self.write_mode == WRITE_MODE_APPEND else "upserted", target_table_name))
+                self.output_table_definition = self.create_staging_table_definition()
+            else:
+                logger.info("The table {} does not exist yet, it will be created".format(target_table_name))
+        if not self.is_resumed:
+            if self.sort_column_names and self.output_table_definition is self.target_table_definition:
+                logger.info("Rows will be staged in a temporary table, then sorted on {} into {}".format(
+                    ", ".join(self.sort_column_names), self.target_table_definition.table_name))
+                self.connection.catalog.create_table(self.target_table_definition)
+                self.output_table_definition = self.create_staging_table_definition()
+            self.connection.catalog.create_table(self.output_table_definition)
+            if self.checkpoint_rows > 0:
+                self.save_checkpoint()
+
+        # A single streaming inserter is kept open for the whole export, rows are sent to hyperd as they arrive
+        if self.load_mode == LOAD_MODE_COPY:
+            logger.info("Rows will be staged in CSV files and loaded with COPY")
+        if self.pipelined:
+            logger.info("Batches will be inserted in the background, up to {} queued batches".format(
+                self.pipeline_queue_size))
+        self.inserter = self.create_inserter()
+
+    def create_staging_table_definition(self):
+        """
+        Definition of the temporary table receiving the rows before they are moved to the target table
+        """
+        return TableDefinition(
+            TableName(STAGING_TABLE_NAME), self.target_table_definition.columns, persistence=Persistence.TEMPORARY)
+
+    def create_inserter(self):
+        """
+        Create the inserter of the output table matching the load mode
+        """
+        if self.load_mode == LOAD_MODE_COPY:
+            inserter = CsvStaging(self.connection, self.output_table_definition)
+        elif self.is_geo_table:
+            inserter = self.create_geo_inserter(self.schema_dss)
+        else:
+            inserter = Inserter(self.connection, self.output_table_definition)
+        if self.pipelined:
+            inserter = PipelinedInserter(inserter, self.pipeline_queue_size)
+        return inserter
+
+    def read_checkpoint(self, dss_columns):
+        """
+        Check whether the destination file is the partial result of a previous checkpointed export
+
+        :param dss_columns: columns of the DSS schema to export, which must match the ones of the previous export
+        :return: True if the export can be resumed
+        """
+        if not os.path.exists(self.output_file) or not os.path.exists(self.checkpoint_file):
+            return False
+        try:
+            with open(self.checkpoint_file) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except ValueError:
+            logger.warning("Ignoring the unreadable checkpoint {}".format(self.checkpoint_file))
+            return False
+        if checkpoint.get("columns") != dss_columns:
+            logger.warning("The checkpoint {} was recorded for another schema, the export restarts from scratch".format(
+                self.checkpoint_file))
+            return False
+        return True
+
+    def resume_export(self):
+        """
+        Reopen the table of a previous export, the rows it contains are skipped when written again
+        """
+        self.is_resumed = True
+        self.resumed_rows_count = self.connection.execute_scalar_query(
+            "SELECT COUNT(*) FROM {}".format(self.target_table_definition.table_name))
+        self.rows_to_skip = self.resumed_rows_count
+        logger.info("Resuming the export of {}: the first {} rows were written by a previous export".format(
+            self.output_file, self.resumed_rows_count))
+
+    def save_checkpoint(self):
+        """
+        Durably write the committed rows, then record their count next to the destination file
+        """
+        start = time.time()
+        # hyperd writes the committed rows to the file once it is detached by its last connection
+        self.connection.close()
+        self.connection = Connection(self.hyper.endpoint, self.output_file, CreateMode.NONE)
+        self.checkpointed_row_index = self.row_index
+        rows_count = self.resumed_rows_count + self.row_index
+        temporary_checkpoint_file = self.checkpoint_file + ".tmp"
+        with open(temporary_checkpoint_file, "w") as checkpoint_file:
+            json.dump({"columns": self.schema_dss['columns'], "rows": rows_count}, checkpoint_file)
+        os.replace(temporary_checkpoint_file, self.checkpoint_file)
+        logger.info("Checkpoint: {} rows durably written, in {:.2f}s".format(rows_count, time.time() - start))
+
+    def is_checkpoint_due(self):
+        return 0 < self.checkpoint_rows <= self.row_index - self.checkpointed_row_index
+
+    def checkpoint(self):
+        """
+        Commit the buffered and inserted rows, and save a checkpoint
+        """
+        if self.data:
+            self.update_table()
+        self.inserter.execute()
+        self.inserter.close()
+        self.save_checkpoint()
+        self.inserter = self.create_inserter()
+
+    def check_schema_compatibility(self, existing_table_definition):
+        """
+        Check that the rows to write can be appended or upserted to the existing table: same column names and types,
+        in any order
+
+        :param existing_table_definition: definition of the table read from the catalog of the Tableau Hyper file
+        """
+        existing_types = {column.name.unescaped: column.type for column in existing_table_definition.columns}
+        new_types = {column.name.unescaped: column.type for column in self.target_table_definition.columns}
+        errors = []
+        missing_column_names = [name for name in existing_types if name not in new_types]
+        if missing_column_names:
+            errors.append("missing columns {}".format(", ".join(missing_column_names)))
+        new_column_names = [name for name in new_types if name not in existing_types]
+        if new_column_names:
+            errors.append("new columns {}".format(", ".join(new_column_names)))
+        for name, new_type in new_types.items():
+            if name in existing_types and existing_types[name] != new_type:
+                errors.append("column {} is {} instead of {}".format(name, new_type, existing_types[name]))
+        if errors:
+            logger.warning("The schema of the dataset does not match the existing table {}: {}".format(
+                existing_table_definition.table_name, "; ".join(errors)))
+            raise ValueError("Incompatible schema with the existing table {}: {}".format(
+                existing_table_definition.table_name, "; ".join(errors)))
+
+    def merge_staging_table(self):
+        """
+        Move the staged rows to the target table in a single transaction, sorted on the sort columns if any. In upsert
+        mode, the existing rows having the same keys as staged rows are deleted first.
+        """
+        target_table_name = self.target_table_definition.table_name
+        staging_table_name = self.output_table_definition.table_name
+        column_list = ", ".join(str(column.name) for column in self.output_table_definition.columns)
+        start = time.time()
+        deleted_rows_count = 0
+        self.connection.execute_command("BEGIN")
+        try:
+            if self.write_mode == WRITE_MODE_UPSERT:
+                key_condition = " AND ".join(
+                    "staging.{name} IS NOT DISTINCT FROM target.{name}".format(name=Name(key_column_name))
+                    for key_column_name in self.key_column_names
+                )
+                deleted_rows_count = self.connection.execute_command(
+                    "DELETE FROM {} AS target WHERE EXISTS (SELECT 1 FROM {} AS staging WHERE {})".format(
+                        target_table_name, staging_table_name, key_condition))
+            insert_start = time.time()
+            inserted_rows_count = self.connection.execute_command(
+                "INSERT INTO {} ({}) SELECT {} FROM {}{}".format(
+                    target_table_name, column_list, column_list, staging_table_name,
+                    get_order_by_clause(self.sort_column_names)))
+            if self.sort_column_names:
+                self.sort_duration = time.time() - insert_start
+            self.connection.execute_command("COMMIT")
+        except Exception:
+            self.connection.execute_command("ROLLBACK")
+            raise
+        # The temporary table lives as long as the connection, which may be shared with the next tables of the file
+        self.connection.execute_command("DROP TABLE {}".format(staging_table_name))
+        logger.info("Merged the staged rows into {} in {:.2f}s: {} rows deleted, {} rows inserted".format(
+            target_table_name, time.time() - start, deleted_rows_count, inserted_rows_count))
+        if self.sort_column_names:
+            logger.info("Sorting {} rows on {} added {:.2f}s to the export".format(
+                inserted_rows_count, ", ".join(self.sort_column_names), self.sort_duration))
+
+    def create_geo_inserter(self, schema_dss):
+        """
+        Create an inserter writing geo columns directly to the output table.
+        Geo values are streamed as text and cast to geography by hyperd during the insertion.
+
+        :param schema_dss: DSS schema from the DSS dataset to export
+        :return: the Tableau Hyper inserter
+        """
+        logger.info("Detected geo column. Geo values will be cast to geography during insertion...")
+        text_columns = self.schema_converter.dss_columns_to_hyper_columns(geo_to_text(schema_dss)['columns'])
+        column_mappings = []
+        for output_column in self.output_table_definition.columns:
+            if output_column.type.tag == SqlType.geography().tag:
+                cast_expression = "CAST({} AS {})".format(output_column.name, SqlType.geography())
+                column_mappings.append(Inserter.ColumnMapping(output_column.name, cast_expression))
+            else:
+                column_mappings.append(Inserter.ColumnMapping(output_column.name))
+        return Inserter(self.connection, self.output_table_definition, column_mappings, inserter_definition=text_columns)
 
     def write_row(self, row):
         """
         Handle one row of data to export
         :param row: a tuple with N strings matching the schema passed to open method
         """
+        if self.rows_to_skip > 0:
+            self.rows_to_skip -= 1
+            return True
         try:
-            hyper_compliant_row = self.schema_converter.prepare_row_to_hyper(row)
-            self.data.append(hyper_compliant_row)
-            self.row_index += 1
-
-            if self.row_index % self.batch_size == 0:
-                logger.info("Writing {} lines to hyper file".format(len(self.data)))
-                self.update_table() # send data to hyper file, flush buffer
-                self.data = []
+            self.buffer_row(self.schema_converter.prepare_row_to_hyper(row))
         except Exception as err:
             logger.warning("Failed to perform writing on following row:\n{}".format(row))
             raise err
         return True
 
-    def update_table(self):
+    def buffer_row(self, hyper_row):
         """
-        Perform an update of the Tableau Hyper file with new data
+        Buffer a converted row, flushing the buffer once full and saving the checkpoints when due
+
+        :param hyper_row: row of values converted to Tableau Hyper
+        :return: encoded size of the row in bytes
         """
-        # if there is a geo table, create an intermediate and temporary table
-        if self.is_geo_table:
+        row_size = get_encoded_size(hyper_row)
+        self.data.append(hyper_row)
+        self.data_size += row_size
+        self.row_index += 1
+
+        if len(self.data) >= self.batch_size or self.data_size >= self.buffer_size:
+            self.update_table()  # send data to hyper file, flush buffer
+        if self.checkpoint_rows and self.is_checkpoint_due():
+            self.checkpoint()
+        return row_size
 
-            self.tmp_table_inserter = Inserter(self.connection, self.tmp_table_definition)
-            self.tmp_table_inserter.add_rows(self.data)
-            self.tmp_table_inserter.execute()
-            self.tmp_table_inserter.close()
+    def write_dataframe(self, dataframe):
+        """
+        Handle a chunk of data to export, converted column by column. The chunk is converted in slices sized on the
+        write buffer, whose rows are buffered like the ones of `write_row`.
 
-            self.connection.execute_command(
-                command=f"INSERT INTO {self.output_table_definition.table_name} SELECT * FROM {self.tmp_table_definition.table_name};")
-            self.connection.execute_command(command=f"TRUNCATE TABLE {self.tmp_table_definition.table_name};")
+        :param dataframe: pandas DataFrame with the columns of the schema passed to open method
+        :return: number of rows written
+        """
+        if list(dataframe.columns) != self.dss_column_names:
+            dataframe = dataframe[self.dss_column_names]
+        if self.rows_to_skip > 0:
+            skipped_rows_count = min(self.rows_to_skip, len(dataframe.index))
+            dataframe = dataframe.iloc[skipped_rows_count:]
+            self.rows_to_skip -= skipped_rows_count
+        rows_count = len(dataframe.index)
+        slice_rows_count = min(self.batch_size, DATAFRAME_FIRST_SLICE_ROWS)
+        start = 0
+        while start < rows_count:
+            dataframe_slice = dataframe.iloc[start:start + slice_rows_count]
+            try:
+                hyper_rows = self.schema_converter.prepare_dataframe_to_hyper(dataframe_slice)
+            except Exception as err:
+                logger.warning("Failed to convert a chunk of {} rows".format(len(dataframe_slice.index)))
+                raise err
+            slice_size = sum(self.buffer_row(hyper_row) for hyper_row in hyper_rows)
+            start += len(hyper_rows)
+            slice_rows_count = max(1, min(self.batch_size, self.buffer_size * len(hyper_rows) // max(slice_size, 1)))
+        return rows_count
 
-        else:
+    def write_batches(self, dataframes):
+        """
+        Handle a stream of data chunks to export, for instance the output of `dataset.iter_dataframes()`
 
-            if self.connection is None:
-                logger.warning("Connection to Tableau Hyper file is undefined")
-            self.output_table_inserter = Inserter(self.connection, self.output_table_definition)
-            self.output_table_inserter.add_rows(self.data)
-            self.output_table_inserter.execute()
-            self.output_table_inserter.close()
+        :param dataframes: iterable of pandas DataFrames
+        :return: number of rows written
+        """
+        rows_count = 0
+        for dataframe in dataframes:
+            rows_count += self.write_dataframe(dataframe)
+        return rows_count
 
+    def update_table(self):
+        """
+        Send the buffered rows to the Tableau Hyper inserter (or the CSV staging files) and empty the buffer
+        """
+        batch_rows = len(self.data)
+        logger.info("Writing {} lines ({:.1f} MB encoded) to hyper file".format(batch_rows, self.data_size / 1024 / 1024))
+        self.inserter.add_rows(self.data)
+        self.data = []
+        self.data_size = 0
+        self.batches_count += 1
+        self.min_batch_rows = batch_rows if self.min_batch_rows is None else min(self.min_batch_rows, batch_rows)
+        self.max_batch_rows = max(self.max_batch_rows, batch_rows)
         return True
 
+    def log_unparsable_values(self):
+        """
+        Report the date columns having values which could not be parsed, exported as null
+        """
+        self.unparsable_values_counts = {
+            self.dss_column_names[index]: count
+            for index, count in self.schema_converter.get_unparsable_values_counts().items()
+        }
+        for column_name, count in self.unparsable_values_counts.items():
+            logger.warning("{} values of the date column '{}' could not be parsed and were exported as null".format(
+                count, column_name))
+
     def close(self):
         """
-        Release the Tableau Hyper connections
+        Commit the inserted rows and release the Tableau Hyper connections
         """
         logger.info("Closing export ...")
         try:
             if self.data:
                 logger.info("Performing final data update...")
                 self.update_table()
-                self.data = []
+            if self.inserter.is_open:
+                logger.info("Committing the {} inserted rows...".format(self.row_index))
+                self.inserter.execute()
+            if self.output_table_definition is not self.target_table_definition:
+                self.merge_staging_table()
+            if self.is_resumed:
+                logger.info("Skipped the {} rows written by the previous export".format(
+                    self.resumed_rows_count - self.rows_to_skip))
+            if self.rows_to_skip > 0:
+                logger.warning("The input has {} fewer rows than the resumed export, its order may not be deterministic"
+                               .format(self.rows_to_skip))
+            if self.batches_count:
+                logger.info("Wrote {} rows in {} batches (min {}, average {:.0f}, max {} rows per batch)".format(
+                    self.row_index, self.batches_count, self.min_batch_rows,
+                    self.row_index / self.batches_count, self.max_batch_rows))
+            self.log_unparsable_values()
             logger.info("Closing Tableau Hyper connections...")
-            if self.is_geo_table:
-                self.connection.execute_command(command=f"DROP TABLE {self.tmp_table_definition.table_name};")
         except Exception as err:
             logger.warning("Failed to perform writing on the last rows")
             raise err
         finally:
-            self.connection.close()
-            self.hyper.close()
+            self.inserter.close()
+            self.release_connection()
             logger.info("Closed export")
+        if self.checkpoint_file is not None and os.path.exists(self.checkpoint_file):
+            # The export is complete, a rerun starts from scratch
+            os.remove(self.checkpoint_file)
         return True
+
+    def release_connection(self):
+        """
+        Close the connection and release the Tableau Hyper process, unless the connection was given by the caller
+        """
+        if self.owns_connection:
+            self.connection.close()
+            self.hyper.close()
@@ -1,10 +1,12 @@
 import datetime
+import functools
 import logging
 import math
 import numpy as np
 import pandas as pd
 
 from tableauhyperapi import SqlType
+from tableauhyperapi import Timestamp
 from tableauhyperapi import TypeTag
 
 logger = logging.getLogger(__name__)
@@ -49,16 +51,19 @@ def to_dss_geopoint(hyper_string):
     """
     return hyper_string.upper()
 
-def to_hyper_timestamp(dss_date):
+def to_hyper_timestamp(dss_date, timestamp_parser=None):
     """
     Format a date object from DSS to Tableau Hyper
     :param dss_date: A DSS date value
-    :return: Tableau Hyper date value
+    :param timestamp_parser: TimestampParser of the strings, an uncached one by default
+    :return: Tableau Hyper date value. Strings are parsed to datetime.datetime (pd.Timestamp for the formats left
+        to pandas), which the Tableau Hyper inserter accepts the same way.
     """
     if isinstance(dss_date, str):
-        try:
-            dss_date = pd.to_datetime(dss_date)
-        except:
+        if timestamp_parser is None:
+            timestamp_parser = TimestampParser(cache_size=0)
+        dss_date = timestamp_parser.parse(dss_date)
+        if dss_date is UNPARSABLE_TIMESTAMP:
             return
     if pd.isna(dss_date):
         # Tableau does not handle NaT, so replacing them with None
@@ -82,6 +87,387 @@ def to_hyper_geography(dss_geopoint):
     return dss_geopoint.lower()
 
 
+UNPARSABLE_TIMESTAMP = object()
+TIMESTAMP_CACHE_SIZE = 4096
+MAX_LOGGED_UNPARSABLE_TIMESTAMPS = 5
+
+# Formats of the DSS dates, tried in this order when detecting the format of a column
+DSS_TIMESTAMP_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d',
+]
+
+
+def strptime_parser(timestamp_format):
+    return lambda text: datetime.datetime.strptime(text, timestamp_format)
+
+
+def detect_timestamp_parser(text):
+    """
+    Find a parsing function matching the format of a timestamp string
+
+    :param text: a timestamp string, usually in one of the ISO formats emitted by DSS
+    :return: the fastest parsing function accepting `text`, None when no known format matches
+    """
+    candidates = [datetime.datetime.fromisoformat] if hasattr(datetime.datetime, 'fromisoformat') else []
+    candidates += [strptime_parser(timestamp_format) for timestamp_format in DSS_TIMESTAMP_FORMATS]
+    for parse in candidates:
+        try:
+            parse(text)
+        except ValueError:
+            continue
+        return parse
+    return None
+
+
+class TimestampParser(object):
+    """
+    Parse the timestamp strings of a DSS column.
+
+    The format is detected on the first value and detected again only when a value does not match it.
+    Parsed values are memoized in a bounded cache, as dates are often repeated within a column.
+    Unparsable values are converted to null, but they are counted and the first ones are logged.
+    The parsed values are datetime.datetime objects, pd.Timestamp being only returned for the formats left to pandas.
+    """
+
+    def __init__(self, cache_size=TIMESTAMP_CACHE_SIZE):
+        """
+        :param cache_size: maximum number of memoized values
+        """
+        self.parse_detected_format = None
+        self.unparsable_count = 0
+        self.parse = functools.lru_cache(maxsize=cache_size)(self.parse_uncached)
+
+    def parse_uncached(self, text):
+        """
+        :return: the parsed datetime, None for a null value, UNPARSABLE_TIMESTAMP when the value cannot be parsed
+        """
+        if self.parse_detected_format is not None:
+            try:
+                return self.parse_detected_format(text)
+            except ValueError:
+                pass
+        parse = detect_timestamp_parser(text)
+        if parse is not None:
+            self.parse_detected_format = parse
+            return parse(text)
+        try:
+            # Formats not emitted by DSS, left to pandas
+            timestamp = pd.to_datetime(text)
+        except (ValueError, OverflowError):
+            return UNPARSABLE_TIMESTAMP
+        return None if pd.isna(timestamp) else timestamp
+
+    def __call__(self, value):
+        """
+        Specialized converter for the DSS date and datetimenotz types
+        """
+        if type(value) is str:
+            timestamp = self.parse(value)
+            if timestamp is UNPARSABLE_TIMESTAMP:
+                self.unparsable_count += 1
+                if self.unparsable_count <= MAX_LOGGED_UNPARSABLE_TIMESTAMPS:
+                    logger.warning("Could not parse the date '{}', exporting it as null".format(value))
+                return None
+            return timestamp
+        return timestamp_to_hyper(value)
+
+
+def is_null(value):
+    """
+    Cheap equivalent of `pd.isna` for the scalar values coming from DSS.
+    None, NaN and NaT are the only values which are not equal to themselves.
+    :param value: A DSS value
+    :return: Boolean{value is a null value}
+    """
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        # pd.NA has no truth value
+        return pd.isna(value)
+
+
+def text_to_hyper(value):
+    """
+    Specialized converter for the DSS types exported as Tableau Hyper text.
+    Strings are passed through untouched.
+    """
+    if type(value) is str:
+        return value
+    return None if is_null(value) else str(value)
+
+
+def int_to_hyper(value):
+    """
+    Specialized converter for the DSS integer types
+    """
+    if type(value) is int:
+        return value
+    return None if is_null(value) else int(value)
+
+
+def float_to_hyper(value):
+    """
+    Specialized converter for the DSS floating point types
+    """
+    if type(value) is float:
+        return None if value != value else value
+    return None if is_null(value) else float(value)
+
+
+def bool_to_hyper(value):
+    """
+    Specialized converter for the DSS boolean type
+    """
+    if type(value) is bool:
+        return value
+    return None if is_null(value) else bool(value)
+
+
+def date_to_hyper(value):
+    """
+    Specialized converter for the DSS dateonly type
+    """
+    return None if is_null(value) else to_hyper_date(value)
+
+
+def timestamp_to_hyper(value):
+    """
+    Specialized converter for the DSS date and datetimenotz types
+    """
+    if isinstance(value, datetime.datetime):
+        return None if value != value else value
+    return None if is_null(value) else to_hyper_timestamp(value)
+
+
+def geography_to_hyper(value):
+    """
+    Specialized converter for the DSS geo types exported as Tableau Hyper geography
+    """
+    if type(value) is str:
+        return value.lower()
+    return None if is_null(value) else to_hyper_geography(value)
+
+
+def skip_null(convert):
+    """
+    Wrap a Tableau Hyper to DSS converter: the Tableau Hyper API returns the null values as None
+    """
+    return lambda value: None if value is None else convert(value)
+
+
+def double_to_dss(value):
+    """
+    Specialized converter for the Tableau Hyper double type, NaN values are nulls in DSS
+    """
+    if value is None or value != value:
+        return None
+    return float(value)
+
+
+def get_hyper_microseconds(*timestamp_fields):
+    """
+    Read the internal value of a Tableau Hyper timestamp, microseconds from 4713 BC
+
+    :param timestamp_fields: year, month, day and optionally hour, minute, second, microsecond
+    :return: number of microseconds, None if not available
+    """
+    return getattr(Timestamp(*timestamp_fields), "_hyper_value", None)
+
+
+def check_hyper_microseconds():
+    """
+    The column-wise timestamp conversions rely on a private attribute of the Tableau Hyper timestamps. It is checked
+    against the public API once: when it is missing or does not count microseconds, the conversions fall back to the
+    per-value converters.
+    """
+    try:
+        epoch_microseconds = Timestamp(1970, 1, 1)._hyper_value
+        next_timestamp = Timestamp(epoch_microseconds + 86400 * 1000000 + 1)
+        if next_timestamp.to_datetime() == datetime.datetime(1970, 1, 2, 0, 0, 0, 1):
+            return True
+        logger.warning("Column-wise timestamp conversions disabled, unexpected Tableau Hyper timestamp values")
+    except Exception as err:
+        logger.warning("Column-wise timestamp conversions disabled, unexpected Tableau Hyper timestamps: {}".format(err))
+    return False
+
+
+# Tableau Hyper timestamps count microseconds from 4713 BC, the Python datetimes range from year 1 to 9999
+COLUMN_WISE_TIMESTAMPS = check_hyper_microseconds()
+HYPER_EPOCH_MICROSECONDS = get_hyper_microseconds(1970, 1, 1) if COLUMN_WISE_TIMESTAMPS else None
+MIN_DSS_TIMESTAMP_MICROSECONDS = get_hyper_microseconds(1, 1, 1) if COLUMN_WISE_TIMESTAMPS else None
+MAX_DSS_TIMESTAMP_MICROSECONDS = get_hyper_microseconds(9999, 12, 31, 23, 59, 59, 999999) \
+    if COLUMN_WISE_TIMESTAMPS else None
+# Python datetimes and Tableau Hyper timestamps are formatted the same way from the year 1000, with 4 digits years
+MIN_FORMATTED_TIMESTAMP_MICROSECONDS = get_hyper_microseconds(1000, 1, 1) if COLUMN_WISE_TIMESTAMPS else None
+
+
+def get_unix_microseconds(hyper_timestamps, min_hyper_microseconds=MIN_DSS_TIMESTAMP_MICROSECONDS):
+    """
+    Read the Tableau Hyper timestamps of a column as microseconds since 1970
+
+    :param hyper_timestamps: list of Tableau Hyper timestamps or None
+    :param min_hyper_microseconds: earliest supported timestamp, as a Tableau Hyper value
+    :return: numpy int64 array, 0 for the null values. None when some values are out of the range of Python datetimes,
+        or when the Tableau Hyper API does not expose the expected values.
+    """
+    if not COLUMN_WISE_TIMESTAMPS:
+        return None
+    try:
+        hyper_microseconds = np.array([
+            HYPER_EPOCH_MICROSECONDS if value is None else value._hyper_value for value in hyper_timestamps
+        ], dtype=np.int64)
+    except AttributeError:
+        return None
+    if len(hyper_microseconds) > 0 and (hyper_microseconds.min() < min_hyper_microseconds
+                                        or hyper_microseconds.max() > MAX_DSS_TIMESTAMP_MICROSECONDS):
+        return None
+    return hyper_microseconds - HYPER_EPOCH_MICROSECONDS
+
+
+def timestamp_column_to_dss(values, convert_value):
+    """
+    Column-wise equivalent of `to_dss_timestamp`, with numpy datetime64 arithmetic instead of decoding every field.
+    Columns with dates out of the range of Python datetimes keep the per-value conversion, and its errors.
+    """
+    unix_microseconds = get_unix_microseconds(values)
+    if unix_microseconds is None:
+        return [convert_value(value) for value in values]
+    null_mask = np.array([value is None for value in values], dtype=bool)
+    return with_nulls(unix_microseconds.astype("datetime64[us]"), null_mask)
+
+
+def timestamp_tz_column_to_dss(values, convert_value):
+    """
+    Column-wise equivalent of `to_dss_timestamp_tz`, the datetimes keep the time zone of each value
+    """
+    unix_microseconds = get_unix_microseconds(values)
+    if unix_microseconds is None:
+        return [convert_value(value) for value in values]
+    naive_datetimes = unix_microseconds.astype("datetime64[us]").tolist()
+    return [
+        None if value is None else naive_datetime.replace(tzinfo=value.tzinfo)
+        for value, naive_datetime in zip(values, naive_datetimes)
+    ]
+
+
+def timestamp_tz_column_to_string(values, convert_value):
+    """
+    Column-wise equivalent of `str` on Tableau Hyper timestamps with a time zone, formatted from Python datetimes
+    """
+    unix_microseconds = get_unix_microseconds(values, MIN_FORMATTED_TIMESTAMP_MICROSECONDS)
+    if unix_microseconds is None:
+        return [convert_value(value) for value in values]
+    naive_datetimes = unix_microseconds.astype("datetime64[us]").tolist()
+    return [
+        None if value is None else str(naive_datetime.replace(tzinfo=value.tzinfo))
+        for value, naive_datetime in zip(values, naive_datetimes)
+    ]
+
+
+def date_column_to_dss(values, convert_value):
+    """
+    Column-wise equivalent of `to_dss_date_dateonly`, without the intermediate date
+    """
+    return [None if value is None else datetime.datetime(value.year, value.month, value.day) for value in values]
+
+
+def with_nulls(values, null_mask):
+    """
+    Turn a column of values into a list where null positions are replaced by None
+
+    :param values: numpy array or pandas Series of converted values
+    :param null_mask: numpy boolean array, True where the DSS value is null
+    :return: list of Python values
+    """
+    values = values.tolist()
+    for index in np.flatnonzero(null_mask):
+        values[index] = None
+    return values
+
+
+def text_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `text_to_hyper`
+    """
+    null_mask = series.isna().to_numpy()
+    return with_nulls(series.astype(str), null_mask)
+
+
+def int_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `int_to_hyper`. Values stored as text keep the per-value conversion.
+    """
+    if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+        return [convert_value(value) for value in series]
+    null_mask = series.isna().to_numpy()
+    if pd.api.types.is_float_dtype(series):
+        floats = series.to_numpy(dtype='float64', na_value=0)
+        # Infinite values and values out of the int64 range are rejected like int() does, instead of wrapping
+        invalid_mask = ~(np.abs(floats) < 2 ** 63)
+        if invalid_mask.any():
+            raise ValueError("Cannot convert {} to an integer".format(floats[invalid_mask][0]))
+        # Truncate like int() does
+        values = floats.astype('int64')
+    else:
+        values = series.to_numpy(dtype='int64', na_value=0)
+    return with_nulls(values, null_mask)
+
+
+def float_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `float_to_hyper`. Values stored as text keep the per-value conversion.
+    """
+    if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+        return [convert_value(value) for value in series]
+    null_mask = series.isna().to_numpy()
+    return with_nulls(series.to_numpy(dtype='float64', na_value=0), null_mask)
+
+
+def bool_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `bool_to_hyper`
+    """
+    if not pd.api.types.is_bool_dtype(series):
+        return [convert_value(value) for value in series]
+    null_mask = series.isna().to_numpy()
+    return with_nulls(series.to_numpy(dtype='bool', na_value=False), null_mask)
+
+
+def timestamp_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `timestamp_to_hyper`. Only datetime columns are converted at once,
+    text columns keep the per-value parsing.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        return [convert_value(value) for value in series]
+    null_mask = series.isna().to_numpy()
+    return with_nulls(series.astype(object), null_mask)
+
+
+def date_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `date_to_hyper`
+    """
+    null_mask = series.isna().to_numpy()
+    return with_nulls(series.astype(object), null_mask)
+
+
+def geography_series_to_hyper(series, convert_value):
+    """
+    Column-wise equivalent of `geography_to_hyper`
+    """
+    null_mask = series.isna().to_numpy()
+    return with_nulls(series.astype(str).str.lower(), null_mask)
+
+
 class TypeConversion(object):
 
     def __init__(self, config, export_geometry_as_string=False):
@@ -92,6 +478,9 @@ class TypeConversion(object):
         Handler for conversion of storage types between DSS and Tableau Hyper
         """
         handle_null = lambda f: lambda x: None if pd.isna(x) else f(x)
+        # Parser of the strings of the generic per-value conversion, its cache is not shared with other conversions
+        self.timestamp_parser = TimestampParser()
+        convert_timestamp = lambda value: to_hyper_timestamp(value, self.timestamp_parser)
 
         # Mapping DSS to Tableau Hyper types
 
@@ -101,7 +490,7 @@ class TypeConversion(object):
             'bigint': (SqlType.big_int(), handle_null(int)),
             'boolean': (SqlType.bool(), handle_null(bool)),
             'dateonly': (SqlType.date(), handle_null(to_hyper_date)),
-            'datetimenotz': (SqlType.timestamp(), handle_null(to_hyper_timestamp)),
+            'datetimenotz': (SqlType.timestamp(), handle_null(convert_timestamp)),
             'double': (SqlType.double(), handle_null(float)),
             'float': (SqlType.double(), handle_null(float)),
             'geometry': (SqlType.text(), handle_null(str)) if export_geometry_as_string else (SqlType.geography(), handle_null(to_hyper_geography)),
@@ -116,9 +505,49 @@ class TypeConversion(object):
 
         # Legacy mode exported DSS "date" to Hyper "timestamp", which was wrong. Modern mode exports it as timestamp_tz
         if self.config is None or self.config.get("temporal_export_mode", "LEGACY") == "LEGACY":
-            self.mapping_dss_to_hyper['date'] = (SqlType.timestamp(), handle_null(to_hyper_timestamp))
+            self.mapping_dss_to_hyper['date'] = (SqlType.timestamp(), handle_null(convert_timestamp))
         else:
-            self.mapping_dss_to_hyper['date'] = (SqlType.timestamp_tz(), handle_null(to_hyper_timestamp))
+            self.mapping_dss_to_hyper['date'] = (SqlType.timestamp_tz(), handle_null(convert_timestamp))
+
+        # Specialized converters used by the per-schema conversion plan, same rules as `mapping_dss_to_hyper`
+        self.dss_to_hyper_converters = {
+            'array': text_to_hyper,
+            'bigint': int_to_hyper,
+            'boolean': bool_to_hyper,
+            'date': timestamp_to_hyper,
+            'dateonly': date_to_hyper,
+            'datetimenotz': timestamp_to_hyper,
+            'double': float_to_hyper,
+            'float': float_to_hyper,
+            'geometry': text_to_hyper if export_geometry_as_string else geography_to_hyper,
+            'geopoint': geography_to_hyper,
+            'int': int_to_hyper,
+            'map': text_to_hyper,
+            'object': text_to_hyper,
+            'smallint': int_to_hyper,
+            'string': text_to_hyper,
+            'tinyint': int_to_hyper,
+        }
+
+        # Column-wise converters used for pandas DataFrames, same rules as `mapping_dss_to_hyper`
+        self.dss_to_hyper_series_converters = {
+            'array': text_series_to_hyper,
+            'bigint': int_series_to_hyper,
+            'boolean': bool_series_to_hyper,
+            'date': timestamp_series_to_hyper,
+            'dateonly': date_series_to_hyper,
+            'datetimenotz': timestamp_series_to_hyper,
+            'double': float_series_to_hyper,
+            'float': float_series_to_hyper,
+            'geometry': text_series_to_hyper if export_geometry_as_string else geography_series_to_hyper,
+            'geopoint': geography_series_to_hyper,
+            'int': int_series_to_hyper,
+            'map': text_series_to_hyper,
+            'object': text_series_to_hyper,
+            'smallint': int_series_to_hyper,
+            'string': text_series_to_hyper,
+            'tinyint': int_series_to_hyper,
+        }
 
         # Mapping Tableau Hyper to DSS types
         self.mapping_hyper_to_dss = {
@@ -149,6 +578,43 @@ class TypeConversion(object):
             self.mapping_hyper_to_dss[TypeTag.TIMESTAMP] = ('datetimenotz', handle_null(to_dss_timestamp))
             self.mapping_hyper_to_dss[TypeTag.TIMESTAMP_TZ] = ('date', handle_null(to_dss_timestamp_tz))
 
+        # Specialized converters used by the per-schema conversion plan, same rules as `mapping_hyper_to_dss`
+        self.hyper_to_dss_converters = {
+            TypeTag.BIG_INT: skip_null(int),
+            TypeTag.BYTES: skip_null(str),
+            TypeTag.BOOL: skip_null(bool),
+            TypeTag.CHAR: skip_null(str),
+            TypeTag.DOUBLE: double_to_dss,
+            TypeTag.GEOGRAPHY: skip_null(to_dss_geopoint),
+            TypeTag.INT: skip_null(int),
+            TypeTag.INTERVAL: skip_null(str),
+            TypeTag.JSON: skip_null(str),
+            TypeTag.NUMERIC: skip_null(float),
+            TypeTag.OID: skip_null(str),
+            TypeTag.SMALL_INT: skip_null(int),
+            TypeTag.TEXT: skip_null(str),
+            TypeTag.VARCHAR: skip_null(str),
+            TypeTag.TIME: skip_null(str),
+        }
+        if self.config is None or self.config.get("temporal_import_mode", "LEGACY") == "LEGACY":
+            self.hyper_to_dss_converters[TypeTag.DATE] = skip_null(to_dss_date_dateonly)
+            self.hyper_to_dss_converters[TypeTag.TIMESTAMP] = skip_null(to_dss_timestamp)
+            self.hyper_to_dss_converters[TypeTag.TIMESTAMP_TZ] = skip_null(str)
+        else:
+            self.hyper_to_dss_converters[TypeTag.DATE] = skip_null(str)
+            self.hyper_to_dss_converters[TypeTag.TIMESTAMP] = skip_null(to_dss_timestamp)
+            self.hyper_to_dss_converters[TypeTag.TIMESTAMP_TZ] = skip_null(to_dss_timestamp_tz)
+
+        # Column-wise converters used for batches of rows, same rules as `mapping_hyper_to_dss`
+        self.hyper_to_dss_column_converters = {
+            TypeTag.TIMESTAMP: timestamp_column_to_dss,
+        }
+        if self.config is None or self.config.get("temporal_import_mode", "LEGACY") == "LEGACY":
+            self.hyper_to_dss_column_converters[TypeTag.DATE] = date_column_to_dss
+            self.hyper_to_dss_column_converters[TypeTag.TIMESTAMP_TZ] = timestamp_tz_column_to_string
+        else:
+            self.hyper_to_dss_column_converters[TypeTag.TIMESTAMP_TZ] = timestamp_tz_column_to_dss
+
     def dss_type_to_hyper(self, dss_type):
         """
         Convert an identifier (string) of a single dss storage type to the mapped hyper type.
@@ -214,6 +680,72 @@ class TypeConversion(object):
             raise err
         return output_value
 
+    def get_dss_to_hyper_converters(self, dss_storage_types):
+        """
+        Build the conversion plan of a DSS schema: one specialized converter per column.
+
+        :param dss_storage_types: storage types of the DSS columns
+            example:
+            >>> ['bigint', 'string']
+        :return: list of functions converting a DSS value to the mapped Tableau Hyper value
+        """
+        converters = []
+        for dss_type in dss_storage_types:
+            if self.dss_to_hyper_converters.get(dss_type) is timestamp_to_hyper:
+                # Stateful converter: format detection, cache and count of the unparsable values of the column
+                converters.append(TimestampParser())
+                continue
+            converter = self.dss_to_hyper_converters.get(dss_type)
+            if converter is None:
+                # Unknown types fail (and log) on the first converted value, as in `dss_value_to_hyper`
+                converter = functools.partial(self.dss_value_to_hyper, dss_type=dss_type)
+            converters.append(converter)
+        return converters
+
+    def get_hyper_to_dss_converters(self, hyper_storage_types):
+        """
+        Build the conversion plan of a Tableau Hyper table: one specialized converter per column.
+
+        :param hyper_storage_types: type tags of the Tableau Hyper columns
+        :return: list of functions converting a Tableau Hyper value to the mapped DSS value
+        """
+        converters = []
+        for tag in hyper_storage_types:
+            converter = self.hyper_to_dss_converters.get(tag)
+            if converter is None:
+                # Unknown types fail (and log) on the first converted value, as in `hyper_value_to_dss`
+                converter = functools.partial(self.hyper_value_to_dss, tag=tag)
+            converters.append(converter)
+        return converters
+
+    def dss_series_to_hyper(self, series, dss_type, convert_value):
+        """
+        Convert a whole column of a DSS dataframe to the mapped Tableau Hyper values
+
+        :param series: pandas Series holding the values of one column
+        :param dss_type: storage type of the column
+        :param convert_value: per-value converter of the column, used when the column cannot be converted at once
+        :return: list of the values converted in the Tableau Hyper type
+        """
+        series_converter = self.dss_to_hyper_series_converters.get(dss_type)
+        if series_converter is None:
+            return [convert_value(value) for value in series]
+        return series_converter(series, convert_value)
+
+    def hyper_column_to_dss(self, values, tag, convert_value):
+        """
+        Convert a whole column of a batch of Tableau Hyper rows to the mapped DSS values
+
+        :param values: list of the values of one column, as returned by the Tableau Hyper API
+        :param tag: type tag of the Tableau Hyper column
+        :param convert_value: per-value converter of the column, used when the column cannot be converted at once
+        :return: list of the values converted in the DSS type
+        """
+        column_converter = self.hyper_to_dss_column_converters.get(tag)
+        if column_converter is None:
+            return [convert_value(value) for value in values]
+        return column_converter(values, convert_value)
+
     def hyper_value_to_dss(self, value, tag=SqlType.text().tag):
         """
         Convert the value `value` stored in a Hyper File under the storage type
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of the Tableau Hyper to DSS value conversion, for each Tableau Hyper type and temporal import mode.
+
+Compares the per-row conversion plan (`SchemaConversion.prepare_row_to_dss`) with the column-wise conversion of
+batches of rows (`SchemaConversion.prepare_rows_to_dss`).
+"""
+
+import argparse
+import datetime
+import decimal
+import random
+import time
+
+from tableauhyperapi import Date
+from tableauhyperapi import Timestamp
+from tableauhyperapi import TypeTag
+
+from schema_conversion import SchemaConversion
+
+NULL_RATIO = 0.1
+BATCH_SIZE = 10000
+FIRST_DATETIME = datetime.datetime(2000, 1, 1)
+MICROSECONDS_PER_DAY = 24 * 3600 * 1000000
+
+
+def random_timestamp(tzinfo=None):
+    offset = datetime.timedelta(microseconds=random.randint(0, 10000 * MICROSECONDS_PER_DAY))
+    return Timestamp.from_datetime((FIRST_DATETIME + offset).replace(tzinfo=tzinfo))
+
+
+SAMPLE_VALUES = {
+    TypeTag.BIG_INT: lambda: random.randint(-2 ** 40, 2 ** 40),
+    TypeTag.DATE: lambda: Date(random.randint(1990, 2030), random.randint(1, 12), random.randint(1, 28)),
+    TypeTag.DOUBLE: lambda: random.random() * 1000,
+    TypeTag.NUMERIC: lambda: decimal.Decimal(random.randint(0, 10 ** 8)) / 100,
+    TypeTag.TEXT: lambda: 'Clean & quiet apt home by the park',
+    TypeTag.TIMESTAMP: random_timestamp,
+    TypeTag.TIMESTAMP_TZ: lambda: random_timestamp(datetime.timezone.utc),
+}
+
+
+def generate_rows(tag, rows_count):
+    generate_value = SAMPLE_VALUES[tag]
+    return [(None if random.random() < NULL_RATIO else generate_value(),) for _ in range(rows_count)]
+
+
+def measure_rows_per_second(function, rows):
+    start = time.perf_counter()
+    function(rows)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000, help="Number of rows converted per Tableau Hyper type")
+    args = parser.parse_args()
+
+    print("{:<14}{:<8}{:>18}{:>18}{:>10}".format("Hyper type", "mode", "rows (rows/s)", "batches (rows/s)",
+                                                 "speedup"))
+    for temporal_import_mode in ["LEGACY", "MODERN"]:
+        for tag in SAMPLE_VALUES:
+            schema_converter = SchemaConversion({"temporal_import_mode": temporal_import_mode})
+            schema_converter.set_hyper_storage_types([tag])
+            rows = generate_rows(tag, args.rows)
+
+            def convert_rows(rows):
+                return [schema_converter.prepare_row_to_dss(row) for row in rows]
+
+            def convert_batches(rows):
+                return [
+                    dss_row for start in range(0, len(rows), BATCH_SIZE)
+                    for dss_row in schema_converter.prepare_rows_to_dss(rows[start:start + BATCH_SIZE])
+                ]
+
+            before = measure_rows_per_second(convert_rows, rows)
+            after = measure_rows_per_second(convert_batches, rows)
+            print("{:<14}{:<8}{:>18,.0f}{:>18,.0f}{:>9.1f}x".format(tag.name, temporal_import_mode, before, after,
+                                                                    after / before))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark of the writer load modes (Inserter and COPY from CSV files) on the sample files of the `data` folder.
+
+The rows of each sample table are read with the TableauTableReader, repeated up to the requested number of rows,
+then written to a new Tableau Hyper file with each load mode.
+"""
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+
+from tableau_table_reader import TableauTableReader
+from tableau_table_writer import TableauTableWriter
+
+SAMPLE_TABLES = [
+    ("data/ranked_customers_18766-rows.hyper", "Extract", "Extract"),
+    ("data/revenue_prediction.hyper", "Extract", "Extract"),
+    ("data/superstore_sample.hyper", "public", "Orders"),
+]
+LOAD_MODES = ["INSERTER", "COPY"]
+
+
+def read_sample_rows(file_path, schema_name, table_name):
+    reader = TableauTableReader(config=None, schema_name=schema_name, table_name=table_name)
+    reader.create_tmp_hyper_file()
+    with open(file_path, "rb") as stream:
+        reader.read_buffer(stream)
+    reader.open_connection()
+    reader.read_hyper_columns()
+    dss_columns = reader.read_schema()
+    column_names = [column["name"] for column in dss_columns]
+    rows = []
+    row = reader.read_row()
+    while row is not None:
+        rows.append([row[name] for name in column_names])
+        row = reader.read_row()
+    return {"columns": dss_columns}, rows
+
+
+def measure_rows_per_second(load_mode, schema, rows):
+    writer = TableauTableWriter(config={"load_mode": load_mode}, schema_name="Extract", table_name="Extract")
+    output_file = os.path.join(tempfile.gettempdir(), "benchmark_{}.hyper".format(load_mode.lower()))
+    start = time.perf_counter()
+    writer.create_schema(schema, output_file)
+    for row in rows:
+        writer.write_row(row)
+    writer.close()
+    duration = time.perf_counter() - start
+    os.remove(output_file)
+    return len(rows) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500000, help="Number of rows written per sample table")
+    args = parser.parse_args()
+
+    results = []
+    for file_path, schema_name, table_name in SAMPLE_TABLES:
+        schema, sample_rows = read_sample_rows(file_path, schema_name, table_name)
+        rows = list(itertools.islice(itertools.cycle(sample_rows), args.rows))
+        throughputs = [measure_rows_per_second(load_mode, schema, rows) for load_mode in LOAD_MODES]
+        results.append((os.path.basename(file_path), len(schema["columns"]), throughputs))
+
+    print("{:<40}{:>9}".format("Sample file", "columns") + "".join("{:>18}".format(m + " (rows/s)") for m in LOAD_MODES))
+    for file_name, columns_count, throughputs in results:
+        print("{:<40}{:>9}".format(file_name, columns_count) + "".join("{:>18,.0f}".format(t) for t in throughputs))
+
+
+if __name__ == "__main__":
+    main()
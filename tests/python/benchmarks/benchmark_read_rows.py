@@ -0,0 +1,110 @@
+"""
+Benchmark of `TableauTableReader.read_row` on `data/ranked_customers_18766-rows.hyper` scaled up.
+
+The sample table is repeated up to the requested number of rows in a temporary Tableau Hyper file, which is then
+read entirely. The previous per-row emission (generic conversion, then a dict built by zipping with the DSS
+columns) is replayed on the same rows as a baseline. The columnar read modes (pyarrow required) and the parallel
+read of range partitions are measured too.
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+
+from tableauhyperapi import Connection
+from tableauhyperapi import SchemaName
+from tableauhyperapi import TableName
+
+from hyper_process_pool import get_shared_hyper_process
+from tableau_partitioned_reader import create_table_reader
+
+SAMPLE_FILE = "data/ranked_customers_18766-rows.hyper"
+
+
+def create_scaled_file(rows_count, output_file):
+    sample_table = TableName("sample", "Extract", "Extract")
+    output_table = TableName("output", "Extract", "Extract")
+    with get_shared_hyper_process() as hyper:
+        with Connection(hyper.endpoint) as connection:
+            connection.catalog.create_database(output_file)
+            connection.catalog.attach_database(output_file, alias="output")
+            connection.catalog.attach_database(os.path.abspath(SAMPLE_FILE), alias="sample")
+            sample_rows_count = connection.execute_scalar_query(f"SELECT COUNT(*) FROM {sample_table}")
+            repetitions = math.ceil(rows_count / sample_rows_count)
+            connection.catalog.create_schema(SchemaName("output", "Extract"))
+            connection.execute_command(
+                f"CREATE TABLE {output_table} AS SELECT sample_table.* "
+                f"FROM {sample_table} sample_table, generate_series(1, {repetitions}) LIMIT {rows_count}")
+
+
+def open_reader(file_path, config=None):
+    reader = create_table_reader(config, "Extract", "Extract")
+    reader.create_tmp_hyper_file()
+    with open(file_path, "rb") as stream:
+        reader.read_buffer(stream)
+    reader.open_connection()
+    reader.read_hyper_columns()
+    return reader
+
+
+def read_rows_before(reader):
+    """
+    Previous emission: LIFO pops, generic conversion and dict built from the DSS columns descriptors
+    """
+    rows_count = 0
+    rows = []
+    while True:
+        if not rows:
+            rows = reader.fetch_rows(reader.limit)
+            if not rows:
+                break
+        hyper_row = rows.pop()
+        dss_row = [reader.schema_converter.type_converter.hyper_value_to_dss(value_, type_)
+                   for value_, type_ in zip(hyper_row, reader.hyper_storage_types)]
+        row = {}
+        for column, value in zip(reader.dss_columns, dss_row):
+            row[column["name"]] = value
+        rows_count += 1
+    reader.close_connection()
+    return rows_count
+
+
+def read_rows_after(reader):
+    rows_count = 0
+    while reader.read_row() is not None:
+        rows_count += 1
+    return rows_count
+
+
+def measure_rows_per_second(read_rows, file_path, config=None):
+    reader = open_reader(file_path, config)
+    start = time.perf_counter()
+    rows_count = read_rows(reader)
+    return rows_count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000, help="Number of rows of the scaled table")
+    parser.add_argument("--workers", type=int, default=4, help="Number of workers of the parallel read")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        scaled_file = os.path.join(directory, "ranked_customers_scaled.hyper")
+        create_scaled_file(args.rows, scaled_file)
+        before = measure_rows_per_second(read_rows_before, scaled_file)
+        results = [("ROWS (before)", before)]
+        for read_mode in ["ROWS", "ARROW", "PARQUET"]:
+            results.append((read_mode, measure_rows_per_second(read_rows_after, scaled_file, {"read_mode": read_mode})))
+        parallel_config = {"parallel_read_workers": args.workers, "partition_method": "RANGE", "partition_column": "rank"}
+        results.append(("ROWS x{}".format(args.workers),
+                        measure_rows_per_second(read_rows_after, scaled_file, parallel_config)))
+    print("{:<16}{:>12}{:>18}{:>10}".format("read mode", "rows", "rows/s", "speedup"))
+    for read_mode, rows_per_second in results:
+        print("{:<16}{:>12}{:>18,.0f}{:>9.1f}x".format(read_mode, args.rows, rows_per_second, rows_per_second / before))
+
+
+if __name__ == "__main__":
+    main()
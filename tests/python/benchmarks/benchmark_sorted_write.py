@@ -0,0 +1,76 @@
+"""
+Benchmark of the sort columns of `TableauTableWriter`.
+
+Rows arriving in a random order are written with and without sorting them on a date column. The time added to the
+export by the sort is compared with the time of a query filtering a narrow date range, the kind of query a
+dashboard sends, which reads fewer blocks once the rows are clustered on the date.
+"""
+
+import argparse
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from tableauhyperapi import Connection
+from tableauhyperapi import TableName
+
+from hyper_process_pool import get_shared_hyper_process
+from tableau_table_writer import TableauTableWriter
+
+SCHEMA = {"columns": [{"name": "order_date", "type": "date"}, {"name": "customer_id", "type": "bigint"},
+                      {"name": "amount", "type": "double"}]}
+QUERY_REPETITIONS = 20
+
+
+def generate_rows(rows_count):
+    random.seed(0)
+    first_day = datetime.date(2024, 1, 1)
+    return [((first_day + datetime.timedelta(days=random.randrange(730))).isoformat(), random.randrange(100000),
+             random.random() * 1000) for _ in range(rows_count)]
+
+
+def write_rows(rows, output_file, sort_columns):
+    writer = TableauTableWriter(config={"sort_columns": sort_columns}, schema_name="Extract", table_name="Extract")
+    start = time.perf_counter()
+    writer.create_schema(SCHEMA, output_file)
+    for row in rows:
+        writer.write_row(row)
+    writer.close()
+    return time.perf_counter() - start, writer.sort_duration
+
+
+def measure_filtered_query(output_file):
+    query = (f"SELECT SUM(amount) FROM {TableName('Extract', 'Extract')} "
+             f"WHERE order_date BETWEEN DATE '2025-03-01' AND DATE '2025-03-07'")
+    with get_shared_hyper_process() as hyper:
+        with Connection(hyper.endpoint, output_file) as connection:
+            connection.execute_scalar_query(query)
+            start = time.perf_counter()
+            for _ in range(QUERY_REPETITIONS):
+                connection.execute_scalar_query(query)
+            return (time.perf_counter() - start) / QUERY_REPETITIONS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000000, help="Number of rows written")
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for label, sort_columns in [("arrival order", None), ("sorted on date", ["order_date"])]:
+            output_file = os.path.join(directory, "benchmark_sorted_write.hyper")
+            write_duration, sort_duration = write_rows(rows, output_file, sort_columns)
+            results.append((label, write_duration, sort_duration, measure_filtered_query(output_file)))
+            os.remove(output_file)
+
+    print("{:<18}{:>12}{:>12}{:>21}".format("rows order", "write (s)", "sort (s)", "filtered query (ms)"))
+    for label, write_duration, sort_duration, query_duration in results:
+        print("{:<18}{:>12.2f}{:>12.2f}{:>21.2f}".format(label, write_duration, sort_duration, query_duration * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Micro-benchmark of the parsing of DSS date strings exported to Tableau Hyper.
+
+Compares `pd.to_datetime` called on each value with the per-column `TimestampParser`,
+on distinct timestamps and on repeated ones (for instance daily dates).
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+import pandas as pd
+
+from type_conversion import TimestampParser
+
+DSS_DATE_FORMATS = {
+    'date': '{:%Y-%m-%dT%H:%M:%S.%f}Z',
+    'datetimenotz': '{:%Y-%m-%d %H:%M:%S}',
+}
+
+
+def generate_values(value_format, values_count, distinct_values_count):
+    start = datetime.datetime(2020, 1, 1)
+    timestamps = [start + datetime.timedelta(seconds=random.randint(0, 10 ** 8)) for _ in range(distinct_values_count)]
+    return [value_format.format(random.choice(timestamps)) for _ in range(values_count)]
+
+
+def measure_values_per_second(function, values):
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return len(values) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=100000, help="Number of parsed values per case")
+    args = parser.parse_args()
+
+    print("{:<14}{:>12}{:>20}{:>20}{:>10}".format(
+        "DSS type", "distinct", "before (values/s)", "after (values/s)", "speedup"))
+    for dss_type, value_format in sorted(DSS_DATE_FORMATS.items()):
+        for distinct_values_count in [args.values, 1000]:
+            values = generate_values(value_format, args.values, distinct_values_count)
+            before = measure_values_per_second(pd.to_datetime, values)
+            after = measure_values_per_second(TimestampParser(), values)
+            print("{:<14}{:>12}{:>20,.0f}{:>20,.0f}{:>9.1f}x".format(
+                dss_type, distinct_values_count, before, after, after / before))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark of the DSS to Tableau Hyper value conversion, for each DSS storage type.
+
+Compares the generic per-value conversion (`TypeConversion.dss_value_to_hyper`) with the per-schema
+conversion plan compiled by `SchemaConversion.set_dss_storage_types`.
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from schema_conversion import SchemaConversion
+
+NULL_RATIO = 0.1
+
+SAMPLE_VALUES = {
+    'array': lambda: '["a", "b"]',
+    'bigint': lambda: random.randint(-2 ** 40, 2 ** 40),
+    'boolean': lambda: random.random() > 0.5,
+    'date': lambda: pd.Timestamp('2018-10-19 13:20:50.349000'),
+    'dateonly': lambda: '2018-10-19',
+    'datetimenotz': lambda: pd.Timestamp('2018-10-19 13:20:50'),
+    'double': lambda: random.random() * 1000,
+    'float': lambda: random.random(),
+    'geometry': lambda: 'POLYGON((0 0,3 0,3 3,0 3,0 0))',
+    'geopoint': lambda: 'POINT(-73.97237 40.64749)',
+    'int': lambda: random.randint(-2 ** 30, 2 ** 30),
+    'map': lambda: '{"a": 1}',
+    'object': lambda: '{"a": {"b": 1}}',
+    'smallint': lambda: random.randint(-2 ** 14, 2 ** 14),
+    'string': lambda: 'Clean & quiet apt home by the park',
+    'tinyint': lambda: random.randint(-127, 127),
+}
+
+
+def generate_rows(dss_type, rows_count):
+    generate_value = SAMPLE_VALUES[dss_type]
+    return [(float("nan") if random.random() < NULL_RATIO else generate_value(),) for _ in range(rows_count)]
+
+
+def measure_rows_per_second(function, rows):
+    start = time.perf_counter()
+    for row in rows:
+        function(row)
+    return len(rows) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000, help="Number of rows converted per DSS type")
+    args = parser.parse_args()
+
+    print("{:<14}{:>18}{:>18}{:>10}".format("DSS type", "before (rows/s)", "after (rows/s)", "speedup"))
+    for dss_type in sorted(SAMPLE_VALUES):
+        schema_converter = SchemaConversion(None)
+        schema_converter.set_dss_storage_types([dss_type])
+        type_converter = schema_converter.type_converter
+        rows = generate_rows(dss_type, args.rows)
+
+        def generic_conversion(row):
+            return [type_converter.dss_value_to_hyper(value_, type_) for value_, type_ in zip(row, [dss_type])]
+
+        before = measure_rows_per_second(generic_conversion, rows)
+        after = measure_rows_per_second(schema_converter.prepare_row_to_hyper, rows)
+        print("{:<14}{:>18,.0f}{:>18,.0f}{:>9.1f}x".format(dss_type, before, after, after / before))
+
+
+if __name__ == "__main__":
+    main()
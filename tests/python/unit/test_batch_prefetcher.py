@@ -0,0 +1,52 @@
+from unittest import TestCase
+from batch_prefetcher import BatchPrefetcher
+
+
+class BatchSource(object):
+
+    def __init__(self, batches_count, failing_batch=None):
+        self.batches_count = batches_count
+        self.failing_batch = failing_batch
+        self.fetched_batches_count = 0
+
+    def fetch_batch(self):
+        self.fetched_batches_count += 1
+        if self.fetched_batches_count == self.failing_batch:
+            raise ValueError("Invalid batch")
+        if self.fetched_batches_count > self.batches_count:
+            return []
+        return [{"batch": self.fetched_batches_count, "row": index} for index in range(10)]
+
+
+class TestBatchPrefetcher(TestCase):
+
+    def test_batches_are_fetched_in_order(self):
+        prefetcher = BatchPrefetcher(BatchSource(20).fetch_batch, queue_size=2)
+        rows = []
+        batch = prefetcher.get()
+        while batch:
+            rows.extend(batch)
+            batch = prefetcher.get()
+        prefetcher.close()
+
+        assert rows == [{"batch": batch, "row": index} for batch in range(1, 21) for index in range(10)]
+        assert prefetcher.batches_count == 20
+        assert prefetcher.max_queued_size > 0
+        assert prefetcher.queued_size == 0
+
+    def test_background_error_is_raised_after_the_previous_batches(self):
+        prefetcher = BatchPrefetcher(BatchSource(20, failing_batch=3).fetch_batch, queue_size=2)
+        assert prefetcher.get()[0]["batch"] == 1
+        assert prefetcher.get()[0]["batch"] == 2
+        with self.assertRaises(ValueError):
+            prefetcher.get()
+        prefetcher.close()
+
+    def test_close_before_the_end(self):
+        source = BatchSource(1000)
+        prefetcher = BatchPrefetcher(source.fetch_batch, queue_size=2)
+        prefetcher.get()
+        prefetcher.close()
+
+        assert not prefetcher.thread.is_alive()
+        assert source.fetched_batches_count < 1000
@@ -0,0 +1,20 @@
+from unittest import TestCase
+from decimal import Decimal
+from csv_staging import get_csv_formatter
+from tableauhyperapi import SqlType
+import datetime
+
+
+class TestCsvStaging(TestCase):
+
+    def test_csv_formatters(self):
+        assert get_csv_formatter(SqlType.big_int())(12) == '12'
+        assert get_csv_formatter(SqlType.double())(0.1) == '0.1'
+        assert get_csv_formatter(SqlType.double())(float('-inf')) == '-inf'
+        assert get_csv_formatter(SqlType.numeric(10, 2))(Decimal('12.30')) == '12.30'
+        assert get_csv_formatter(SqlType.date())(datetime.date(2024, 2, 29)) == '2024-02-29'
+        assert get_csv_formatter(SqlType.text())('say "hi"') == '"say ""hi"""'
+
+    def test_unknown_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_csv_formatter(SqlType.bytes())
@@ -0,0 +1,67 @@
+from unittest import TestCase
+import os
+import signal
+import time
+from tableauhyperapi import Connection
+from hyper_process_pool import HyperProcessPool
+
+
+def get_hyperd_pids():
+    """
+    :return: the pids of the hyperd processes started by this process
+    """
+    pids = set()
+    for name in os.listdir("/proc"):
+        try:
+            with open("/proc/{}/stat".format(name)) as stat_file:
+                stat = stat_file.read()
+        except (OSError, ValueError):
+            continue
+        command, fields = stat[stat.find("(") + 1:stat.rfind(")")], stat[stat.rfind(")") + 2:].split()
+        if command.startswith("hyperd") and int(fields[1]) == os.getpid():
+            pids.add(int(name))
+    return pids
+
+
+class TestHyperProcessPool(TestCase):
+
+    def test_leases_share_one_process(self):
+        pool = HyperProcessPool(idle_timeout=0)
+        first_lease = pool.acquire()
+        second_lease = pool.acquire()
+        assert first_lease.endpoint.connection_descriptor == second_lease.endpoint.connection_descriptor
+        assert pool.starts_count == 1
+
+        first_lease.close()
+        first_lease.close()
+        assert pool.hyper is not None
+        with Connection(second_lease.endpoint) as connection:
+            assert connection.execute_scalar_query("SELECT 1") == 1
+        second_lease.close()
+        assert pool.hyper is None
+
+    def test_process_is_stopped_once_idle(self):
+        pool = HyperProcessPool(idle_timeout=0.2)
+        with pool.acquire():
+            pass
+        with pool.acquire():
+            pass
+        assert pool.starts_count == 1
+        assert pool.hyper is not None
+        time.sleep(1)
+        assert pool.hyper is None
+        pool.shutdown()
+
+    def test_crashed_process_is_restarted(self):
+        pool = HyperProcessPool(idle_timeout=10)
+        running_pids = get_hyperd_pids()
+        with pool.acquire():
+            pids = get_hyperd_pids() - running_pids
+            assert len(pids) == 1
+            os.kill(pids.pop(), signal.SIGKILL)
+        with pool.acquire() as lease:
+            with Connection(lease.endpoint) as connection:
+                assert connection.execute_scalar_query("SELECT 1") == 1
+        assert pool.starts_count == 2
+        pool.shutdown()
+        assert pool.hyper is None
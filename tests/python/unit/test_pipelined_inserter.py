@@ -0,0 +1,55 @@
+from unittest import TestCase
+from pipelined_inserter import PipelinedInserter
+import threading
+
+
+class FakeInserter(object):
+
+    def __init__(self, failing_batch=None):
+        self.rows = []
+        self.is_open = True
+        self.executed = False
+        self.failing_batch = failing_batch
+        self.batches_count = 0
+        self.threads = set()
+
+    def add_rows(self, rows):
+        self.threads.add(threading.current_thread().name)
+        self.batches_count += 1
+        if self.batches_count == self.failing_batch:
+            raise ValueError("Invalid batch")
+        self.rows.extend(rows)
+
+    def execute(self):
+        self.executed = True
+        self.is_open = False
+
+    def close(self):
+        self.is_open = False
+
+
+class TestPipelinedInserter(TestCase):
+
+    def test_batches_are_inserted_in_order_in_background(self):
+        fake_inserter = FakeInserter()
+        inserter = PipelinedInserter(fake_inserter, queue_size=1)
+        for index in range(100):
+            inserter.add_rows([[index], [index + 0.5]])
+        inserter.execute()
+        inserter.close()
+
+        assert fake_inserter.executed
+        assert fake_inserter.rows == [[value] for index in range(100) for value in (index, index + 0.5)]
+        assert fake_inserter.threads == {"hyper-inserter"}
+
+    def test_background_error_is_raised(self):
+        fake_inserter = FakeInserter(failing_batch=3)
+        inserter = PipelinedInserter(fake_inserter, queue_size=1)
+        with self.assertRaises(ValueError):
+            for index in range(100):
+                inserter.add_rows([[index]])
+            inserter.execute()
+        inserter.close()
+
+        assert not fake_inserter.executed
+        assert not fake_inserter.is_open
@@ -0,0 +1,68 @@
+from unittest import TestCase
+from spool_cache import build_columns
+from spool_cache import describe_columns
+from spool_cache import SpoolCache
+from tableauhyperapi import Name, Nullability, SqlType, TableDefinition
+import io
+import os
+import tempfile
+
+
+class TestSpoolCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SpoolCache(os.path.join(self.directory.name, "cache"), 10 * 1024 * 1024)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def list_cached_files(self):
+        return sorted(file_name for file_name in os.listdir(self.cache.directory) if file_name.endswith(".hyper"))
+
+    def test_same_content_is_cached_once(self):
+        content = os.urandom(1024 * 1024)
+        cached_file_path = self.cache.spool(io.BytesIO(content))
+        assert self.cache.spool(io.BytesIO(content)) == cached_file_path
+        assert self.list_cached_files() == [os.path.basename(cached_file_path)]
+        with open(cached_file_path, "rb") as cached_file:
+            assert cached_file.read() == content
+
+    def test_cached_file_stream_is_not_copied_again(self):
+        source_path = os.path.join(self.directory.name, "source.hyper")
+        with open(source_path, "wb") as source:
+            source.write(os.urandom(1024 * 1024))
+        with open(source_path, "rb") as stream:
+            cached_file_path = self.cache.spool(stream)
+        inode = os.stat(cached_file_path).st_ino
+        with open(source_path, "rb") as stream:
+            assert self.cache.spool(stream) == cached_file_path
+        assert os.stat(cached_file_path).st_ino == inode
+
+    def test_least_recently_used_files_are_evicted(self):
+        contents = [os.urandom(4 * 1024 * 1024) for _ in range(3)]
+        first_path = self.cache.spool(io.BytesIO(contents[0]))
+        os.utime(first_path, (0, 0))
+        second_path = self.cache.spool(io.BytesIO(contents[1]))
+        os.utime(second_path, (1, 1))
+        # Reading the first content again makes it the most recently used one
+        self.cache.spool(io.BytesIO(contents[0]))
+        third_path = self.cache.spool(io.BytesIO(contents[2]))
+
+        assert self.list_cached_files() == sorted(os.path.basename(path) for path in [first_path, third_path])
+
+    def test_columns_are_cached_with_their_types(self):
+        cached_file_path = self.cache.spool(io.BytesIO(b"content"))
+        columns = [
+            TableDefinition.Column(Name("id"), SqlType.big_int(), Nullability.NOT_NULLABLE),
+            TableDefinition.Column(Name("price"), SqlType.numeric(10, 2)),
+            TableDefinition.Column(Name("code"), SqlType.char(3)),
+            TableDefinition.Column(Name("location"), SqlType.geography()),
+        ]
+        assert self.cache.get_columns(cached_file_path, "TABLE:Extract") is None
+        self.cache.set_columns(cached_file_path, "TABLE:Extract", columns)
+
+        cached_columns = self.cache.get_columns(cached_file_path, "TABLE:Extract")
+        assert [(column.name, column.type, column.nullability) for column in cached_columns] == \
+            [(column.name, column.type, column.nullability) for column in columns]
+        assert describe_columns(build_columns(describe_columns(columns))) == describe_columns(columns)
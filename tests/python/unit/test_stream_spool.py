@@ -0,0 +1,42 @@
+from unittest import TestCase
+import io
+import os
+import tempfile
+from stream_spool import spool_stream
+
+
+class TestStreamSpool(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.content = os.urandom(3 * 1024 * 1024 + 17)
+        self.source_path = os.path.join(self.directory.name, "source.hyper")
+        with open(self.source_path, "wb") as source:
+            source.write(self.content)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def spool_and_read(self, stream):
+        destination_path = os.path.join(self.directory.name, "destination.hyper")
+        copied_size = spool_stream(stream, destination_path, buffer_size=1024 * 1024)
+        with open(destination_path, "rb") as destination:
+            return copied_size, destination.read()
+
+    def test_spool_file_stream(self):
+        with open(self.source_path, "rb") as stream:
+            copied_size, copied_content = self.spool_and_read(stream)
+        assert copied_size == len(self.content)
+        assert copied_content == self.content
+
+    def test_spool_partially_read_file_stream(self):
+        with open(self.source_path, "rb") as stream:
+            head = stream.read(10)
+            copied_size, copied_content = self.spool_and_read(stream)
+        assert head + copied_content == self.content
+        assert copied_size == len(self.content) - 10
+
+    def test_spool_in_memory_stream(self):
+        copied_size, copied_content = self.spool_and_read(io.BytesIO(self.content))
+        assert copied_size == len(self.content)
+        assert copied_content == self.content
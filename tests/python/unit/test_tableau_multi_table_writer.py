@@ -0,0 +1,87 @@
+from unittest import TestCase
+from tableau_multi_table_writer import TableauMultiTableWriter
+from tableauhyperapi import Connection, TableName
+from tableau_server_utils import get_hyper_process
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Testing - Tableau Hyper API | %(levelname)s - %(message)s')
+
+
+class TestTableauMultiTableWriter(TestCase):
+
+    def setUp(self):
+        self.destination_file_path = os.path.join(tempfile.gettempdir(), "multi_table_export.hyper")
+
+    def tearDown(self):
+        if os.path.exists(self.destination_file_path):
+            os.remove(self.destination_file_path)
+
+    def test_export_star_schema(self):
+        fact_schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'customer_id', 'type': 'bigint'},
+                                   {'name': 'product_id', 'type': 'bigint'}]}
+        customer_schema = {'columns': [{'name': 'customer_id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        product_schema = {'columns': [{'name': 'product_id', 'type': 'bigint'}, {'name': 'label', 'type': 'string'},
+                                      {'name': 'location', 'type': 'geopoint'}]}
+        multi_table_writer = TableauMultiTableWriter({})
+        multi_table_writer.open(self.destination_file_path)
+        multi_table_writer.load_table('Extract', 'customers', customer_schema,
+                                      ((index, 'customer_{}'.format(index)) for index in range(1000)))
+        multi_table_writer.load_table('Dimensions', 'products', product_schema,
+                                      [(index, 'product_{}'.format(index), 'POINT(2.35 48.85)') for index in range(10)])
+        writer = multi_table_writer.create_table_writer('Extract', 'Extract', fact_schema)
+        for index in range(5000):
+            writer.write_row((index, index % 1000, index % 10))
+        writer.close()
+        rows_counts = multi_table_writer.close()
+
+        assert rows_counts == {('Extract', 'customers'): 1000, ('Dimensions', 'products'): 10}
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=self.destination_file_path) as connection:
+                joined_rows_count = connection.execute_scalar_query(
+                    f"SELECT COUNT(*) FROM {TableName('Extract', 'Extract')} facts "
+                    f"JOIN {TableName('Extract', 'customers')} customers ON facts.customer_id = customers.customer_id "
+                    f"JOIN {TableName('Dimensions', 'products')} products ON facts.product_id = products.product_id")
+        assert joined_rows_count == 5000
+
+    def test_background_tables_are_sorted(self):
+        fact_schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'customer_id', 'type': 'bigint'}]}
+        customer_schema = {'columns': [{'name': 'customer_id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        product_schema = {'columns': [{'name': 'product_id', 'type': 'bigint'}]}
+        multi_table_writer = TableauMultiTableWriter({"sort_columns": ["customer_id"]})
+        multi_table_writer.open(self.destination_file_path)
+        multi_table_writer.load_table('Extract', 'customers', customer_schema,
+                                      [(index, 'customer_{}'.format(index)) for index in [3, 1, 2]])
+        multi_table_writer.load_table('Extract', 'products', product_schema, [(2,), (1,)])
+        writer = multi_table_writer.create_table_writer('Extract', 'Extract', fact_schema)
+        for index, customer_id in enumerate([2, 3, 1]):
+            writer.write_row((index, customer_id))
+        writer.close()
+        multi_table_writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=self.destination_file_path) as connection:
+                customer_ids = connection.execute_list_query(
+                    f"SELECT customer_id FROM {TableName('Extract', 'customers')}")
+                product_ids = connection.execute_list_query(f"SELECT product_id FROM {TableName('Extract', 'products')}")
+        assert customer_ids == [[1], [2], [3]]
+        assert sorted(product_ids) == [[1], [2]]
+
+    def test_export_same_table_twice(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}]}
+        multi_table_writer = TableauMultiTableWriter({})
+        multi_table_writer.open(self.destination_file_path)
+        multi_table_writer.load_table('Extract', 'Extract', schema, [(1,)])
+        with self.assertRaises(ValueError):
+            multi_table_writer.create_table_writer('Extract', 'Extract', schema)
+        multi_table_writer.close()
+
+    def test_failed_background_table(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}]}
+        multi_table_writer = TableauMultiTableWriter({})
+        multi_table_writer.open(self.destination_file_path)
+        multi_table_writer.load_table('Extract', 'dimension', schema, [(1,), ('not a number',)])
+        with self.assertRaises(Exception):
+            multi_table_writer.close()
@@ -0,0 +1,151 @@
+from unittest import TestCase
+from tableau_partitioned_reader import create_table_reader
+from tableau_partitioned_reader import get_range_boundaries
+from tableau_partitioned_reader import get_range_conditions
+from tableau_partitioned_reader import TableauPartitionedTableReader
+from tableau_table_reader import TableauTableReader
+import logging
+import os
+import queue
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Testing - Tableau Hyper API | %(levelname)s - %(message)s')
+
+FILE_TEST_PATH = "./data/ranked_customers_18766-rows.hyper"
+
+
+def open_reader(config):
+    tableau_reader = create_table_reader(config, 'Extract', 'Extract')
+    tableau_reader.create_tmp_hyper_file()
+    with open(FILE_TEST_PATH, "rb") as stream:
+        tableau_reader.read_buffer(stream)
+    tableau_reader.open_connection()
+    tableau_reader.read_hyper_columns()
+    return tableau_reader
+
+
+def read_all_rows(tableau_reader):
+    rows = []
+    row = tableau_reader.read_row()
+    while row is not None:
+        rows.append(row)
+        row = tableau_reader.read_row()
+    return sorted(rows, key=lambda row: row["rank"])
+
+
+class ExitedWorker(object):
+    """
+    Worker process which has already exited
+    """
+
+    def is_alive(self):
+        return False
+
+    def join(self):
+        pass
+
+
+class ScriptedQueue(object):
+    """
+    Queue returning the given items in order, a None item standing for a timeout
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def get(self, timeout=None):
+        item = self.items.pop(0)
+        if item is None:
+            raise queue.Empty()
+        return item
+
+
+def open_reader_with_exited_workers(batches_queue_items):
+    tableau_reader = open_reader({"parallel_read_workers": 2, "partition_column": "rank"})
+    tableau_reader.workers = [ExitedWorker(), ExitedWorker()]
+    tableau_reader.batches_queue = ScriptedQueue(batches_queue_items)
+    return tableau_reader
+
+
+class TestTableauPartitionedReader(TestCase):
+
+    def test_create_table_reader(self):
+        assert type(create_table_reader({}, 'Extract', 'Extract')) is TableauTableReader
+        assert isinstance(create_table_reader({"parallel_read_workers": 3, "partition_column": "rank"},
+                                              'Extract', 'Extract'), TableauPartitionedTableReader)
+        with self.assertRaises(ValueError):
+            create_table_reader({"parallel_read_workers": 3}, 'Extract', 'Extract')
+        with self.assertRaises(ValueError):
+            create_table_reader({"parallel_read_workers": 3, "partition_column": "rank", "read_mode": "ARROW"},
+                                'Extract', 'Extract')
+
+    def test_range_conditions(self):
+        assert get_range_boundaries(1, 100, 4, True) == [26, 51, 76]
+        assert get_range_boundaries(0.0, 1.0, 2, False) == [0.5]
+        assert get_range_conditions('"id"', [26, 51]) == [
+            '"id" < 26 OR "id" IS NULL', '"id" >= 26 AND "id" < 51', '"id" >= 51']
+
+    def test_parallel_read_matches_read(self):
+        expected_rows = read_all_rows(open_reader({}))
+        for partition_method in ["HASH", "RANGE"]:
+            config = {"parallel_read_workers": 3, "partition_method": partition_method, "partition_column": "rank"}
+            rows = read_all_rows(open_reader(config))
+            assert len(rows) == 18766
+            assert rows == expected_rows
+
+    def test_parallel_read_with_filter_on_another_column(self):
+        config = {"parallel_read_workers": 2, "partition_column": "customerID", "columns": ["rank"],
+                  "where_clause": '"rank" <= 1000'}
+        rows = read_all_rows(open_reader(config))
+        assert len(rows) == 1000
+        assert rows == read_all_rows(open_reader({"columns": ["rank"], "where_clause": '"rank" <= 1000'}))
+
+    def test_partitions_are_disjoint(self):
+        tableau_reader = open_reader({"parallel_read_workers": 4, "partition_method": "RANGE",
+                                      "partition_column": "rank", "columns": ["rank"]})
+        partitions = [[row["rank"] for row in tableau_reader.read_partition_rows(index)] for index in range(4)]
+        tableau_reader.close_connection()
+        expected_ranks = [row["rank"] for row in read_all_rows(open_reader({"columns": ["rank"]}))]
+
+        assert min(partitions[1]) > max(partitions[0]) and min(partitions[3]) > max(partitions[2])
+        assert sorted(rank for partition in partitions for rank in partition) == expected_ranks
+
+    def test_default_partition_method(self):
+        tableau_reader = open_reader({"parallel_read_workers": 2, "partition_column": "rank"})
+        tableau_reader.get_partition_conditions()
+        assert tableau_reader.partition_method == "RANGE"
+        tableau_reader.close_connection()
+        tableau_reader = open_reader({"parallel_read_workers": 2, "partition_column": "customerID"})
+        tableau_reader.get_partition_conditions()
+        assert tableau_reader.partition_method == "HASH"
+        tableau_reader.close_connection()
+
+    def test_range_partitions_require_a_numeric_column(self):
+        tableau_reader = open_reader({"parallel_read_workers": 2, "partition_method": "RANGE",
+                                      "partition_column": "customerID"})
+        with self.assertRaises(ValueError):
+            tableau_reader.read_row()
+        tableau_reader.close_connection()
+
+    def test_end_marker_read_after_the_worker_exited(self):
+        # The workers exit right after sending their end markers, which are still unread when the read times out
+        tableau_reader = open_reader_with_exited_workers([None, (0, None, None), (1, [(1,)], None), (1, None, None)])
+        assert tableau_reader.next_batch() == [{tableau_reader.dss_column_names[0]: 1}]
+        assert tableau_reader.next_batch() == []
+        tableau_reader.close_connection()
+
+    def test_exited_worker_without_end_marker(self):
+        tableau_reader = open_reader_with_exited_workers([(0, None, None), None, None])
+        with self.assertRaises(Exception) as context:
+            tableau_reader.next_batch()
+        assert "Read worker 1 stopped unexpectedly" in str(context.exception)
+        tableau_reader.close_connection()
+
+    def test_close_before_the_end(self):
+        tableau_reader = open_reader({"parallel_read_workers": 2, "partition_column": "rank"})
+        assert tableau_reader.read_row() is not None
+        workers = tableau_reader.workers
+        tableau_reader.close_connection()
+
+        assert not any(worker.is_alive() for worker in workers)
+        assert not os.path.exists(tableau_reader.path_to_hyper)
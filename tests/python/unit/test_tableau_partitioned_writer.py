@@ -0,0 +1,101 @@
+from unittest import TestCase
+from tableau_partitioned_writer import create_table_writer
+from tableau_partitioned_writer import TableauPartitionedTableWriter
+from tableau_table_writer import TableauTableWriter
+from tableauhyperapi import Connection, TableName
+from tableau_server_utils import get_hyper_process
+import logging
+import os
+import pandas as pd
+import signal
+import tempfile
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Testing - Tableau Hyper API | %(levelname)s - %(message)s')
+
+
+class TestTableauPartitionedWriter(TestCase):
+
+    def setUp(self):
+        self.destination_file_path = os.path.join(tempfile.gettempdir(), "partitioned_export.hyper")
+
+    def tearDown(self):
+        if os.path.exists(self.destination_file_path):
+            os.remove(self.destination_file_path)
+
+    def test_create_table_writer(self):
+        assert isinstance(create_table_writer({}, 'Extract', 'Extract'), TableauTableWriter)
+        assert isinstance(create_table_writer({"parallel_workers": 3}, 'Extract', 'Extract'),
+                          TableauPartitionedTableWriter)
+        with self.assertRaises(ValueError):
+            create_table_writer({"parallel_workers": 3, "write_mode": "APPEND"}, 'Extract', 'Extract')
+
+    def test_export_with_several_workers(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'},
+                              {'name': 'coordinates', 'type': 'geopoint'}]}
+        rows_count = 4321
+        writer = create_table_writer({"parallel_workers": 3}, 'Extract', 'Extract')
+        writer.create_schema(schema, self.destination_file_path)
+        for index in range(rows_count):
+            writer.write_row((index, 'name_{}'.format(index), 'POINT(-73.97 40.64)' if index % 2 else None))
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=self.destination_file_path) as connection:
+                table_name = TableName('Extract', 'Extract')
+                count, ids_sum, geo_count = connection.execute_list_query(
+                    f"SELECT COUNT(*), SUM(id), COUNT(coordinates) FROM {table_name}")[0]
+
+        assert count == rows_count
+        assert ids_sum == rows_count * (rows_count - 1) // 2
+        assert geo_count == rows_count // 2
+
+    def test_export_dataframes_with_several_workers(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        writer = create_table_writer({"parallel_workers": 2}, 'Extract', 'Extract')
+        writer.create_schema(schema, self.destination_file_path)
+        dataframes = [pd.DataFrame({'id': range(start, start + 1500), 'name': 'name'}) for start in [0, 1500]]
+        rows_count = writer.write_batches(dataframes)
+        writer.write_row((3000, 'name'))
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=self.destination_file_path) as connection:
+                count, ids_sum = connection.execute_list_query(
+                    f"SELECT COUNT(*), SUM(id) FROM {TableName('Extract', 'Extract')}")[0]
+
+        assert rows_count == 3000
+        assert count == 3001
+        assert ids_sum == 3000 * 3001 // 2
+
+    def test_worker_error_is_raised(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}]}
+        writer = create_table_writer({"parallel_workers": 2}, 'Extract', 'Extract')
+        writer.create_schema(schema, self.destination_file_path)
+        writer.write_row(('not a number',))
+        with self.assertRaises(Exception):
+            writer.close()
+
+    def test_export_sorted_with_several_workers(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'category', 'type': 'string'}]}
+        writer = create_table_writer({"parallel_workers": 2, "sort_columns": ["category", "id"]}, 'Extract', 'Extract')
+        writer.create_schema(schema, self.destination_file_path)
+        for index in reversed(range(3000)):
+            writer.write_row((index, 'category_{}'.format(index % 3)))
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=self.destination_file_path) as connection:
+                rows = connection.execute_list_query(f"SELECT category, id FROM {TableName('Extract', 'Extract')}")
+
+        assert rows == sorted(rows)
+        assert len(rows) == 3000
+
+    def test_killed_worker_is_raised(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}]}
+        writer = create_table_writer({"parallel_workers": 2}, 'Extract', 'Extract')
+        writer.create_schema(schema, self.destination_file_path)
+        writer.write_row((1,))
+        os.kill(writer.workers[0].pid, signal.SIGKILL)
+        with self.assertRaises(Exception):
+            writer.close()
@@ -0,0 +1,17 @@
+from unittest import TestCase
+from tableau_server_utils import get_local_extract_path
+import os
+import tempfile
+
+
+class TestTableauServerUtils(TestCase):
+
+    def test_local_extract_path_is_stable(self):
+        with tempfile.TemporaryDirectory() as root_directory:
+            path = get_local_extract_path("PROJECT", "Sales / EMEA", "daily orders", root_directory)
+            assert path == get_local_extract_path("PROJECT", "Sales / EMEA", "daily orders", root_directory)
+            assert path != get_local_extract_path("PROJECT", "Sales / EMEA", "weekly orders", root_directory)
+            assert os.path.dirname(path) == os.path.join(root_directory, "tableau-hyper-extracts", "PROJECT",
+                                                         "Sales___EMEA")
+            assert os.path.basename(path) == "daily_orders.hyper"
+            assert os.path.isdir(os.path.dirname(path))
@@ -0,0 +1,46 @@
+from unittest import TestCase
+from tableau_stream_writer import TableauStreamWriter
+from tableau_table_reader import TableauTableReader
+import datetime
+import io
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO, format='Plugin: Testing - Tableau Hyper API | %(levelname)s - %(message)s')
+
+
+class TestTableauStreamWriter(TestCase):
+
+    def test_write_hyper_file_to_stream(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'},
+                              {'name': 'created', 'type': 'date'}, {'name': 'location', 'type': 'geopoint'}]}
+        rows_count = 2345
+        stream = io.BytesIO()
+        with tempfile.TemporaryDirectory() as spool_directory:
+            stream_writer = TableauStreamWriter({"table_name": "Orders", "spool_directory": spool_directory})
+            stream_writer.open(schema)
+            for index in range(rows_count):
+                stream_writer.write_row([index, 'name_{}'.format(index), datetime.datetime(2021, 1, 1, 12, 30),
+                                         'POINT(-73.97 40.64)'])
+            written_size = stream_writer.close(stream)
+            assert os.listdir(spool_directory) == []
+
+        assert written_size == len(stream.getvalue()) > 0
+        stream.seek(0)
+        reader = TableauTableReader(config=None, schema_name="Extract", table_name="Orders")
+        reader.create_tmp_hyper_file()
+        reader.read_buffer(stream)
+        reader.open_connection()
+        reader.read_hyper_columns()
+        rows = []
+        row = reader.read_row()
+        while row is not None:
+            rows.append(row)
+            row = reader.read_row()
+
+        assert [column["type"] for column in reader.read_schema()] == ['bigint', 'string', 'date', 'geopoint']
+        assert len(rows) == rows_count
+        assert rows[-1] == {'id': rows_count - 1, 'name': 'name_{}'.format(rows_count - 1),
+                            'created': datetime.datetime(2021, 1, 1, 12, 30), 'location': 'POINT(-73.9700000 40.6400000)'}
@@ -1,6 +1,11 @@
 from unittest import TestCase
 from tableau_table_reader import TableauTableReader
+from columnar_export import FORMAT_PARQUET
+from tableauhyperapi import Connection, CreateMode, SqlType, TableName
+from tableau_server_utils import get_hyper_process
 import logging
+import os
+import tempfile
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='Plugin: Testing - Tableau Hyper API | %(levelname)s - %(message)s')
@@ -55,3 +60,261 @@ class TestTableauTableReader(TestCase):
         tableau_reader.close_connection()
 
         assert (count-1) == 18766
+
+    def test_read_every_row_once_with_a_single_query(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        self.stream = open(file_test_path, "rb")
+
+        tableau_reader = TableauTableReader(config=None, table_name='Extract', schema_name='Extract')
+        tableau_reader.limit = 5000
+        tableau_reader.create_tmp_hyper_file()
+        tableau_reader.read_buffer(self.stream)
+        tableau_reader.open_connection()
+        tableau_reader.read_hyper_columns()
+
+        executed_queries = []
+        execute_query = tableau_reader.connection.execute_query
+
+        def record_query(query):
+            executed_queries.append(query)
+            return execute_query(query)
+
+        tableau_reader.connection.execute_query = record_query
+        rows = []
+        row = tableau_reader.read_row()
+        while row:
+            rows.append(tuple(row.values()))
+            row = tableau_reader.read_row()
+
+        assert len(executed_queries) == 1
+        assert len(rows) == 18766
+        assert len(set(rows)) == len(rows)
+        assert tableau_reader.result is None
+
+    def test_read_from_configured_spool_directory(self):
+        file_test_path = "./data/revenue_prediction.hyper"
+        with tempfile.TemporaryDirectory() as directory:
+            spool_directory = os.path.join(directory, "spool")
+            tableau_reader = TableauTableReader(config={"spool_directory": spool_directory},
+                                                table_name='Extract', schema_name='Extract')
+            tableau_reader.create_tmp_hyper_file()
+            with open(file_test_path, "rb") as stream:
+                tableau_reader.read_buffer(stream)
+            assert os.path.dirname(tableau_reader.path_to_hyper) == spool_directory
+            assert os.path.getsize(tableau_reader.path_to_hyper) == os.path.getsize(file_test_path)
+
+            tableau_reader.open_connection()
+            tableau_reader.read_hyper_columns()
+            count = 0
+            while tableau_reader.read_row():
+                count += 1
+            assert count == 3713
+            assert not os.path.exists(tableau_reader.path_to_hyper)
+
+    def test_read_rows_in_file_order(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        tableau_reader = TableauTableReader(config=None, table_name='Extract', schema_name='Extract')
+        tableau_reader.limit = 1000
+        tableau_reader.create_tmp_hyper_file()
+        with open(file_test_path, "rb") as stream:
+            tableau_reader.read_buffer(stream)
+        tableau_reader.open_connection()
+        tableau_reader.read_hyper_columns()
+        expected_rows = [
+            dict(zip(tableau_reader.dss_column_names, tableau_reader.schema_converter.prepare_row_to_dss(hyper_row)))
+            for hyper_row in tableau_reader.connection.execute_list_query(
+                f'SELECT * FROM {tableau_reader.hyper_table}')
+        ]
+
+        rows = []
+        row = tableau_reader.read_row()
+        while row:
+            rows.append(row)
+            row = tableau_reader.read_row()
+
+        assert rows == expected_rows
+
+    def read_all_rows(self, file_test_path, config, schema_name='Extract', table_name='Extract'):
+        tableau_reader = TableauTableReader(config=config, table_name=table_name, schema_name=schema_name)
+        tableau_reader.create_tmp_hyper_file()
+        with open(file_test_path, "rb") as stream:
+            tableau_reader.read_buffer(stream)
+        tableau_reader.open_connection()
+        tableau_reader.read_hyper_columns()
+        rows = []
+        row = tableau_reader.read_row()
+        while row:
+            rows.append(row)
+            row = tableau_reader.read_row()
+        assert os.path.exists(tableau_reader.path_to_hyper) == (not tableau_reader.private_hyper_file)
+        return tableau_reader.read_schema(), rows
+
+    def test_columnar_read_modes_match_rows_read_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_test_path = os.path.join(directory, "all_types.hyper")
+            with get_hyper_process() as hyper:
+                with Connection(hyper.endpoint, file_test_path, CreateMode.CREATE_AND_REPLACE) as connection:
+                    connection.catalog.create_schema("Extract")
+                    connection.execute_command(f"""CREATE TABLE {TableName('Extract', 'Extract')} AS SELECT * FROM (VALUES
+                        (1::bigint, 2::int, 3::smallint, true, 1.5::double precision, 12.25::numeric(18, 2),
+                         'text', 'ab'::char(3), 'varchar'::varchar(20), 'ab'::bytea, DATE '2020-01-02',
+                         TIME '01:02:03.5', TIMESTAMP '2020-01-02 03:04:05.123456',
+                         TIMESTAMPTZ '2020-01-02 03:04:05.25+02', INTERVAL '1 day 2 hours',
+                         CAST('point(1 2)' AS {SqlType.geography()})),
+                        (NULL, NULL, NULL, NULL, 'NaN'::double precision, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+                         NULL, NULL, NULL, NULL)
+                    ) AS v(big_int, "int", small_int, bool, "double", "numeric", "text", "char", "varchar", bytes,
+                           "date", "time", "timestamp", timestamp_tz, "interval", geography)""")
+
+            for temporal_import_mode in ["LEGACY", "MODERN"]:
+                expected_schema, expected_rows = self.read_all_rows(
+                    file_test_path, {"temporal_import_mode": temporal_import_mode})
+                assert len(expected_rows) == 2
+                for read_mode in ["ARROW", "PARQUET"]:
+                    schema, rows = self.read_all_rows(
+                        file_test_path, {"temporal_import_mode": temporal_import_mode, "read_mode": read_mode})
+                    assert schema == expected_schema
+                    assert rows == expected_rows
+                    assert [[type(value) for value in row.values()] for row in rows] == \
+                        [[type(value) for value in row.values()] for row in expected_rows]
+
+    def test_read_record_batches(self):
+        file_test_path = "./data/superstore_sample.hyper"
+        _, expected_rows = self.read_all_rows(file_test_path, None, schema_name='public', table_name='Orders')
+
+        tableau_reader = TableauTableReader(config=None, table_name='Orders', schema_name='public')
+        tableau_reader.create_tmp_hyper_file()
+        with open(file_test_path, "rb") as stream:
+            tableau_reader.read_buffer(stream)
+        tableau_reader.open_connection()
+        tableau_reader.read_hyper_columns()
+        rows = []
+        for record_batch in tableau_reader.read_record_batches(FORMAT_PARQUET, batch_size=2):
+            assert record_batch.num_rows <= 2
+            rows.extend(record_batch.to_pylist())
+        tableau_reader.close_connection()
+
+        assert rows == expected_rows
+        assert not os.path.exists(tableau_reader.columnar_file_path)
+
+    def test_read_with_pushed_down_projection_filter_and_limit(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        config = {"columns": ["campaign", "rank"], "where_clause": "\"gender\" = 'F'", "max_rows": 100}
+        for read_mode in ["ROWS", "ARROW"]:
+            schema, rows = self.read_all_rows(file_test_path, dict(config, read_mode=read_mode))
+            assert schema == [{"name": "campaign", "type": "string"}, {"name": "rank", "type": "bigint"}]
+            assert len(rows) == 100
+            assert all(list(row) == ["campaign", "rank"] for row in rows)
+
+        _, all_rows = self.read_all_rows(file_test_path, {"columns": ["rank", "gender"], "where_clause": "\"gender\" = 'F'"})
+        assert all(row["gender"] == "F" for row in all_rows)
+        assert 0 < len(all_rows) < 18766
+
+    def test_read_unknown_selected_column(self):
+        tableau_reader = TableauTableReader(config={"columns": ["unknown_column"]}, table_name='Extract',
+                                            schema_name='Extract')
+        tableau_reader.create_tmp_hyper_file()
+        with open("./data/revenue_prediction.hyper", "rb") as stream:
+            tableau_reader.read_buffer(stream)
+        tableau_reader.open_connection()
+        with self.assertRaises(Exception):
+            tableau_reader.read_hyper_columns()
+        tableau_reader.close_connection()
+
+    def test_read_sql_query_result(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        config = {
+            "source_type": "QUERY",
+            "sql_query": """SELECT "gender", COUNT(*) AS "customers", MIN("rank") AS "best_rank",
+                                   AVG("rank") AS "average_rank"
+                            FROM "Extract"."Extract" GROUP BY "gender" ORDER BY "gender";""",
+            "where_clause": '"customers" > 1'
+        }
+        for read_mode in ["ROWS", "ARROW"]:
+            schema, rows = self.read_all_rows(file_test_path, dict(config, read_mode=read_mode))
+            assert schema == [{"name": "gender", "type": "string"}, {"name": "customers", "type": "bigint"},
+                              {"name": "best_rank", "type": "bigint"}, {"name": "average_rank", "type": "double"}]
+            assert sum(row["customers"] for row in rows) == 18766
+            genders = [row["gender"] for row in rows if row["gender"] is not None]
+            assert genders == sorted(genders)
+
+    def test_read_invalid_sql_query(self):
+        tableau_reader = TableauTableReader(config={"source_type": "QUERY", "sql_query": "SELECT * FROM unknown_table"},
+                                            table_name=None, schema_name=None)
+        tableau_reader.create_tmp_hyper_file()
+        with open("./data/revenue_prediction.hyper", "rb") as stream:
+            tableau_reader.read_buffer(stream)
+        tableau_reader.open_connection()
+        with self.assertRaises(Exception):
+            tableau_reader.read_hyper_columns()
+        tableau_reader.close_connection()
+
+    def test_prefetched_read_matches_read(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        for read_mode in ["ROWS", "ARROW"]:
+            _, expected_rows = self.read_all_rows(file_test_path, {"read_mode": read_mode})
+            _, rows = self.read_all_rows(file_test_path, {"read_mode": read_mode, "prefetch_queue_size": 2})
+            assert rows == expected_rows
+
+    def test_close_prefetched_read_before_the_end(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        tableau_reader = TableauTableReader(config={"prefetch_queue_size": 1}, table_name='Extract',
+                                            schema_name='Extract')
+        tableau_reader.limit = 100
+        tableau_reader.create_tmp_hyper_file()
+        with open(file_test_path, "rb") as stream:
+            tableau_reader.read_buffer(stream)
+        tableau_reader.open_connection()
+        tableau_reader.read_hyper_columns()
+        for _ in range(150):
+            assert tableau_reader.read_row() is not None
+        prefetcher = tableau_reader.prefetcher
+        tableau_reader.close_connection()
+
+        assert not prefetcher.thread.is_alive()
+        assert tableau_reader.prefetcher is None
+        assert not os.path.exists(tableau_reader.path_to_hyper)
+
+    def test_read_from_the_spool_cache(self):
+        file_test_path = "./data/ranked_customers_18766-rows.hyper"
+        with tempfile.TemporaryDirectory() as spool_directory:
+            config = {"spool_directory": spool_directory, "spool_cache_size_mb": 100}
+            _, expected_rows = self.read_all_rows(file_test_path, config)
+
+            tableau_reader = TableauTableReader(config=config, table_name='Extract', schema_name='Extract')
+            tableau_reader.create_tmp_hyper_file()
+            with open(file_test_path, "rb") as stream:
+                tableau_reader.read_buffer(stream)
+            tableau_reader.open_connection()
+            tableau_reader.read_table_columns = None
+            tableau_reader.read_hyper_columns()
+            rows = []
+            row = tableau_reader.read_row()
+            while row is not None:
+                rows.append(row)
+                row = tableau_reader.read_row()
+
+            assert rows == expected_rows
+            assert os.path.exists(tableau_reader.path_to_hyper)
+            assert os.path.dirname(tableau_reader.path_to_hyper) == tableau_reader.spool_cache.directory
+
+    def test_read_a_copy_of_a_locked_cached_file(self):
+        file_test_path = "./data/revenue_prediction.hyper"
+        with tempfile.TemporaryDirectory() as spool_directory:
+            config = {"spool_directory": spool_directory, "spool_cache_size_mb": 100}
+            tableau_reader = TableauTableReader(config=config, table_name='Extract', schema_name='Extract')
+            tableau_reader.create_tmp_hyper_file()
+            with open(file_test_path, "rb") as stream:
+                tableau_reader.read_buffer(stream)
+            with get_hyper_process() as hyper:
+                with Connection(hyper.endpoint, tableau_reader.cached_file_path):
+                    tableau_reader.open_connection()
+                    tableau_reader.read_hyper_columns()
+                    count = 0
+                    while tableau_reader.read_row() is not None:
+                        count += 1
+
+            assert count == 3713
+            assert tableau_reader.path_to_hyper != tableau_reader.cached_file_path
+            assert not os.path.exists(tableau_reader.path_to_hyper)
+            assert os.path.exists(tableau_reader.cached_file_path)
@@ -1,7 +1,9 @@
 from unittest import TestCase
+from unittest import mock
 from pandas import Timestamp
 from pandas import NaT
 from tableau_table_writer import TableauTableWriter
+from tableau_table_writer import get_encoded_size
 import logging
 import string
 import random
@@ -417,3 +419,320 @@ class TestTableauTableWriter(TestCase):
                 count += 1
 
         os.remove(destination_file_path)
+
+    def test_export_geo_values_without_intermediate_table(self):
+        config = {}
+        plugin_config = {}
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'coordinates', 'type': 'geopoint'}],
+                  'userModified': True}
+        rows = [(1, 'POINT(-73.97237 40.64749)'), (2, float("nan")), (3, 'POINT(-73.9419 40.80902)')]
+
+        exporter = TableauHyperExporter(config, plugin_config)
+        output_file_name = get_random_alphanumeric_string(10) + '.hyper'
+        destination_file_path = os.path.join(self.output_path, output_file_name)
+        exporter.open_to_file(schema, destination_file_path)
+        for row in rows:
+            exporter.write_row(row)
+        exporter.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                table_names = connection.catalog.get_table_names('Extract')
+                rows_from_hyper = connection.execute_list_query(
+                    query=f"SELECT id, coordinates IS NULL FROM {TableName('Extract', 'Extract')} ORDER BY id")
+
+        assert table_names == [TableName('Extract', 'Extract')]
+        assert rows_from_hyper == [[1, False], [2, True], [3, False]]
+
+        os.remove(destination_file_path)
+
+    def test_encoded_size(self):
+        assert get_encoded_size([1, 2.0, None, 'abc']) == 8 * 3 + 3
+        assert get_encoded_size(['é' * 10, b'\x00' * 5]) == 20 + 5
+        with mock.patch('tableau_table_writer.STR_HAS_ISASCII', False):
+            assert get_encoded_size([1, 'abc', 'é' * 10]) == 8 + 3 + 20
+
+    def test_buffer_is_flushed_on_its_encoded_size(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'text', 'type': 'string'}]}
+        writer = TableauTableWriter(config={"write_buffer_size_mb": 1}, schema_name='Extract', table_name='Extract')
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer.create_schema(schema, destination_file_path)
+        for index in range(100):
+            writer.write_row((index, 'x' * 100000))
+        writer.close()
+
+        assert writer.buffer_size == 1024 * 1024
+        assert writer.max_batch_rows == 11
+        assert writer.batches_count == 10
+        os.remove(destination_file_path)
+
+    def test_export_dataframes(self):
+        config = {}
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'},
+                              {'name': 'price', 'type': 'double'}, {'name': 'last_review', 'type': 'date'}],
+                  'userModified': True}
+        first_chunk = pd.DataFrame({'id': [1, 2], 'name': ['John', None], 'price': [149.0, float("nan")],
+                                    'last_review': pd.to_datetime(['2018-10-19', None])})
+        second_chunk = pd.DataFrame({'name': ['Laura'], 'id': [3], 'price': [80.0],
+                                     'last_review': pd.to_datetime(['2019-05-21 10:00:00'])})
+
+        writer = TableauTableWriter(config=config, schema_name='Extract', table_name='Extract')
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer.create_schema(schema, destination_file_path)
+        rows_count = writer.write_batches([first_chunk, second_chunk])
+        writer.write_row((4, 'Elisabeth', 150.0, NaT))
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                rows_from_hyper = connection.execute_list_query(
+                    query=f"SELECT id, name, price, last_review IS NULL FROM {TableName('Extract', 'Extract')} ORDER BY id")
+
+        assert rows_count == 3
+        assert rows_from_hyper == [[1, 'John', 149.0, False], [2, None, None, True],
+                                   [3, 'Laura', 80.0, False], [4, 'Elisabeth', 150.0, True]]
+
+        os.remove(destination_file_path)
+
+    def test_export_dataframe_in_slices(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'text', 'type': 'string'}]}
+        writer = TableauTableWriter(config={"write_buffer_size_mb": 1}, schema_name='Extract', table_name='Extract')
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer.create_schema(schema, destination_file_path)
+        rows_count = writer.write_dataframe(pd.DataFrame({'id': range(100), 'text': ['x' * 100000] * 100}))
+        writer.close()
+
+        assert rows_count == 100
+        assert writer.row_index == 100
+        assert writer.max_batch_rows == 11
+        os.remove(destination_file_path)
+
+    def test_export_dataframe_with_infinite_integer(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}]}
+        writer = TableauTableWriter(config={}, schema_name='Extract', table_name='Extract')
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer.create_schema(schema, destination_file_path)
+        with self.assertRaises(ValueError):
+            writer.write_dataframe(pd.DataFrame({'id': [1.0, float("inf")]}))
+        writer.close()
+        os.remove(destination_file_path)
+
+    def test_copy_load_mode_matches_inserter(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'},
+                              {'name': 'price', 'type': 'double'}, {'name': 'available', 'type': 'boolean'},
+                              {'name': 'date_only', 'type': 'dateonly'}, {'name': 'datetime_tz', 'type': 'date'},
+                              {'name': 'datetime_notz', 'type': 'datetimenotz'},
+                              {'name': 'coordinates', 'type': 'geopoint'}], 'userModified': True}
+        rows = [
+            (1, 'Clean, "quiet"\napt', 149.0, True, date(2025, 1, 31), pd.to_datetime('2025-01-31T01:02:03+0200'),
+             datetime(2025, 1, 31, 1, 2, 3), 'POINT(-73.97237 40.64749)'),
+            (2, '', 0.1, False, date(2013, 5, 30), Timestamp('2013-05-30 15:16:13.764'),
+             datetime(2013, 5, 30, 15, 16, 13, 764000), 'POINT(-73.9419 40.80902)'),
+            (3, float("nan"), float("nan"), None, float("nan"), NaT, NaT, float("nan"))
+        ]
+
+        rows_from_hyper = {}
+        for load_mode in ["INSERTER", "COPY"]:
+            for temporal_export_mode in ["LEGACY", "MODERN"]:
+                config = {"load_mode": load_mode, "temporal_export_mode": temporal_export_mode}
+                writer = TableauTableWriter(config=config, schema_name='Extract', table_name='Extract')
+                destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+                writer.create_schema(schema, destination_file_path)
+                for row in rows:
+                    writer.write_row(row)
+                writer.close()
+
+                with get_hyper_process() as hyper:
+                    with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                        rows_from_hyper[(load_mode, temporal_export_mode)] = connection.execute_list_query(
+                            query=f"SELECT *, coordinates::text FROM {TableName('Extract', 'Extract')} ORDER BY id")
+                os.remove(destination_file_path)
+
+        for temporal_export_mode in ["LEGACY", "MODERN"]:
+            assert len(rows_from_hyper[("COPY", temporal_export_mode)]) == len(rows)
+            assert rows_from_hyper[("COPY", temporal_export_mode)] == rows_from_hyper[("INSERTER", temporal_export_mode)]
+
+    def test_export_pipelined(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        rows_count = 2500
+        config = {"pipelined_insert": True, "pipeline_queue_size": 1}
+        writer = TableauTableWriter(config=config, schema_name='Extract', table_name='Extract')
+        writer.batch_size = 100
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer.create_schema(schema, destination_file_path)
+        for index in range(rows_count):
+            writer.write_row((index, 'name_{}'.format(index)))
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                rows_from_hyper = connection.execute_list_query(
+                    query=f"SELECT id, name FROM {TableName('Extract', 'Extract')}")
+
+        assert rows_from_hyper == [[index, 'name_{}'.format(index)] for index in range(rows_count)]
+        assert writer.batches_count == rows_count // 100
+
+        os.remove(destination_file_path)
+
+    def test_export_date_strings(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'datetime_notz', 'type': 'datetimenotz'},
+                              {'name': 'datetime_tz', 'type': 'date'}]}
+        rows = [
+            (1, '2025-01-31 01:02:03', '2013-05-30T15:16:13.764Z'),
+            (2, '2025-01-31 01:02:03', 'not a date'),
+            (3, 'not a date either', '2013-05-30T15:16:13.764Z'),
+            (4, None, 'not a date'),
+        ]
+        writer = TableauTableWriter(config={}, schema_name='Extract', table_name='Extract')
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer.create_schema(schema, destination_file_path)
+        for row in rows:
+            writer.write_row(row)
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                rows_from_hyper = connection.execute_list_query(
+                    query=f"SELECT * FROM {TableName('Extract', 'Extract')} ORDER BY id")
+
+        converted_rows = [[row[0]] + [None if value is None else value.to_datetime() for value in row[1:]]
+                          for row in rows_from_hyper]
+        assert converted_rows == [
+            [1, datetime(2025, 1, 31, 1, 2, 3), datetime(2013, 5, 30, 15, 16, 13, 764000)],
+            [2, datetime(2025, 1, 31, 1, 2, 3), None],
+            [3, None, datetime(2013, 5, 30, 15, 16, 13, 764000)],
+            [4, None, None],
+        ]
+        assert writer.unparsable_values_counts == {'datetime_notz': 1, 'datetime_tz': 2}
+
+        os.remove(destination_file_path)
+
+    def write_rows(self, config, schema, rows, destination_file_path):
+        writer = TableauTableWriter(config=config, schema_name='Extract', table_name='Extract')
+        writer.create_schema(schema, destination_file_path)
+        for row in rows:
+            writer.write_row(row)
+        writer.close()
+
+    def read_rows(self, destination_file_path):
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                return connection.execute_list_query(
+                    query=f"SELECT id, name FROM {TableName('Extract', 'Extract')} ORDER BY id, name")
+
+    def test_append_write_mode(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        for load_mode in ['INSERTER', 'COPY']:
+            self.write_rows({'write_mode': 'APPEND', 'load_mode': load_mode}, schema,
+                            [(1, 'a'), (2, 'b')], destination_file_path)
+
+        assert self.read_rows(destination_file_path) == [[1, 'a'], [1, 'a'], [2, 'b'], [2, 'b']]
+
+        os.remove(destination_file_path)
+
+    def test_upsert_write_mode(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        config = {'write_mode': 'UPSERT', 'upsert_key_columns': ['id']}
+        self.write_rows(config, schema, [(1, 'a'), (2, 'b'), (None, 'c')], destination_file_path)
+        self.write_rows(config, schema, [(2, 'updated b'), (3, 'd'), (None, 'updated c')], destination_file_path)
+
+        assert self.read_rows(destination_file_path) == [[1, 'a'], [2, 'updated b'], [3, 'd'], [None, 'updated c']]
+
+        os.remove(destination_file_path)
+
+    def test_append_to_incompatible_table(self):
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        self.write_rows({}, {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]},
+                        [(1, 'a')], destination_file_path)
+        writer = TableauTableWriter(config={'write_mode': 'APPEND'}, schema_name='Extract', table_name='Extract')
+        with self.assertRaises(ValueError):
+            writer.create_schema({'columns': [{'name': 'id', 'type': 'string'}, {'name': 'other', 'type': 'string'}]},
+                                 destination_file_path)
+
+        assert self.read_rows(destination_file_path) == [[1, 'a']]
+
+        os.remove(destination_file_path)
+
+    def test_upsert_requires_existing_key_columns(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        with self.assertRaises(ValueError):
+            TableauTableWriter(config={'write_mode': 'UPSERT'}, schema_name='Extract', table_name='Extract')
+        writer = TableauTableWriter(config={'write_mode': 'UPSERT', 'upsert_key_columns': ['key']},
+                                    schema_name='Extract', table_name='Extract')
+        with self.assertRaises(ValueError):
+            writer.create_schema(schema, os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper'))
+
+    def test_resume_checkpointed_export(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        rows = [(index, 'name_{}'.format(index)) for index in range(1000)]
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        config = {'checkpoint_rows': 200}
+
+        failed_writer = TableauTableWriter(config=config, schema_name='Extract', table_name='Extract')
+        failed_writer.create_schema(schema, destination_file_path)
+        for row in rows[:730]:
+            failed_writer.write_row(row)
+        # The export stops without committing the rows written since the last checkpoint
+        failed_writer.inserter.close()
+        failed_writer.release_connection()
+        assert os.path.exists(destination_file_path + '.checkpoint')
+
+        writer = TableauTableWriter(config=config, schema_name='Extract', table_name='Extract')
+        writer.create_schema(schema, destination_file_path)
+        for row in rows:
+            writer.write_row(row)
+        writer.close()
+
+        assert writer.resumed_rows_count == 600
+        assert writer.row_index == 400
+        assert self.read_rows(destination_file_path) == [list(row) for row in rows]
+        assert not os.path.exists(destination_file_path + '.checkpoint')
+
+        os.remove(destination_file_path)
+
+    def test_checkpointed_export_restarts_on_schema_change(self):
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer = TableauTableWriter(config={'checkpoint_rows': 10}, schema_name='Extract', table_name='Extract')
+        writer.create_schema({'columns': [{'name': 'id', 'type': 'bigint'}]}, destination_file_path)
+        writer.write_row((1,))
+        writer.inserter.close()
+        writer.release_connection()
+
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        self.write_rows({'checkpoint_rows': 10}, schema, [(2, 'b')], destination_file_path)
+
+        assert self.read_rows(destination_file_path) == [[2, 'b']]
+
+        os.remove(destination_file_path)
+
+    def test_export_sorted_rows(self):
+        schema = {'columns': [{'name': 'id', 'type': 'bigint'}, {'name': 'name', 'type': 'string'}]}
+        destination_file_path = os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper')
+        writer = TableauTableWriter(config={'sort_columns': ['name', 'id']}, schema_name='Extract', table_name='Extract')
+        writer.create_schema(schema, destination_file_path)
+        for index in reversed(range(1000)):
+            writer.write_row((index, 'name_{}'.format(index % 7)))
+        writer.close()
+
+        with get_hyper_process() as hyper:
+            with Connection(endpoint=hyper.endpoint, database=destination_file_path) as connection:
+                rows = connection.execute_list_query(query=f"SELECT name, id FROM {TableName('Extract', 'Extract')}")
+                tables = connection.catalog.get_table_names('Extract')
+
+        assert rows == sorted(rows)
+        assert len(rows) == 1000
+        assert tables == [TableName('Extract', 'Extract')]
+        assert writer.sort_duration > 0
+
+        os.remove(destination_file_path)
+
+    def test_export_sorted_on_missing_column(self):
+        writer = TableauTableWriter(config={'sort_columns': ['date']}, schema_name='Extract', table_name='Extract')
+        with self.assertRaises(ValueError):
+            writer.create_schema({'columns': [{'name': 'id', 'type': 'bigint'}]},
+                                 os.path.join(self.output_path, get_random_alphanumeric_string(10) + '.hyper'))
+        with self.assertRaises(ValueError):
+            TableauTableWriter(config={'sort_columns': ['id'], 'checkpoint_rows': 10},
+                               schema_name='Extract', table_name='Extract')
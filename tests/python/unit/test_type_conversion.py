@@ -1,5 +1,6 @@
 import datetime
 from type_conversion import TypeConversion
+from type_conversion import TimestampParser
 from schema_conversion import SchemaConversion
 from tableauhyperapi import TypeTag, HyperProcess, Connection, Telemetry, TableName
 from unittest import TestCase
@@ -113,3 +114,32 @@ class TestTypeConversion(TestCase):
         assert str(date_hyper_type.tag) == 'TypeTag.TIMESTAMP'
         assert str(dateonly_hyper_type.tag) == 'TypeTag.DATE'
         assert str(datetimenotz_hyper_type.tag) == 'TypeTag.TIMESTAMP'
+
+    def test_timestamp_parser_matches_pandas(self):
+        timestamp_parser = TimestampParser()
+        for value in ["2025-01-31T01:02:03+0200", "2013-05-30T15:16:13.764+0200", "2013-05-30T15:16:13.764Z",
+                      "2025-01-31 01:02:03", "2025-01-31", "2013-05-30T15:16:13.764Z", "31 Jan 2025 01:02"]:
+            assert timestamp_parser(value) == pd.to_datetime(value)
+        assert timestamp_parser("") is None
+        assert timestamp_parser(None) is None
+        assert timestamp_parser(float("nan")) is None
+        assert timestamp_parser.unparsable_count == 0
+
+    def test_timestamp_parser_counts_unparsable_values(self):
+        timestamp_parser = TimestampParser(cache_size=2)
+        values = ["2025-01-31T01:02:03Z", "not a date", "2025-02-31T01:02:03Z", "not a date"]
+        assert [timestamp_parser(value) for value in values] == [pd.to_datetime(values[0]), None, None, None]
+        assert timestamp_parser.unparsable_count == 3
+
+    def test_unparsable_values_are_counted_per_conversion(self):
+        for _ in range(2):
+            schema_converter = SchemaConversion(None)
+            schema_converter.set_dss_storage_types(['date', 'datetimenotz'])
+            converted_rows = [schema_converter.prepare_row_to_hyper(row)
+                              for row in [("not a date", "2025-01-31 01:02:03"), ("2025-01-31", "not a date either")]]
+            assert converted_rows[0][1] == datetime.datetime(2025, 1, 31, 1, 2, 3)
+            assert type(converted_rows[0][1]) is datetime.datetime
+            assert schema_converter.get_unparsable_values_counts() == {0: 1, 1: 1}
+        type_converter = TypeConversion(None)
+        assert type_converter.dss_value_to_hyper("2025-01-31 01:02:03", 'date') == datetime.datetime(2025, 1, 31, 1, 2, 3)
+        assert type_converter.timestamp_parser.parse.cache_info().currsize == 1